@@ -0,0 +1,129 @@
+"""Σύγκριση τύπων FAISS index: recall@k έναντι του flat index και latency ανά query.
+
+Παράδειγμα:
+    python3 ann_eval.py --config "Flat" --config "HNSW32,Flat|efSearch=64" \
+        --config "IVF1024,Flat|nprobe=16" --config "IVF1024,PQ48|nprobe=32" --output /data/ann_report.json
+
+Τα vectors του corpus έρχονται από το embedding cache του index_docs.py για το
+ενεργό snapshot, με το μοντέλο του manifest του (όχι το τρέχον EMBED_BACKEND).
+Ως queries χρησιμοποιείται δείγμα από chunks ή (με --questions) πραγματικές
+ερωτήσεις, μία ανά γραμμή, κωδικοποιημένες με το ίδιο μοντέλο.
+"""
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+import index_docs
+import snapshots
+from meta_store import open_meta_store
+
+
+def load_corpus_vectors():
+    version = snapshots.current_version()
+    if not version:
+        raise SystemExit("❌ Δεν υπάρχει ενεργό snapshot – τρέξε πρώτα το index_docs.py")
+    metadata = open_meta_store(snapshots.snapshot_path(version), json_name=snapshots.META_NAME)
+    model = snapshots.read_manifest(version).get("model") or index_docs.MODEL_ID
+
+    cache = index_docs.EmbeddingCache(index_docs.EMBED_CACHE_FILE, model_name=model)
+    try:
+        keys = [index_docs.chunk_cache_key(f"passage: {m['text']}", model) for m in metadata.iter_rows()]
+        found = cache.get_many(keys)
+    finally:
+        cache.close()
+    missing = sum(k not in found for k in keys)
+    if missing:
+        raise SystemExit(f"❌ Λείπουν {missing} embeddings ({model}) από το cache – τρέξε ξανά το index_docs.py")
+    vectors = np.vstack([found[k] for k in keys]).astype("float32")
+    faiss.normalize_L2(vectors)
+    return version, model, vectors
+
+
+def load_queries(vectors, questions_file, n_queries, seed, model_name):
+    if questions_file:
+        from embedding import backend_for, load_model
+        backend = backend_for(model_name)
+        if backend is None:
+            raise SystemExit(f"❌ Άγνωστο μοντέλο στο manifest: {model_name}")
+        with open(questions_file, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+        model = load_model(backend)
+        queries = model.encode(questions, convert_to_numpy=True).astype("float32")
+    else:
+        rng = np.random.default_rng(seed)
+        ids = rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)
+        queries = vectors[ids].copy()
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def evaluate(config, vectors, queries, ground_truth, k):
+    factory, _, params = config.partition("|")
+    t0 = time.perf_counter()
+    index = index_docs.create_faiss_index(vectors.copy(), factory=factory)
+    build_s = time.perf_counter() - t0
+    if params:
+        faiss.ParameterSpace().set_index_parameters(index, params)
+
+    latencies = []
+    hits = 0
+    for qi in range(len(queries)):
+        t = time.perf_counter()
+        _, I = index.search(queries[qi:qi + 1], k)
+        latencies.append(time.perf_counter() - t)
+        hits += len(set(I[0].tolist()) & set(ground_truth[qi].tolist()))
+
+    return {
+        "factory": factory,
+        "search_params": params,
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "p50_ms": percentile_ms(latencies, 50),
+        "p99_ms": percentile_ms(latencies, 99),
+        "build_s": round(build_s, 2),
+        "size_mb": round(faiss.serialize_index(index).nbytes / 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/latency report για FAISS index configs")
+    parser.add_argument("--config", action="append", required=True,
+                        help='Factory string, προαιρετικά με search params: "IVF1024,Flat|nprobe=16"')
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=1000, help="Αριθμός queries από δείγμα chunks")
+    parser.add_argument("--questions", help="Αρχείο με ερωτήσεις (μία ανά γραμμή) αντί για δείγμα chunks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Αποθήκευση αποτελεσμάτων σε JSON")
+    args = parser.parse_args()
+
+    version, model, vectors = load_corpus_vectors()
+    queries = load_queries(vectors, args.questions, args.queries, args.seed, model)
+    print(f"📊 Snapshot {version}: {len(vectors)} vectors, {len(queries)} queries, k={args.k}")
+
+    flat = faiss.IndexFlatIP(vectors.shape[1])
+    flat.add(vectors)
+    _, ground_truth = flat.search(queries, args.k)
+
+    results = []
+    for config in args.config:
+        print(f"⏳ {config} ...")
+        result = evaluate(config, vectors, queries, ground_truth, args.k)
+        results.append(result)
+        print(f"   recall@{args.k}={result[f'recall@{args.k}']}  p50={result['p50_ms']}ms  "
+              f"p99={result['p99_ms']}ms  build={result['build_s']}s  size={result['size_mb']}MB")
+
+    if args.output:
+        report = {"snapshot": version, "vectors": len(vectors), "queries": len(queries), "k": args.k, "results": results}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Αποθηκεύτηκε: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from api import index_state
+from api.auth import require_admin
+import snapshots
+
+# Έκδοση/reload του index μόνο με X-Admin-Token (api/auth.py)
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/index")
+def index_info():
+    """Ενεργή έκδοση index και η τελευταία διαθέσιμη στον δίσκο."""
+    try:
+        info = index_state.active().info()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    info["latest_version"] = snapshots.current_version()
+    return info
+
+@router.post("/index/reload")
+def reload_index():
+    """Άμεσος έλεγχος για νέο snapshot (χωρίς αναμονή του watcher)."""
+    try:
+        changed = index_state.reload_if_changed()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"reloaded": changed, **index_state.active().info()}
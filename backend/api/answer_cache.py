@@ -0,0 +1,145 @@
+"""Cache απαντήσεων για επαναλαμβανόμενες ερωτήσεις, σε δύο επίπεδα.
+
+- L1: κανονικοποιημένο κείμενο ερώτησης (πεζά, χωρίς τόνους/στίξη στο τέλος)
+  + φίλτρα → απάντηση, χωρίς encode, αναζήτηση ή LLM.
+- L2: λίγα embeddings ερωτήσεων· μια νέα ερώτηση με cosine ≥ ANSWER_CACHE_SIMILARITY
+  προς παλιότερη (με τα ίδια φίλτρα) παίρνει την απάντησή της. Κοστίζει μόνο το
+  encode και ένα γινόμενο πινάκων. Οι αριθμοί/αναφορές των δύο ερωτήσεων
+  (lexical.reference_tokens) πρέπει να είναι ίδιοι: "άρθρο 12" και "άρθρο 13"
+  έχουν σχεδόν ίδιο embedding αλλά άλλη απάντηση.
+
+Κάθε εγγραφή κρατά τις πηγές (answers) και το context του prompt· η
+llm_answer υπάρχει μόνο όταν την έδωσε πραγματικά το LLM (/api/ask/stream).
+Χωρίς αυτή, το stream παραλείπει την αναζήτηση αλλά καλεί κανονικά το LLM.
+
+Και τα δύο επίπεδα έχουν όριο εγγραφών (LRU) και TTL, και αδειάζουν μόλις
+εμφανιστεί νεότερη έκδοση του index. Requests που ξεκίνησαν με την παλιά έκδοση
+(πριν από το hot reload) παίρνουν miss και δεν αποθηκεύουν τίποτα, αντί να
+αδειάζουν το cache ξανά.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from lexical import normalize, reference_tokens
+
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "1") == "1"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
+ANSWER_CACHE_VECTORS = int(os.getenv("ANSWER_CACHE_VECTORS", "500"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+# Τα e5 embeddings έχουν υψηλό cosine ακόμα και για άσχετες ερωτήσεις → αυστηρό όριο
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.96"))
+
+_TRAILING_PUNCT = re.compile(r"[\s\.;;\?!…]+$")
+
+
+def _version_key(version):
+    # new_version() = "YYYYmmddTHHMMSS-xxxxxx" → λεξικογραφική σειρά = χρονική· το "legacy" είναι πάντα παλιότερο
+    return version != "legacy", version
+
+
+def normalize_question(question):
+    """Κλειδί L1: "Ποια είναι η προθεσμία;" και "ποια ειναι η  προθεσμια" δίνουν το ίδιο."""
+    return _TRAILING_PUNCT.sub("", " ".join(normalize(question).split()))
+
+
+def filters_key(filters):
+    if filters is None or filters.is_empty():
+        return ""
+    return json.dumps(filters.model_dump(), ensure_ascii=False, sort_keys=True)
+
+
+class AnswerCache:
+    def __init__(self, max_entries=ANSWER_CACHE_SIZE, max_vectors=ANSWER_CACHE_VECTORS, ttl=ANSWER_CACHE_TTL,
+                 similarity=ANSWER_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.max_vectors = max_vectors
+        self.ttl = ttl
+        self.similarity = similarity
+        self.version = None
+        self._entries = OrderedDict()  # (ερώτηση, φίλτρα) → (λήξη, απάντηση)
+        self._vectors = OrderedDict()  # (ερώτηση, φίλτρα) → (λήξη, embedding, αναφορές, απάντηση)
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        """True αν το version είναι το τρέχον (ή νεότερο, οπότε το cache αδειάζει), False αν είναι παλιότερο."""
+        if version == self.version:
+            return True
+        if self.version is not None and _version_key(version) < _version_key(self.version):
+            return False
+        # Νέο snapshot → οι αποθηκευμένες απαντήσεις μπορεί να μην ισχύουν
+        self._entries.clear()
+        self._vectors.clear()
+        self.version = version
+        return True
+
+    def get(self, version, question, filters=None):
+        """L1: απάντηση για την ίδια (κανονικοποιημένη) ερώτηση, αλλιώς None."""
+        key = (normalize_question(question), filters_key(filters))
+        with self._lock:
+            if not self._check_version(version):
+                return None
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def get_similar(self, version, question, q_emb, filters=None):
+        """L2: απάντηση της πιο κοντινής παλιότερης ερώτησης με τα ίδια φίλτρα και τις ίδιες αναφορές,
+           αν ξεπερνά το όριο ομοιότητας. Το q_emb είναι κανονικοποιημένο (1, d), όπως για την αναζήτηση.
+        """
+        fkey = filters_key(filters)
+        refs = reference_tokens(question)
+        now = time.monotonic()
+        with self._lock:
+            if not self._check_version(version):
+                return None
+            for key in [k for k, (expires, _, _, _) in self._vectors.items() if expires < now]:
+                del self._vectors[key]
+            keys = [k for k, (_, _, k_refs, _) in self._vectors.items() if k[1] == fkey and k_refs == refs]
+            if not keys:
+                return None
+            scores = np.stack([self._vectors[k][1] for k in keys]) @ q_emb[0]
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity:
+                return None
+            self._vectors.move_to_end(keys[best])
+            return self._vectors[keys[best]][3]
+
+    def put(self, version, question, q_emb, answer, filters=None):
+        key = (normalize_question(question), filters_key(filters))
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            if not self._check_version(version):
+                return
+            self._entries[key] = (expires, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if q_emb is not None and self.max_vectors > 0:
+                self._vectors[key] = (expires, np.asarray(q_emb[0], dtype="float32").copy(),
+                                      reference_tokens(question), answer)
+                self._vectors.move_to_end(key)
+                while len(self._vectors) > self.max_vectors:
+                    self._vectors.popitem(last=False)
+            elif key in self._vectors:
+                # Ενημέρωση μετά από L1 hit (χωρίς encode): το L2 κρατά το embedding και παίρνει τη νέα απάντηση
+                item = self._vectors[key]
+                self._vectors[key] = (expires, item[1], item[2], answer)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+
+    def stats(self):
+        return {"version": self.version, "entries": len(self._entries), "vectors": len(self._vectors)}
@@ -1,34 +1,53 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import faiss, json, os, re
+import faiss, json, os, re, time
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from urllib.parse import quote
+from api import index_state
+from api import service
+from api import llm
+from api.answer_cache import ANSWER_CACHE, AnswerCache
+from api.history import SessionHistory
+from lexical import rrf_fuse
+from api.filters import SearchFilters, filtered_search, ranges_mask, resolve_ranges
+from metrics import Counter, Histogram, RequestTimer, current_timer, stage
+import httpx
+from typing import Optional
 
 router = APIRouter()
 
-INDEX_FILE = "/data/faiss.index"
-META_FILE = "/data/docs_meta.json"
 PDF_BASE_URL = "http://144.91.115.48:8000/pdf"  # σωστό path για PDFs
+PAGE_BASE_URL = "http://144.91.115.48:8000/api/pdf"  # μόνο η σελίδα της πηγής (api/pages.py)
 
-# 🔹 Φόρτωση μοντέλου και index
-model = SentenceTransformer("intfloat/multilingual-e5-base", cache_folder="/root/.cache/huggingface")
+# 🔹 Hybrid αναζήτηση: dense (FAISS) + lexical (BM25), συνδυασμός με reciprocal rank fusion
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") == "1"
+RRF_K = 60
 
-if not os.path.exists(INDEX_FILE) or not os.path.exists(META_FILE):
-    raise RuntimeError("❌ Δεν βρέθηκε FAISS index ή metadata.")
+# 🔹 Metrics (GET /metrics): χρόνος ανά στάδιο, αιτήματα, σφάλματα ανά στάδιο, πλήθος αποτελεσμάτων
+STAGE_SECONDS = Histogram("ask_stage_seconds", "Χρόνος ανά στάδιο του /api/ask", ["stage"])
+REQUESTS = Counter("ask_requests_total", "Αιτήματα ανά endpoint και status", ["endpoint", "status"])
+ERRORS = Counter("ask_errors_total", "Σφάλματα ανά στάδιο και τύπο", ["stage", "type"])
+RESULTS = Histogram("ask_results", "Αποτελέσματα ανά ερώτηση", buckets=(0, 1, 2, 3, 5, 10))
+SEARCHES = Counter("ask_searches_total", "Αναζητήσεις ανά τρόπο", ["mode", "filtered"])
+CACHE_LOOKUPS = Counter("ask_cache_total", "Αναζητήσεις στο cache απαντήσεων ανά αποτέλεσμα (l1, l2, miss)", ["result"])
 
-index = faiss.read_index(INDEX_FILE)
-with open(META_FILE, "r", encoding="utf-8") as f:
-    metadata = json.load(f)
-
-print("✅ FAISS index και metadata φορτώθηκαν στη μνήμη.")
+# 🔹 Μοντέλο και index φορτώνονται στο background από το api/service.py
+#    (νέα snapshots φορτώνονται επίσης αυτόματα)
 
 # -------------------- Memory για follow-up --------------------
-CHAT_HISTORY = []  # (role, text) tuples
-MAX_HISTORY = 8
+# Ιστορικό ανά session_id (όρια μηνυμάτων/tokens, TTL και συνολικό όριο μνήμης)
+HISTORY = SessionHistory()
+
+# -------------------- Cache απαντήσεων --------------------
+# Ίδια ή σχεδόν ίδια ερώτηση στο ίδιο index → η προηγούμενη απάντηση, χωρίς αναζήτηση και LLM
+CACHE = AnswerCache()
 
 class Query(BaseModel):
     question: str
+    session_id: Optional[str] = None  # χωρίς session_id δεν κρατιέται ιστορικό
+    filters: Optional[SearchFilters] = None  # αναζήτηση μόνο σε αρχείο / ενότητα / collection
 
 def clean_text(t: str) -> str:
     """Καθαρισμός κειμένου, διατηρεί newlines"""
@@ -72,73 +91,369 @@ USER: {user_message}
 Δώσε καθαρή, δομημένη και κατανοητή απάντηση.
 """
 
+# -------------------- Retrieval --------------------
+def encode_question(question):
+    with stage("encode", STAGE_SECONDS):
+        q_emb = service.encoder.encode([question])
+        faiss.normalize_L2(q_emb)
+    return q_emb
+
+def resolve_filter_ranges(snapshot, filters):
+    """None χωρίς φίλτρα, αλλιώς τα ranges των chunk ids που επιτρέπουν (κενά = κανένα)."""
+    if filters is None or filters.is_empty():
+        return None
+    if snapshot.filters is None:
+        raise ValueError("Το ενεργό index δεν υποστηρίζει φίλτρα – απαιτείται νέο indexing.")
+    with stage("filters", STAGE_SECONDS):
+        return resolve_ranges(snapshot.filters, filters)
+
+def dense_search(snapshot, q_emb, k, ranges=None):
+    """Μία index.search για όλες τις γραμμές του q_emb → [(id, score)] ανά ερώτηση."""
+    with stage("search", STAGE_SECONDS):
+        if ranges is None:
+            D, I = snapshot.index.search(q_emb, k)
+        else:
+            D, I = filtered_search(snapshot.index, q_emb, k, ranges)
+    return [[(int(idx), float(score)) for idx, score in zip(ids, scores) if idx >= 0] for ids, scores in zip(I, D)]
+
+def is_hybrid(snapshot):
+    return HYBRID_SEARCH and snapshot.bm25 is not None
+
+def fuse_lexical(snapshot, question, dense, k, mask=None):
+    """Lexical (BM25) για ακριβείς αναφορές άρθρων/νόμων + fusion με τα dense αποτελέσματα."""
+    with stage("bm25", STAGE_SECONDS):
+        lex_ids, _ = snapshot.bm25.search(question, k=k, mask=mask)
+        return rrf_fuse([[i for i, _ in dense], lex_ids.tolist()], k=RRF_K, limit=k)
+
+def cosine_scores(snapshot, q_vec, dense, ranked):
+    """Cosine ερώτησης-chunk για τα ranked: από το dense search, και με reconstruct για όσα
+       βρήκε μόνο το BM25 (αν το index δεν το υποστηρίζει, αυτά μένουν χωρίς score).
+    """
+    scores = dict(dense)
+    missing = [idx for idx, _ in ranked if idx not in scores]
+    if missing:
+        try:
+            vectors = snapshot.index.reconstruct_batch(np.asarray(missing, dtype="int64"))
+        except RuntimeError:
+            return scores
+        scores.update((idx, float(score)) for idx, score in zip(missing, vectors @ q_vec))
+    return scores
+
+def to_results(ranked, rows, cosine=None):
+    """(id, score) + metadata → αποτελέσματα με τη σειρά του ranked (παραλείπονται chunks χωρίς κείμενο).
+       Με hybrid (cosine δοσμένο): "score" = cosine όπως και χωρίς BM25, "rrf_score" = το score της κατάταξης.
+    """
+    results = []
+    for idx, score in ranked:
+        if idx in rows:
+            md = rows[idx]
+            text = md.get("text", "").strip()
+            if text:
+                extra = {} if cosine is None else {"rrf_score": float(score)}
+                score = score if cosine is None else cosine.get(idx)
+                results.append({
+                    "idx": idx,
+                    "score": None if score is None else float(score),
+                    **extra,
+                    "filename": md.get("filename", "unknown.pdf"),
+                    "page": md.get("page", 1),
+                    "section_title": md.get("section_title"),
+                    "text": text,
+                    "sources": md.get("sources") or []  # όλες οι εμφανίσεις ενός chunk που υπάρχει σε πολλά αρχεία
+                })
+    return results
+
+def retrieve(question, k=10, top_n=3, filters=None, snapshot=None, q_emb=None):
+    """Encode + FAISS αναζήτηση (και BM25 αν υπάρχει στο snapshot, με reciprocal rank fusion).
+       Με filters η αναζήτηση γίνεται μόνο στα αντίστοιχα chunk ids.
+       Επιστρέφει τα top_n αποτελέσματα με τα metadata τους.
+    """
+    # 🔹 Ίδιο snapshot για όλο το request, ακόμα κι αν γίνει reload στο μεταξύ
+    if snapshot is None:
+        snapshot = index_state.active()
+
+    ranges = resolve_filter_ranges(snapshot, filters)
+    if ranges is not None and not ranges:
+        return []
+
+    # 🔹 Encode query (αν δεν έγινε ήδη για το cache)
+    if q_emb is None:
+        q_emb = encode_question(question)
+
+    # 🔹 Αναζήτηση FAISS
+    dense = dense_search(snapshot, q_emb, k, ranges)[0]
+
+    hybrid = is_hybrid(snapshot)
+    SEARCHES.inc(mode="hybrid" if hybrid else "dense", filtered=str(ranges is not None).lower())
+    cosine = None
+    if hybrid:
+        mask = None if ranges is None else ranges_mask(ranges, snapshot.bm25.n_docs)
+        ranked = fuse_lexical(snapshot, question, dense, k, mask)
+        cosine = cosine_scores(snapshot, q_emb[0], dense, ranked)
+    else:
+        ranked = dense
+
+    # 🔹 Ανάγνωση μόνο των metadata των top-k
+    with stage("metadata", STAGE_SECONDS):
+        rows = snapshot.metadata.get_many([idx for idx, _ in ranked])
+    results = to_results(ranked, rows, cosine)
+
+    # 🔹 Κράτα τις top_n καλύτερες απαντήσεις (το ranked είναι ήδη ταξινομημένο, dense ή RRF)
+    top = results[:top_n]
+    RESULTS.observe(len(top))
+    timer = current_timer()
+    if timer is not None:
+        timer.fields.update(index_version=snapshot.version, results=len(top), filtered=ranges is not None)
+    return top
+
+def retrieve_batch(questions, k=10, filters=None, snapshot=None):
+    """Όπως το retrieve για πολλές ερωτήσεις μαζί: ένα encode, μία index.search και
+       ένα get_many για όλες. Επιστρέφει τα top-k αποτελέσματα κάθε ερώτησης (χωρίς top_n).
+    """
+    if snapshot is None:
+        snapshot = index_state.active()
+
+    ranges = resolve_filter_ranges(snapshot, filters)
+    if ranges is not None and not ranges:
+        return [[] for _ in questions]
+
+    with stage("encode", STAGE_SECONDS):
+        q_emb = service.encoder.encode(questions)
+        faiss.normalize_L2(q_emb)
+    dense = dense_search(snapshot, q_emb, k, ranges)
+
+    hybrid = is_hybrid(snapshot)
+    SEARCHES.inc(len(questions), mode="hybrid" if hybrid else "dense", filtered=str(ranges is not None).lower())
+    cosine = [None] * len(questions)
+    if hybrid:
+        mask = None if ranges is None else ranges_mask(ranges, snapshot.bm25.n_docs)
+        ranked = [fuse_lexical(snapshot, q, d, k, mask) for q, d in zip(questions, dense)]
+        cosine = [cosine_scores(snapshot, v, d, r) for v, d, r in zip(q_emb, dense, ranked)]
+    else:
+        ranked = dense
+
+    with stage("metadata", STAGE_SECONDS):
+        rows = snapshot.metadata.get_many(sorted({idx for r in ranked for idx, _ in r}))
+    return [to_results(r, rows, c) for r, c in zip(ranked, cosine)]
+
+def pdf_url_for(filename, page):
+    filename_pdf = re.sub(r'\.docx?$', '.pdf', filename, flags=re.IGNORECASE)
+    return f"{PDF_BASE_URL}/{quote(filename_pdf)}#page={page}"
+
+def page_url_for(filename, page):
+    return f"{PAGE_BASE_URL}/{quote(filename, safe='')}/page/{page}"
+
+def format_answers(top_results):
+    """Formatted απαντήσεις με PDF links."""
+    answers = []
+    for r in top_results:
+        answer_text = clean_text(r["text"])
+        pdf_url = pdf_url_for(r["filename"], r["page"])
+
+        formatted = (
+            f"{answer_text}\n\n"
+            f"📄 Πηγή: [{r['filename']}]({pdf_url})\n"
+            f"📑 Σελίδα: [{r['page']}]({page_url_for(r['filename'], r['page'])})"
+        )
+        others = [s for s in r.get("sources", []) if (s["filename"], s["page"]) != (r["filename"], r["page"])]
+        if others:
+            formatted += "\n📚 Επίσης σε: " + ", ".join(
+                f"[{s['filename']}]({pdf_url_for(s['filename'], s['page'])}) (σελ. {s['page']})" for s in others
+            )
+        answer = {"answer": formatted, "score": r["score"], "page_url": page_url_for(r["filename"], r["page"])}
+        if "rrf_score" in r:
+            answer["rrf_score"] = r["rrf_score"]
+        answers.append(answer)
+    return answers
+
+NO_RESULTS = "Δεν βρέθηκε σχετική απάντηση."
+LLM_PLACEHOLDER = "📝 Προσομοίωση απάντησης από LLM για παράδειγμα."
+
+def lookup_cache(snapshot, question, filters):
+    """(απάντηση ή None, embedding της ερώτησης αν χρειάστηκε encode για το L2)."""
+    with stage("cache", STAGE_SECONDS):
+        hit = CACHE.get(snapshot.version, question, filters)
+    q_emb, level = None, "l1"
+    if hit is None:
+        q_emb = encode_question(question)
+        with stage("cache", STAGE_SECONDS):
+            hit = CACHE.get_similar(snapshot.version, question, q_emb, filters)
+        level = "l2" if hit is not None else "miss"
+    CACHE_LOOKUPS.inc(result=level)
+    timer = current_timer()
+    if timer is not None:
+        timer.fields.update(cache=level, index_version=snapshot.version)
+    return hit, q_emb
+
+def stage_error(timer, e):
+    """Αντί για γενικό 500: σε ποιο στάδιο απέτυχε το request και με τι κωδικό."""
+    where = timer.stage_name or "request"
+    ERRORS.inc(stage=where, type=type(e).__name__)
+    if isinstance(e, httpx.TimeoutException):
+        status, detail = 504, f"Λήξη χρόνου στο στάδιο '{where}'."
+    elif isinstance(e, httpx.HTTPError):
+        status, detail = 502, f"Σφάλμα επικοινωνίας στο στάδιο '{where}': {e}"
+    elif isinstance(e, (ConnectionError, FileNotFoundError)) and where == "encode":
+        status, detail = 503, f"Ο embed server δεν είναι διαθέσιμος: {e}"  # ξαναξεκινά από το serve.py
+    elif isinstance(e, RuntimeError) and where == "request":
+        status, detail = 503, str(e)  # π.χ. δεν έχει φορτωθεί index
+    else:
+        status, detail = 500, f"Σφάλμα στο στάδιο '{where}': {type(e).__name__}: {e}"
+    timer.fields["error"] = detail
+    return HTTPException(status_code=status, detail=detail, headers={"X-Error-Stage": where})
+
 # -------------------- Endpoint --------------------
 @router.post("/api/ask")
 def ask(query: Query):
+    timer = RequestTimer("/api/ask", STAGE_SECONDS)
+    status = 200
     try:
+        service.ensure_ready()
         question = query.question.strip()
         if not question:
             raise HTTPException(status_code=400, detail="Άδεια ερώτηση.")
 
-        # 🔹 Encode query
-        q_emb = model.encode([question], convert_to_numpy=True)
-        q_emb = q_emb.astype("float32")
-        faiss.normalize_L2(q_emb)
-
-        # 🔹 Αναζήτηση FAISS
-        k = 10
-        D, I = index.search(q_emb, k)
-
-        results = []
-        for idx, score in zip(I[0], D[0]):
-            if idx < len(metadata):
-                md = metadata[idx]
-                text = md.get("text", "").strip()
-                if text:
-                    results.append({
-                        "idx": int(idx),
-                        "score": float(score),
-                        "filename": md.get("filename", "unknown.pdf"),
-                        "page": md.get("page", 1),
-                        "text": text
-                    })
-
-        if not results:
-            return {"answers": [{"answer": "Δεν βρέθηκε σχετική απάντηση.", "score": 0}], "query": question}
-
-        # 🔹 Κράτα τις 3 καλύτερες απαντήσεις
-        top_results = sorted(results, key=lambda x: x["score"], reverse=True)[:3]
+        # 🔹 Cache μόνο για ερωτήσεις χωρίς ιστορικό (ένα follow-up εξαρτάται από τη συζήτηση)
+        snapshot = index_state.active()
+        use_cache = ANSWER_CACHE and not HISTORY.get(query.session_id)
+        q_emb = None
+        if use_cache:
+            hit, q_emb = lookup_cache(snapshot, question, query.filters)
+            if hit is not None:
+                # Το /api/ask/stream αποθηκεύει και την απάντηση του LLM· το /api/ask μόνο τις πηγές
+                response_text = hit.get("llm_answer", LLM_PLACEHOLDER)
+                HISTORY.add_turn(query.session_id, question, response_text)
+                return {"answers": hit["answers"], "query": question, "llm_answer": response_text, "cached": True}
+
+        try:
+            top_results = retrieve(question, filters=query.filters, snapshot=snapshot, q_emb=q_emb)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not top_results:
+            return {"answers": [{"answer": NO_RESULTS, "score": 0}], "query": question}
         context_chunks = [r["text"] for r in top_results]
 
         # 🔹 Φτιάχνουμε prompt με ιστορικό
-        prompt = build_prompt(CHAT_HISTORY, question, context_chunks)
+        with timer.stage("prompt"):
+            prompt = build_prompt(HISTORY.get(query.session_id), question, context_chunks)
 
         # 🔹 Κλήση LLM (χρησιμοποίησε τη δική σου συνάρτηση που στέλνει prompt στο μοντέλο)
         # Για παράδειγμα: response_text = call_llm(prompt)
-        response_text = "📝 Προσομοίωση απάντησης από LLM για παράδειγμα."  # αντικατάστησε με call_llm(prompt)
-
-        # 🔹 Ενημέρωση memory
-        CHAT_HISTORY.append(("user", question))
-        CHAT_HISTORY.append(("assistant", response_text))
-        if len(CHAT_HISTORY) > MAX_HISTORY:
-            CHAT_HISTORY[:] = CHAT_HISTORY[-MAX_HISTORY:]
-
-        # 🔹 Επιστροφή formatted απαντήσεων με PDF links
-        answers = []
-        for r in top_results:
-            answer_text = clean_text(r["text"])
-            filename_pdf = re.sub(r'\.docx?$', '.pdf', r["filename"], flags=re.IGNORECASE)
-            encoded_filename = quote(filename_pdf)
-            pdf_url = f"{PDF_BASE_URL}/{encoded_filename}#page={r['page']}"
-
-            formatted = (
-                f"{answer_text}\n\n"
-                f"📄 Πηγή: [{r['filename']}]({pdf_url})\n"
-                f"📑 Σελίδα: {r['page']}"
-            )
-            answers.append({"answer": formatted, "score": r["score"]})
+        response_text = LLM_PLACEHOLDER  # αντικατάστησε με call_llm(prompt) μέσα σε timer.stage("llm")
+
+        HISTORY.add_turn(query.session_id, question, response_text)
+        answers = format_answers(top_results)
+        # Στο cache μπαίνουν οι πηγές και το context, όχι το placeholder: το /api/ask/stream
+        # τα χρησιμοποιεί χωρίς νέα αναζήτηση αλλά καλεί κανονικά το LLM
+        if use_cache:
+            CACHE.put(snapshot.version, question, q_emb, {"answers": answers, "context": context_chunks},
+                      query.filters)
 
         return {"answers": answers, "query": question, "llm_answer": response_text}
 
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    except Exception as e:
+        error = stage_error(timer, e)
+        status = error.status_code
+        raise error
+    finally:
+        REQUESTS.inc(endpoint="/api/ask", status=str(status))
+        timer.finish(status)
+
+# -------------------- Streaming endpoint (SSE) --------------------
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/api/ask/stream")
+async def ask_stream(query: Query):
+    """Στέλνει αμέσως τις πηγές (event: sources) και μετά τα tokens του LLM (event: token)
+       καθώς παράγονται, ως Server-Sent Events. Τελειώνει με event: done ή event: error.
+    """
+    endpoint = "/api/ask/stream"
+    timer = RequestTimer(endpoint, STAGE_SECONDS)
+    try:
+        service.ensure_ready()
+        question = query.question.strip()
+        if not question:
+            raise HTTPException(status_code=400, detail="Άδεια ερώτηση.")
+
+        snapshot = index_state.active()
+        use_cache = ANSWER_CACHE and not HISTORY.get(query.session_id)
+        hit, q_emb, top_results = None, None, []
+        if use_cache:
+            hit, q_emb = await run_in_threadpool(lookup_cache, snapshot, question, query.filters)
+
+        # Η αναζήτηση είναι σύντομη και CPU-bound → threadpool· το LLM τρέχει async χωρίς να δεσμεύει thread
+        if hit is None:
+            try:
+                top_results = await run_in_threadpool(retrieve, question, filters=query.filters,
+                                                      snapshot=snapshot, q_emb=q_emb)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        REQUESTS.inc(endpoint=endpoint, status=str(e.status_code))
+        timer.finish(e.status_code)
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        error = stage_error(timer, e)
+        REQUESTS.inc(endpoint=endpoint, status=str(error.status_code))
+        timer.finish(error.status_code)
+        raise error
+    REQUESTS.inc(endpoint=endpoint, status="200")
+
+    async def events():
+        status = "done"
+        try:
+            if hit is not None and "llm_answer" in hit:
+                # Από το cache: ολόκληρη η απάντηση σε ένα token, χωρίς LLM
+                yield sse("sources", {"answers": hit["answers"], "query": question, "cached": True})
+                yield sse("token", {"text": hit["llm_answer"]})
+                HISTORY.add_turn(query.session_id, question, hit["llm_answer"])
+                yield sse("done", {"llm_answer": hit["llm_answer"], "cached": True})
+                return
+
+            if hit is not None:
+                # Μόνο οι πηγές από το cache (τις έβαλε το /api/ask) → χωρίς αναζήτηση, αλλά με LLM
+                answers, context_chunks = hit["answers"], hit["context"]
+                yield sse("sources", {"answers": answers, "query": question, "cached": True})
+            elif not top_results:
+                yield sse("sources", {"answers": [{"answer": NO_RESULTS, "score": 0}], "query": question})
+                yield sse("done", {"llm_answer": ""})
+                return
+            else:
+                answers, context_chunks = format_answers(top_results), [r["text"] for r in top_results]
+                yield sse("sources", {"answers": answers, "query": question})
+
+            with timer.stage("prompt"):
+                prompt = build_prompt(HISTORY.get(query.session_id), question, context_chunks)
+            parts = []
+            try:
+                t0 = time.perf_counter()
+                with timer.stage("llm"):
+                    async for token in llm.stream_generate(prompt):
+                        if not parts:
+                            STAGE_SECONDS.observe(time.perf_counter() - t0, stage="llm_first_token")
+                            timer.fields["first_token_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+                        parts.append(token)
+                        yield sse("token", {"text": token})
+            except Exception as e:
+                status = "error"
+                yield sse("error", {"detail": stage_error(timer, e).detail, "stage": "llm"})
+                return
+
+            response_text = "".join(parts)
+            HISTORY.add_turn(query.session_id, question, response_text)
+            if use_cache:
+                CACHE.put(snapshot.version, question, q_emb,
+                          {"answers": answers, "context": context_chunks, "llm_answer": response_text}, query.filters)
+            yield sse("done", {"llm_answer": response_text})
+        finally:
+            timer.finish(status)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,24 @@
+"""Έλεγχος πρόσβασης για τα admin endpoints (reindex, reload index).
+
+Τα routes αυτά ξεκινούν βαριές εργασίες ή αλλάζουν το index, οπότε θέλουν
+header X-Admin-Token ίσο με το REINDEX_TOKEN. Χωρίς REINDEX_TOKEN είναι
+κλειστά για όλους (403), ώστε ένα deployment χωρίς ρύθμιση να μην τα αφήνει
+ανοιχτά. Το nginx επιπλέον τα επιτρέπει μόνο από εσωτερικές διευθύνσεις.
+"""
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+REINDEX_TOKEN = os.getenv("REINDEX_TOKEN", "")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency: 401 χωρίς token, 403 με λάθος token ή αν δεν έχει οριστεί REINDEX_TOKEN."""
+    if not REINDEX_TOKEN:
+        raise HTTPException(status_code=403, detail="Τα admin endpoints είναι κλειστά (δεν έχει οριστεί REINDEX_TOKEN).")
+    if not x_admin_token:
+        raise HTTPException(status_code=401, detail="Απαιτείται header X-Admin-Token.")
+    if not hmac.compare_digest(x_admin_token.encode("utf-8"), REINDEX_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Λάθος admin token.")
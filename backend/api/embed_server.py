@@ -0,0 +1,184 @@
+"""Κοινός encoder ερωτήσεων για πολλούς uvicorn workers, πάνω σε Unix socket.
+
+Με πολλούς workers κάθε process φόρτωνε το δικό του μοντέλο e5. Σε αυτό το
+mode (EMBED_SERVER_SOCKET) το μοντέλο φορτώνεται μία φορά σε ξεχωριστό
+process (python3 -m api.embed_server, το ξεκινά το serve.py) και οι workers
+στέλνουν τις ερωτήσεις τους εκεί. Ο server περνά τα requests όλων των
+workers από τον ίδιο BatchingEncoder, οπότε ταυτόχρονες ερωτήσεις
+κωδικοποιούνται μαζί όπως και με έναν worker.
+
+Πρωτόκολλο: frames με μήκος 4 bytes (big-endian). Request = JSON
+({"texts": [...]} ή {"op": "info"}), απάντηση = JSON header ({"shape": [n, d]}
+ή {"error": ...}) και ένα frame με τα float32 vectors.
+"""
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+EMBED_SERVER_SOCKET = os.getenv("EMBED_SERVER_SOCKET", "")  # κενό = μοντέλο μέσα σε κάθε worker
+EMBED_SERVER_TIMEOUT = float(os.getenv("EMBED_SERVER_TIMEOUT", "30"))
+DEFAULT_SOCKET = "/tmp/ai-docs-embed.sock"
+WARMUP_ENCODES = int(os.getenv("WARMUP_ENCODES", "3"))
+
+
+def send_frame(sock, data):
+    sock.sendall(struct.pack(">I", len(data)) + data)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        part = sock.recv(n - len(buf))
+        if not part:
+            raise ConnectionResetError("Η σύνδεση με τον embed server έκλεισε")
+        buf += part
+    return bytes(buf)
+
+
+def recv_frame(sock):
+    (size,) = struct.unpack(">I", _recv_exact(sock, 4))
+    return _recv_exact(sock, size)
+
+
+# -------------------- Server --------------------
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # Μία σύνδεση ανά thread του worker, πολλά requests σε κάθε σύνδεση
+        while True:
+            try:
+                request = json.loads(recv_frame(self.request))
+            except ConnectionError:
+                return
+            payload = b""
+            try:
+                if request.get("op") == "info":
+                    reply = self.server.info
+                else:
+                    vectors = self.server.encoder.encode(request["texts"])
+                    reply, payload = {"shape": list(vectors.shape)}, vectors.tobytes()
+            except Exception as e:
+                reply = {"error": f"{type(e).__name__}: {e}"}
+            send_frame(self.request, json.dumps(reply).encode("utf-8"))
+            send_frame(self.request, payload)
+
+
+class EmbedServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = socket.SOMAXCONN  # πολλοί workers συνδέονται μαζί μετά από restart
+
+    def __init__(self, path, encoder, info):
+        self.encoder = encoder
+        self.info = info
+        super().__init__(path, _Handler)
+
+
+def serve(path=EMBED_SERVER_SOCKET or DEFAULT_SOCKET):
+    from api.embedder import BatchingEncoder
+    from embedding import load_model, model_id
+
+    model = load_model()
+    encoder = BatchingEncoder(lambda texts: model.encode(texts, convert_to_numpy=True, batch_size=len(texts)))
+    for i in range(max(1, WARMUP_ENCODES)):
+        dim = encoder.encode([f"δοκιμαστική ερώτηση {i}"]).shape[1]
+
+    if os.path.exists(path):
+        os.remove(path)  # socket από προηγούμενη εκτέλεση
+    server = EmbedServer(path, encoder, {"model": model_id(), "dim": int(dim), "pid": os.getpid()})
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"✅ Embed server ({model_id()}) ακούει στο {path}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# -------------------- Client --------------------
+class RemoteEncoder:
+    """Ίδιο interface με τον BatchingEncoder (encode → float32 (n, d)), μέσω του embed server.
+       Μία μόνιμη σύνδεση ανά thread· μετά από restart του server ξανασυνδέεται μόνη της.
+    """
+
+    def __init__(self, path=EMBED_SERVER_SOCKET or DEFAULT_SOCKET, timeout=EMBED_SERVER_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _request(self, message):
+        data = json.dumps(message, ensure_ascii=False).encode("utf-8")
+        for attempt in range(2):
+            try:
+                sock = self._socket()
+                send_frame(sock, data)
+                header, payload = json.loads(recv_frame(sock)), recv_frame(sock)
+                break
+            except socket.timeout:
+                self._close()  # η απάντηση μπορεί να έρθει αργότερα → η σύνδεση δεν είναι πια συγχρονισμένη
+                raise
+            except (ConnectionError, FileNotFoundError):
+                self._close()
+                if attempt:
+                    raise
+        if "error" in header:
+            raise RuntimeError(f"Embed server: {header['error']}")
+        return header, payload
+
+    def info(self):
+        return self._request({"op": "info"})[0]
+
+    def ping(self, timeout=2.0):
+        """Έλεγχος για το /readyz σε νέα σύνδεση με μικρό timeout (OSError αν δεν απαντά)."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(self.path)
+            send_frame(sock, json.dumps({"op": "info"}).encode("utf-8"))
+            header, _ = json.loads(recv_frame(sock)), recv_frame(sock)
+        return header
+
+    def wait_ready(self, interval=1.0):
+        """Περιμένει μέχρι να απαντήσει ο server (φορτώνει ακόμα το μοντέλο) και επιστρέφει το info του."""
+        while True:
+            try:
+                return self.info()
+            except OSError:
+                time.sleep(interval)
+
+    def encode(self, texts, timeout=None):
+        header, payload = self._request({"texts": list(texts)})
+        # copy: το faiss.normalize_L2 γράφει πάνω στον πίνακα
+        return np.frombuffer(payload, dtype="float32").reshape(header["shape"]).copy()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,74 @@
+"""Micro-batching των query embeddings.
+
+Τα sync endpoints τρέχουν σε threadpool, οπότε με πολλά ταυτόχρονα requests
+γίνονταν πολλά μικρά forward passes που μάχονταν για τους ίδιους πυρήνες.
+Εδώ ένα thread μαζεύει όσες ερωτήσεις φτάσουν μέσα σε EMBED_MAX_WAIT_MS (ή
+μέχρι EMBED_MAX_BATCH) και τις κωδικοποιεί σε ένα batch.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from metrics import Histogram
+
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "32"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+
+BATCH_SIZE = Histogram("embed_batch_size", "Ερωτήσεις ανά batch του encoder", buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+BATCH_SECONDS = Histogram("embed_batch_seconds", "Χρόνος encode ανά batch")
+QUEUE_WAIT_SECONDS = Histogram("embed_queue_wait_seconds", "Αναμονή στην ουρά μέχρι να ξεκινήσει το batch")
+
+
+class BatchingEncoder:
+    def __init__(self, encode_fn, max_batch=EMBED_MAX_BATCH, max_wait_ms=EMBED_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        future = Future()
+        future.submitted = time.perf_counter()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, texts, timeout=None):
+        """Blocking: επιστρέφει float32 πίνακα (len(texts), dim), όπως το model.encode."""
+        futures = [self.submit(t) for t in texts]
+        return np.vstack([f.result(timeout=timeout) for f in futures]).astype("float32")
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get_nowait() if remaining <= 0 else self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            for _, future in batch:
+                QUEUE_WAIT_SECONDS.observe(start - future.submitted)
+            BATCH_SIZE.observe(len(batch))
+            try:
+                with BATCH_SECONDS.time():
+                    vectors = self.encode_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), vec in zip(batch, vectors):
+                future.set_result(vec)
@@ -0,0 +1,150 @@
+"""Φιλτραρισμένη αναζήτηση ανά αρχείο, ενότητα ή collection.
+
+Τα φίλτρα μεταφράζονται σε ranges από chunk ids (filters.json του snapshot)
+και εφαρμόζονται μέσα στην αναζήτηση, όχι στο top-k μετά. Για στενά φίλτρα
+γίνεται ακριβής αναζήτηση μόνο στα vectors των ranges, οπότε το κόστος
+μικραίνει όσο στενεύει το φίλτρο· για ευρύτερα, IDSelector μέσα στο FAISS.
+"""
+import os
+from typing import Optional
+
+import faiss
+import numpy as np
+from pydantic import BaseModel
+
+from lexical import normalize
+
+# Μέχρι τόσα chunks → ακριβές dot product στα επιλεγμένα vectors αντί για FAISS με selector
+# (για μη-Flat index τα vectors ξαναφτιάχνονται με reconstruct σε κάθε ερώτηση → μικρό όριο)
+BRUTE_FORCE_MAX = int(os.getenv("FILTER_BRUTE_FORCE_MAX", "4096"))
+
+
+class SearchFilters(BaseModel):
+    filename: Optional[str] = None        # π.χ. "ν_4412_2016.docx" (ή χωρίς κατάληξη / .pdf)
+    section_prefix: Optional[str] = None  # π.χ. "Άρθρο 12"
+    collection: Optional[str] = None      # tag από το collections.json
+
+    def is_empty(self):
+        return not (self.filename or self.section_prefix or self.collection)
+
+
+def _stem(name):
+    return normalize(os.path.splitext(name.strip())[0])
+
+
+def resolve_ranges(filters_data, filters):
+    """Λίστα [(start, end)] ταξινομημένων, μη επικαλυπτόμενων ranges για τα φίλτρα.
+       ValueError για άγνωστο αρχείο/collection.
+    """
+    files = filters_data.get("files", {})
+    shared = filters_data.get("shared", {})  # chunks άλλων αρχείων που υπάρχουν και σε αυτό (dedup)
+    selected = set(files) | set(shared)
+
+    if filters.filename:
+        wanted = _stem(filters.filename)
+        matches = {f for f in selected if _stem(f) == wanted}
+        if not matches:
+            raise ValueError(f"Άγνωστο αρχείο: {filters.filename}")
+        selected &= matches
+
+    if filters.collection:
+        collections = filters_data.get("collections", {})
+        if filters.collection not in collections:
+            raise ValueError(f"Άγνωστο collection: {filters.collection}")
+        selected &= set(collections[filters.collection])
+
+    if filters.section_prefix:
+        prefix = normalize(filters.section_prefix.strip())
+        ranges = [
+            (start, end)
+            for fname in selected
+            for title, start, end in filters_data.get("sections", {}).get(fname, [])
+            if title and normalize(title).startswith(prefix)
+        ]
+        ranges += [
+            (i, i + 1)
+            for fname in selected
+            for title, i in shared.get(fname, [])
+            if title and normalize(title).startswith(prefix)
+        ]
+    else:
+        ranges = [tuple(files[f]) for f in selected if f in files]
+        ranges += [(i, i + 1) for f in selected for _, i in shared.get(f, [])]
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(s, e) for s, e in merged]
+
+
+def ranges_size(ranges):
+    return sum(e - s for s, e in ranges)
+
+
+def ranges_mask(ranges, n):
+    mask = np.zeros(n, dtype=bool)
+    for start, end in ranges:
+        mask[start:end] = True
+    return mask
+
+
+def _range_vectors(index, ranges):
+    """Τα vectors κάθε range (λίστα, ένας πίνακας ανά range), αλλιώς None.
+       IndexFlat: views πάνω στα vectors του index, χωρίς αντιγραφή.
+       Άλλα index: reconstruct_n (νέο αντίγραφο σε κάθε κλήση), αν το υποστηρίζουν.
+    """
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexFlat):
+        xb = faiss.rev_swig_ptr(base.get_xb(), base.ntotal * base.d).reshape(base.ntotal, base.d)
+        return [xb[s:e] for s, e in ranges]
+    try:
+        return [index.reconstruct_n(s, e - s) for s, e in ranges]
+    except RuntimeError:
+        return None
+
+
+def _selector(ranges):
+    if len(ranges) == 1:
+        return faiss.IDSelectorRange(ranges[0][0], ranges[0][1])
+    ids = np.concatenate([np.arange(s, e, dtype="int64") for s, e in ranges])
+    return faiss.IDSelectorBatch(ids)
+
+
+def _search_parameters(index, sel):
+    """SearchParameters με selector, κρατώντας τα nprobe/efSearch που έχει ήδη το index."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=sel, nprobe=ivf.nprobe)
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=sel, efSearch=base.hnsw.efSearch)
+    return faiss.SearchParameters(sel=sel)
+
+
+def filtered_search(index, q_emb, k, ranges):
+    """Σαν το index.search (D, I) αλλά μόνο μέσα στα ranges (μία γραμμή ανά ερώτηση του q_emb)."""
+    nq = len(q_emb)
+    if not ranges:
+        return np.full((nq, k), -np.inf, dtype="float32"), np.full((nq, k), -1, dtype="int64")
+
+    if ranges_size(ranges) <= BRUTE_FORCE_MAX:
+        vectors = _range_vectors(index, ranges)
+        if vectors is not None:
+            ids = np.concatenate([np.arange(s, e, dtype="int64") for s, e in ranges])
+            D = np.full((nq, k), -np.inf, dtype="float32")
+            I = np.full((nq, k), -1, dtype="int64")
+            # Scores ανά range και ένωση μόνο των scores (nq × n), όχι των vectors
+            all_scores = np.concatenate([q_emb @ v.T for v in vectors], axis=1)
+            for row, scores in enumerate(all_scores):
+                top = np.argsort(-scores, kind="stable")[:k]
+                D[row, :len(top)] = scores[top]
+                I[row, :len(top)] = ids[top]
+            return D, I
+
+    sel = _selector(ranges)
+    params = _search_parameters(index, sel)
+    D, I = index.search(q_emb, k, params=params)
+    return D, I
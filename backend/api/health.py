@@ -0,0 +1,40 @@
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from api import service
+from metrics import INDEX_METRICS_FILE, REGISTRY, Gauge
+
+router = APIRouter(tags=["health"])
+
+SERVICE_READY = Gauge("service_ready", "1 όταν μοντέλο και index είναι φορτωμένα")
+INDEX_CHUNKS = Gauge("index_active_chunks", "Chunks του ενεργού snapshot")
+UPTIME = Gauge("service_uptime_seconds", "Χρόνος από την εκκίνηση του process")
+
+@router.get("/healthz")
+def healthz():
+    """Liveness: το process τρέχει· περιλαμβάνει την πρόοδο φόρτωσης."""
+    return service.status()
+
+@router.get("/readyz")
+def readyz():
+    """Readiness: 200 μόνο όταν μοντέλο και index είναι φορτωμένα και ο embed server (αν υπάρχει) απαντά."""
+    info = service.status()
+    if info["ready"]:
+        error = service.embed_server_error()
+        if error:
+            info.update(ready=False, embed_server=error)
+    return JSONResponse(info, status_code=200 if info["ready"] else 503)
+
+@router.get("/metrics")
+def metrics():
+    """Metrics σε μορφή Prometheus· περιλαμβάνει και την τελευταία εκτέλεση του index_docs.py."""
+    info = service.status()
+    SERVICE_READY.set(1 if info["ready"] else 0)
+    INDEX_CHUNKS.set(info.get("chunks") or 0)
+    UPTIME.set(info["uptime_s"])
+    body = REGISTRY.render()
+    if os.path.exists(INDEX_METRICS_FILE):
+        with open(INDEX_METRICS_FILE, "r", encoding="utf-8") as f:
+            body += f.read()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -0,0 +1,108 @@
+"""Ιστορικό συνομιλίας ανά session, με όρια μνήμης.
+
+- ανά session: μέχρι HISTORY_MAX_MESSAGES μηνύματα και ~HISTORY_MAX_TOKENS tokens
+- sessions χωρίς δραστηριότητα για HISTORY_TTL δευτερόλεπτα διαγράφονται
+- συνολικά μέχρι HISTORY_MAX_SESSIONS sessions / HISTORY_MAX_TOTAL_TOKENS tokens
+  (τα λιγότερο πρόσφατα χρησιμοποιημένα φεύγουν πρώτα)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "8"))
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "1500"))
+HISTORY_TTL = float(os.getenv("HISTORY_TTL", "1800"))
+HISTORY_MAX_SESSIONS = int(os.getenv("HISTORY_MAX_SESSIONS", "10000"))
+HISTORY_MAX_TOTAL_TOKENS = int(os.getenv("HISTORY_MAX_TOTAL_TOKENS", "5000000"))
+
+CHARS_PER_TOKEN = 3  # χονδρική εκτίμηση για ελληνικό κείμενο
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class _Session:
+    __slots__ = ("messages", "tokens", "last_seen")
+
+    def __init__(self):
+        self.messages = deque()  # (role, text, tokens)
+        self.tokens = 0
+        self.last_seen = time.monotonic()
+
+
+class SessionHistory:
+    def __init__(self, max_messages=HISTORY_MAX_MESSAGES, max_tokens=HISTORY_MAX_TOKENS, ttl=HISTORY_TTL,
+                 max_sessions=HISTORY_MAX_SESSIONS, max_total_tokens=HISTORY_MAX_TOTAL_TOKENS):
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_total_tokens = max_total_tokens
+        self._sessions = OrderedDict()  # session_id → _Session, από το λιγότερο πρόσφατο
+        self._total_tokens = 0
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """Λίστα (role, text) για το build_prompt· κενή αν δεν υπάρχει session."""
+        if not session_id:
+            return []
+        with self._lock:
+            self._expire(time.monotonic())
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            return [(role, text) for role, text, _ in session.messages]
+
+    def add_turn(self, session_id, question, answer):
+        if not session_id:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session()
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            for role, text in (("user", question), ("assistant", answer)):
+                text = self._fit(text)
+                tokens = estimate_tokens(text)
+                session.messages.append((role, text, tokens))
+                session.tokens += tokens
+                self._total_tokens += tokens
+            while session.messages and (len(session.messages) > self.max_messages or session.tokens > self.max_tokens):
+                _, _, tokens = session.messages.popleft()
+                session.tokens -= tokens
+                self._total_tokens -= tokens
+            while self._sessions and (len(self._sessions) > self.max_sessions
+                                      or self._total_tokens > self.max_total_tokens):
+                self._drop_oldest()
+
+    def clear(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._total_tokens -= session.tokens
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._sessions), "tokens": self._total_tokens}
+
+    def _fit(self, text):
+        """Ένα μήνυμα δεν μπορεί να ξεπερνά μόνο του το όριο του session."""
+        max_chars = self.max_tokens * CHARS_PER_TOKEN // 2
+        return text if len(text) <= max_chars else text[:max_chars] + "…"
+
+    def _drop_oldest(self):
+        _, session = self._sessions.popitem(last=False)
+        self._total_tokens -= session.tokens
+
+    def _expire(self, now):
+        # Το OrderedDict είναι ταξινομημένο κατά last_seen, οπότε αρκεί να κοιτάμε την αρχή
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_seen <= self.ttl:
+                break
+            self._drop_oldest()
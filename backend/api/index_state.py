@@ -0,0 +1,167 @@
+"""Ενεργό snapshot του FAISS index + metadata, με hot reload.
+
+Κάθε request παίρνει μία φορά το `active()` και δουλεύει μόνο με αυτό, οπότε
+όταν ένα νέο snapshot αντικαταστήσει το παλιό, τα requests που τρέχουν ήδη
+τελειώνουν με την παλιά έκδοση.
+
+Με INDEX_MMAP=1 (default στο serve.py με πολλούς workers) το FAISS index και
+το BM25 γίνονται mmap read-only: όλοι οι workers μοιράζονται ένα αντίγραφο
+στο page cache αντί να φορτώνει το καθένα το δικό του.
+
+Ένα snapshot φορτώνεται μόνο αν το manifest["model"] είναι ίδιο με το μοντέλο
+(backend) του API: vectors άλλου backend ζουν σε άλλο χώρο και η αναζήτηση
+θα έδινε άσχετα αποτελέσματα χωρίς κανένα σφάλμα.
+"""
+import json
+import os
+import threading
+import time
+
+import faiss
+
+import snapshots
+from meta_store import open_meta_store
+from lexical import BM25Index
+from metrics import Counter, Histogram
+
+LEGACY_INDEX_FILE = "/data/faiss.index"
+LEGACY_META_FILE = "/data/docs_meta.json"
+RELOAD_INTERVAL = float(os.getenv("INDEX_RELOAD_INTERVAL", "10"))
+# Προαιρετικό override των search params του snapshot (π.χ. "nprobe=32,efSearch=128")
+SEARCH_PARAMS_OVERRIDE = os.getenv("INDEX_SEARCH_PARAMS")
+INDEX_MMAP = os.getenv("INDEX_MMAP", "0") == "1"
+
+
+class IndexSnapshot:
+    def __init__(self, version, index, metadata, manifest=None, bm25=None, filters=None):
+        self.version = version
+        self.index = index
+        self.metadata = metadata
+        self.bm25 = bm25
+        self.filters = filters
+        self.manifest = manifest or {}
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.search_params = apply_search_params(index, self.manifest)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "created_at": self.manifest.get("created_at"),
+            "chunks": len(self.metadata),
+            "vectors": int(self.index.ntotal),
+            "index": self.manifest.get("index", {"factory": "Flat", "search_params": ""}),
+            "search_params": self.search_params,
+            "hybrid": self.bm25 is not None,
+        }
+
+
+def apply_search_params(index, manifest):
+    """Εφαρμόζει nprobe/efSearch κ.λπ. από το manifest (ή το INDEX_SEARCH_PARAMS) στο index."""
+    params = SEARCH_PARAMS_OVERRIDE
+    if params is None:
+        params = manifest.get("index", {}).get("search_params", "")
+    if params:
+        faiss.ParameterSpace().set_index_parameters(index, params)
+    return params or ""
+
+
+def read_index(path, mmap=INDEX_MMAP):
+    if not mmap:
+        return faiss.read_index(path)
+    # Το IO_FLAG_MMAP κάνει mmap μόνο τις inverted lists των IVF· το IO_FLAG_MMAP_IFC (faiss ≥ 1.8)
+    # και τους κωδικούς Flat/HNSW/SQ, που είναι το μεγαλύτερο μέρος ενός index
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    return faiss.read_index(path, flags | faiss.IO_FLAG_READ_ONLY)
+
+
+_active = None
+_swap_lock = threading.Lock()
+_watcher = None
+_model = None  # model_id του encoder του API (το ορίζει το api/service.py)
+last_error = None  # τελευταία αποτυχία φόρτωσης νέου snapshot, None μετά από επιτυχία
+
+
+def set_model(model):
+    global _model
+    _model = model
+
+
+def check_model(version, manifest):
+    """RuntimeError αν το snapshot φτιάχτηκε με άλλο μοντέλο embeddings από αυτό του API."""
+    indexed = manifest.get("model")
+    if _model is not None and indexed is not None and indexed != _model:
+        raise RuntimeError(f"Το snapshot {version} φτιάχτηκε με {indexed} αλλά το API κωδικοποιεί με {_model}"
+                           f" – ίδιο EMBED_BACKEND στο API και στο index_docs.py ή νέο indexing.")
+
+
+def load_snapshot(version):
+    """Φορτώνει ένα snapshot από τον δίσκο (ή το παλιό /data/faiss.index αν version=None)."""
+    if version is None:
+        if not os.path.exists(LEGACY_INDEX_FILE) or not os.path.exists(LEGACY_META_FILE):
+            raise RuntimeError("❌ Δεν βρέθηκε FAISS index ή metadata.")
+        index_file, meta_dir, version = LEGACY_INDEX_FILE, os.path.dirname(LEGACY_META_FILE), "legacy"
+    else:
+        meta_dir = snapshots.snapshot_path(version)
+        index_file = os.path.join(meta_dir, snapshots.INDEX_NAME)
+    manifest = snapshots.read_manifest(version)
+    check_model(version, manifest)
+
+    index = read_index(index_file)
+    metadata = open_meta_store(meta_dir, json_name=snapshots.META_NAME)
+    bm25 = BM25Index(meta_dir, mmap=INDEX_MMAP) if BM25Index.exists(meta_dir) else None
+    filters = None
+    filters_file = os.path.join(meta_dir, snapshots.FILTERS_NAME)
+    if os.path.exists(filters_file):
+        with open(filters_file, "r", encoding="utf-8") as f:
+            filters = json.load(f)
+    return IndexSnapshot(version, index, metadata, manifest, bm25=bm25, filters=filters)
+
+
+SNAPSHOT_LOADS = Counter("index_snapshot_loads_total", "Φορτώσεις snapshot ανά αποτέλεσμα", ["result"])
+SNAPSHOT_LOAD_SECONDS = Histogram("index_snapshot_load_seconds", "Χρόνος φόρτωσης snapshot")
+
+
+def active():
+    if _active is None:
+        raise RuntimeError("❌ Δεν έχει φορτωθεί FAISS index.")
+    return _active
+
+
+def reload_if_changed():
+    """Αν το CURRENT δείχνει νέα έκδοση, τη φορτώνει και την ενεργοποιεί. Επιστρέφει True αν άλλαξε."""
+    global _active, last_error
+    version = snapshots.current_version()
+    if _active is not None and (version is None or version == _active.version):
+        return False
+    with _swap_lock:
+        if _active is not None and version == _active.version:
+            return False
+        try:
+            with SNAPSHOT_LOAD_SECONDS.time():
+                snapshot = load_snapshot(version)
+        except Exception as e:
+            SNAPSHOT_LOADS.inc(result="error")
+            last_error = f"{version}: {e}"
+            raise
+        SNAPSHOT_LOADS.inc(result="ok")
+        _active = snapshot  # ατομική αλλαγή reference
+        last_error = None
+    print(f"🔄 Ενεργό FAISS snapshot: {snapshot.version} ({len(snapshot.metadata)} chunks)")
+    return True
+
+
+def _watch():
+    while True:
+        time.sleep(RELOAD_INTERVAL)
+        try:
+            reload_if_changed()
+        except Exception as e:
+            print(f"⚠️ Αποτυχία φόρτωσης νέου snapshot: {e}")
+
+
+def start_watcher():
+    global _watcher
+    if _watcher is None and RELOAD_INTERVAL > 0:
+        _watcher = threading.Thread(target=_watch, name="index-reload", daemon=True)
+        _watcher.start()
@@ -0,0 +1,41 @@
+"""Async client για το Ollama (/api/generate με stream=true).
+
+Για τοπικές δοκιμές χωρίς μοντέλο: `uvicorn stub_llm:app --port 11434` και
+OLLAMA_URL=http://localhost:11434.
+"""
+import json
+import os
+
+import httpx
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "300"))
+
+_client = None
+
+
+def client():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(base_url=OLLAMA_URL, timeout=httpx.Timeout(LLM_TIMEOUT, connect=10))
+    return _client
+
+
+async def stream_generate(prompt, model=OLLAMA_MODEL):
+    """Async generator με τα κομμάτια κειμένου όπως τα παράγει το LLM."""
+    payload = {"model": model, "prompt": prompt, "stream": True}
+    async with client().stream("POST", "/api/generate", json=payload) as resp:
+        if resp.status_code != 200:
+            body = (await resp.aread()).decode("utf-8", "replace")
+            raise RuntimeError(f"LLM HTTP {resp.status_code}: {body[:200]}")
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            if data.get("error"):
+                raise RuntimeError(f"LLM: {data['error']}")
+            if data.get("response"):
+                yield data["response"]
+            if data.get("done"):
+                break
@@ -0,0 +1,104 @@
+"""Μία σελίδα ενός PDF πηγής: GET /api/pdf/{αρχείο}/page/{σελίδα}?format=pdf|png|webp
+
+Αντί για όλο το PDF (/pdf/<αρχείο>.pdf#page=N) ο client παίρνει μόνο τη σελίδα
+που αναφέρει η απάντηση, από το cache του page_render.py. Με ETag /
+If-None-Match (304 χωρίς render· ο αριθμός σελίδων για τον έλεγχο κρατιέται ανά
+mtime του PDF), Cache-Control και Range requests.
+"""
+import os
+import re
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+
+import snapshots
+from metrics import Counter
+from page_render import FORMATS, MAX_DPI, PAGE_RENDER_DPI, PageCache, PageNotFound, page_count, webp_available
+
+router = APIRouter(prefix="/api/pdf", tags=["pdf"])
+
+PDF_FOLDER = os.path.join(snapshots.DATA_DIR, "pdfs")
+PAGE_MAX_AGE = int(os.getenv("PAGE_MAX_AGE", "86400"))
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+PAGES = PageCache()
+PAGE_REQUESTS = Counter("pdf_page_requests_total", "Σελίδες PDF ανά μορφή και αποτέλεσμα (hit, render, not_modified)",
+                        ["format", "result"])
+
+
+def pdf_for(filename):
+    """PDF του εγγράφου (δέχεται όνομα .docx ή .pdf, χωρίς φακέλους)."""
+    name = os.path.basename(filename)
+    stem, ext = os.path.splitext(name)
+    if ext.lower() not in (".pdf", ".docx", ".doc"):
+        stem = name
+    return os.path.join(PDF_FOLDER, stem + ".pdf")
+
+
+def _etag_matches(header, etag):
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _byte_range(header, size):
+    """(start, end) για ένα range "bytes=a-b", None για άκυρο/πολλαπλό (→ όλο το αρχείο),
+       ValueError αν δεν ικανοποιείται.
+    """
+    m = RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if not m.group(1):  # "bytes=-500": τα τελευταία 500
+        length = int(m.group(2))
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(m.group(1))
+    end = int(m.group(2)) if m.group(2) else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+@router.get("/{filename}/page/{page}")
+def pdf_page(request: Request, filename: str, page: int,
+             format: str = Query("pdf", pattern="^(pdf|png|webp)$"),
+             dpi: int = Query(PAGE_RENDER_DPI, ge=36, le=MAX_DPI)):
+    """Η σελίδα ως PDF μίας σελίδας ή εικόνα (dpi μόνο για png/webp)."""
+    if format == "webp" and not webp_available():
+        raise HTTPException(status_code=415, detail="Η μορφή webp χρειάζεται Pillow· χρησιμοποίησε png.")
+    pdf_path = pdf_for(filename)
+    try:
+        key = PAGES.key(pdf_path, page, format, dpi)
+        pages = page_count(pdf_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Δεν βρέθηκε PDF για {filename}")
+    # Πριν από το 304: ένα ETag για ανύπαρκτη σελίδα δεν πρέπει να "επικυρώνεται"
+    if not 1 <= page <= pages:
+        raise HTTPException(status_code=404, detail=f"Το {os.path.basename(pdf_path)} έχει {pages} σελίδες")
+
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={PAGE_MAX_AGE}", "Accept-Ranges": "bytes"}
+    inm = request.headers.get("if-none-match")
+    if inm and _etag_matches(inm, etag):
+        PAGE_REQUESTS.inc(format=format, result="not_modified")
+        return Response(status_code=304, headers=headers)
+
+    try:
+        key, data, rendered = PAGES.get(pdf_path, page, format, dpi)
+    except PageNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    PAGE_REQUESTS.inc(format=format, result="render" if rendered else "hit")
+
+    # Range μόνο αν το If-Range (όταν υπάρχει) ταιριάζει με την τρέχουσα έκδοση
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = _byte_range(range_header, len(data))
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{len(data)}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return Response(data[start:end + 1], status_code=206, media_type=FORMATS[format], headers=headers)
+    return Response(data, media_type=FORMATS[format], headers=headers)
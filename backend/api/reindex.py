@@ -0,0 +1,190 @@
+"""Reindex από το API, χωρίς shell: POST /api/reindex.
+
+Το index_docs.py τρέχει σε ξεχωριστό process (χαμηλότερη προτεραιότητα με
+nice, προαιρετικά λιγότερα threads) ώστε οι ερωτήσεις να μην καθυστερούν.
+Μόνο ένα indexing τη φορά: το API παίρνει το flock του snapshots.LOCK_FILE
+και το περνά στο child, οπότε το lock κρατιέται όσο τρέχει το job (ακόμα κι
+αν γίνει restart το API) και εμποδίζει και ταυτόχρονο τρέξιμο από CLI.
+
+Όλα τα routes θέλουν X-Admin-Token (api/auth.py).
+
+Κατάσταση και πρόοδος γράφονται σε αρχεία στο /data, ώστε να απαντά σωστά
+όποιος uvicorn worker κι αν δεχτεί το request.
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+import snapshots
+from api import index_state
+from api.auth import require_admin
+
+router = APIRouter(prefix="/api/reindex", tags=["admin"], dependencies=[Depends(require_admin)])
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_FILE = os.path.join(snapshots.DATA_DIR, "reindex_job.json")
+PROGRESS_FILE = os.path.join(snapshots.DATA_DIR, "reindex_progress.json")
+LOG_FILE = os.path.join(snapshots.DATA_DIR, "reindex.log")
+REINDEX_NICE = int(os.getenv("REINDEX_NICE", "10"))
+REINDEX_THREADS = os.getenv("REINDEX_THREADS", "")  # όριο threads torch/BLAS του job (κενό = χωρίς όριο)
+LOG_TAIL_LINES = 20
+
+_start_lock = threading.Lock()
+
+
+class ReindexRequest(BaseModel):
+    rebuild: bool = False
+    # Processes του index_docs.py: 0 σπάει το ProcessPool, χιλιάδες θα γονάτιζαν το μηχάνημα
+    workers: Optional[int] = Field(None, ge=1, le=os.cpu_count() or 1)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _alive(pid):
+    """True αν το process τρέχει (ένα zombie που δεν έχει γίνει wait δεν μετράει)."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except (FileNotFoundError, IndexError):
+        return False
+    except OSError:
+        try:
+            os.kill(pid, 0)
+            return True
+        except OSError:
+            return False
+
+
+def _log_tail(lines=LOG_TAIL_LINES):
+    try:
+        with open(LOG_FILE, "r", encoding="utf-8", errors="replace") as f:
+            return f.readlines()[-lines:]
+    except FileNotFoundError:
+        return []
+
+
+def _job_env():
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    if REINDEX_THREADS:
+        for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            env[name] = REINDEX_THREADS
+    return env
+
+
+def _wait(proc, job):
+    code = proc.wait()
+    job = dict(_read_json(JOB_FILE) or job)
+    if job.get("pid") != proc.pid:
+        return
+    progress = _read_json(PROGRESS_FILE) or {}
+    if code == 0:
+        job["state"] = "finished"
+    elif job.get("cancel_requested"):
+        job["state"] = "cancelled"
+    else:
+        job["state"] = "failed"
+    job.update(exit_code=code, finished_at=time.time(), result=progress.get("stage"))
+    snapshots.write_json_atomic(JOB_FILE, job)
+    print(f"🏁 Reindex {job['id']}: {job['state']} (exit {code})")
+
+    # Το νέο snapshot ενεργοποιείται αμέσως, χωρίς αναμονή του watcher
+    if code == 0:
+        try:
+            index_state.reload_if_changed()
+        except Exception as e:
+            print(f"⚠️ Αποτυχία φόρτωσης νέου snapshot: {e}")
+
+
+def job_status():
+    job = _read_json(JOB_FILE)
+    if job is None:
+        return {"state": "idle"}
+    if job["state"] == "running" and not _alive(job["pid"]):
+        # Τελείωσε χωρίς να το καταγράψει αυτό το process (π.χ. restart του API)
+        job["state"] = "cancelled" if job.get("cancel_requested") else "interrupted"
+    if job.get("started_at"):
+        job["elapsed_s"] = round((job.get("finished_at") or time.time()) - job["started_at"], 1)
+    return job
+
+
+@router.post("", status_code=202)
+def start_reindex(request: ReindexRequest = ReindexRequest()):
+    """Ξεκινά το index_docs.py στο background. 409 αν τρέχει ήδη indexing."""
+    with _start_lock:
+        fd = snapshots.try_lock()
+        if fd is None:
+            raise HTTPException(status_code=409, detail="Τρέχει ήδη indexing.", headers={"Retry-After": "30"})
+        try:
+            cmd = [sys.executable, "index_docs.py", "--progress-file", PROGRESS_FILE, "--lock-fd", str(fd)]
+            if REINDEX_NICE:
+                # nice κάνει exec το python (ίδιο pid)· όχι preexec_fn, που δεν είναι ασφαλές με threads
+                cmd = ["nice", "-n", str(REINDEX_NICE)] + cmd
+            if request.rebuild:
+                cmd.append("--rebuild")
+            if request.workers:
+                cmd += ["--workers", str(request.workers)]
+            if os.path.exists(PROGRESS_FILE):
+                os.remove(PROGRESS_FILE)
+            with open(LOG_FILE, "w", encoding="utf-8") as log:
+                proc = subprocess.Popen(
+                    cmd, cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT, env=_job_env(),
+                    pass_fds=(fd,),
+                    start_new_session=True,  # ίδιο process group με τους workers του → ακύρωση όλων μαζί
+                )
+        finally:
+            os.close(fd)  # το lock το κρατά πλέον το child
+        job = {
+            "id": time.strftime("%Y%m%dT%H%M%S"), "pid": proc.pid, "state": "running",
+            "rebuild": request.rebuild, "workers": request.workers,
+            "started_at": time.time(), "finished_at": None, "exit_code": None,
+        }
+        snapshots.write_json_atomic(JOB_FILE, job)
+    threading.Thread(target=_wait, args=(proc, job), name="reindex-wait", daemon=True).start()
+    print(f"🚀 Reindex {job['id']} ξεκίνησε (pid {proc.pid})")
+    return job
+
+
+@router.get("/status")
+def reindex_status():
+    """Κατάσταση του τελευταίου job (idle / running / finished / failed / cancelled) και τέλος του log."""
+    status = job_status()
+    if status["state"] != "idle":
+        status["log_tail"] = [line.rstrip("\n") for line in _log_tail()]
+    return status
+
+
+@router.get("/progress")
+def reindex_progress():
+    """Στάδιο, αρχεία που έγιναν, chunks που κωδικοποιήθηκαν και ETA του τρέχοντος σταδίου."""
+    status = job_status()
+    progress = _read_json(PROGRESS_FILE) or {}
+    return {"state": status["state"], **progress}
+
+
+@router.post("/cancel")
+def cancel_reindex():
+    """SIGTERM στο process group του job: σταματά καθαρά, χωρίς μισό snapshot."""
+    job = job_status()
+    if job["state"] != "running":
+        raise HTTPException(status_code=409, detail="Δεν τρέχει reindex.")
+    job["cancel_requested"] = True
+    snapshots.write_json_atomic(JOB_FILE, {k: v for k, v in job.items() if k != "elapsed_s"})
+    try:
+        os.killpg(job["pid"], signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    return {"state": "cancelling", "id": job["id"]}
@@ -0,0 +1,90 @@
+"""Batch αναζήτηση χωρίς LLM: POST /api/search/batch
+
+Για αξιολόγηση / tuning του retrieval (bench/eval_retrieval.py): πολλές
+ερωτήσεις σε ένα request, ένα encode, μία index.search για όλες και ωμά
+αποτελέσματα (ids, scores, metadata) αντί για μορφοποιημένες απαντήσεις.
+Η κατάταξη είναι ίδια με του /api/ask (dense + BM25 με RRF, ίδια φίλτρα),
+μόνο χωρίς το κόψιμο στις top_n. Όπως και εκεί, "score" είναι το cosine και
+με hybrid η σειρά ακολουθεί το "rrf_score".
+"""
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from api import index_state, service
+from api.ask import REQUESTS, STAGE_SECONDS, is_hybrid, retrieve_batch, stage_error
+from api.filters import SearchFilters
+from metrics import RequestTimer
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+SEARCH_BATCH_MAX = int(os.getenv("SEARCH_BATCH_MAX", "256"))  # ερωτήσεις ανά request
+SEARCH_BATCH_MAX_K = 100
+
+
+class BatchQuery(BaseModel):
+    questions: List[str]
+    k: int = Field(10, ge=1, le=SEARCH_BATCH_MAX_K)
+    filters: Optional[SearchFilters] = None  # ίδια για όλες τις ερωτήσεις
+    include_text: bool = False  # το κείμενο των chunks μεγαλώνει πολύ την απάντηση
+
+
+def to_hit(result, include_text):
+    hit = {
+        "id": result["idx"],
+        "score": result["score"],
+        "filename": result["filename"],
+        "page": result["page"],
+        "section_title": result.get("section_title"),
+        "sources": result["sources"],
+    }
+    if "rrf_score" in result:
+        hit["rrf_score"] = result["rrf_score"]
+    if include_text:
+        hit["text"] = result["text"]
+    return hit
+
+
+@router.post("/batch")
+def search_batch(query: BatchQuery):
+    timer = RequestTimer("/api/search/batch", STAGE_SECONDS)
+    status = 200
+    try:
+        service.ensure_ready()
+        questions = [q.strip() for q in query.questions]
+        if not questions:
+            raise HTTPException(status_code=400, detail="Καμία ερώτηση.")
+        if len(questions) > SEARCH_BATCH_MAX:
+            raise HTTPException(status_code=413, detail=f"Έως {SEARCH_BATCH_MAX} ερωτήσεις ανά request.")
+        empty = [i for i, q in enumerate(questions) if not q]
+        if empty:
+            raise HTTPException(status_code=400, detail=f"Άδειες ερωτήσεις στις θέσεις {empty}.")
+
+        snapshot = index_state.active()
+        try:
+            results = retrieve_batch(questions, k=query.k, filters=query.filters, snapshot=snapshot)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        timer.fields.update(index_version=snapshot.version, questions=len(questions))
+
+        return {
+            "index_version": snapshot.version,
+            "mode": "hybrid" if is_hybrid(snapshot) else "dense",
+            "k": query.k,
+            "results": [{"query": q, "hits": [to_hit(r, query.include_text) for r in hits]}
+                        for q, hits in zip(questions, results)],
+            "timings_ms": dict(timer.stages),
+        }
+
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    except Exception as e:
+        error = stage_error(timer, e)
+        status = error.status_code
+        raise error
+    finally:
+        REQUESTS.inc(endpoint="/api/search/batch", status=str(status))
+        timer.finish(status)
@@ -0,0 +1,129 @@
+"""Φόρτωση μοντέλου και index στο background + κατάσταση readiness.
+
+Το app ξεκινά να ακούει αμέσως. Το μοντέλο, το warmup και το FAISS snapshot
+φορτώνονται σε ξεχωριστό thread· μέχρι να τελειώσουν το /readyz επιστρέφει 503
+και τα endpoints αναζήτησης 503 με Retry-After. Αν δεν υπάρχει ακόμα index,
+η εφαρμογή δεν σκάει: περιμένει μέχρι να εμφανιστεί snapshot.
+
+Με EMBED_SERVER_SOCKET (πολλοί workers, βλ. serve.py) ο worker δεν φορτώνει
+μοντέλο: οι ερωτήσεις κωδικοποιούνται από τον κοινό embed server.
+"""
+import os
+import threading
+import time
+
+from fastapi import HTTPException
+
+from api import index_state
+from api.embed_server import EMBED_SERVER_SOCKET, RemoteEncoder
+from api.embedder import BatchingEncoder
+from embedding import load_model, model_id
+
+WARMUP_ENCODES = int(os.getenv("WARMUP_ENCODES", "3"))
+INDEX_RETRY_INTERVAL = float(os.getenv("INDEX_RETRY_INTERVAL", "10"))
+
+model = None
+encoder = None
+
+_status = {"stage": "starting", "ready": False, "error": None, "model": None}
+_started = time.monotonic()
+_lock = threading.Lock()
+_thread = None
+
+
+def _set(**values):
+    with _lock:
+        _status.update(values)
+
+
+def _load_model():
+    global model, encoder
+    _set(stage="loading model")
+    model = load_model()
+    _set(model=model_id())
+    # 🔹 Κοινός encoder: ταυτόχρονες ερωτήσεις κωδικοποιούνται μαζί σε ένα batch
+    encoder = BatchingEncoder(
+        lambda texts: model.encode(texts, convert_to_numpy=True, batch_size=len(texts))
+    )
+
+    _set(stage="warmup")
+    for i in range(WARMUP_ENCODES):
+        encoder.encode([f"δοκιμαστική ερώτηση {i}"])
+
+
+def _load():
+    global encoder
+    try:
+        if EMBED_SERVER_SOCKET:
+            _set(stage="waiting for embed server")
+            encoder = RemoteEncoder(EMBED_SERVER_SOCKET)
+            _set(model=encoder.wait_ready()["model"])
+        else:
+            _load_model()
+        # Snapshots άλλου μοντέλου/backend δεν φορτώνονται (βλ. index_state.check_model)
+        index_state.set_model(_status["model"])
+    except Exception as e:
+        _set(stage="error", error=f"model: {e}")
+        print(f"❌ Αποτυχία φόρτωσης μοντέλου: {e}")
+        return
+
+    # 🔹 Index: αν δεν υπάρχει ακόμα, ξαναδοκίμασε μέχρι να δημιουργηθεί
+    _set(stage="loading index")
+    while True:
+        try:
+            index_state.reload_if_changed()
+            break
+        except Exception as e:
+            _set(stage="waiting for index", error=str(e))
+            time.sleep(INDEX_RETRY_INTERVAL)
+    index_state.start_watcher()
+
+    _set(stage="ready", ready=True, error=None, ready_after_s=round(time.monotonic() - _started, 1))
+    print("✅ Μοντέλο, FAISS index και metadata φορτώθηκαν – η υπηρεσία είναι έτοιμη.")
+
+
+def start():
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_load, name="service-loader", daemon=True)
+        _thread.start()
+
+
+def is_ready():
+    return _status["ready"]
+
+
+def embed_server_error():
+    """None αν ο embed server απαντά (ή δεν χρησιμοποιείται), αλλιώς το σφάλμα."""
+    if not isinstance(encoder, RemoteEncoder):
+        return None
+    try:
+        encoder.ping()
+    except OSError as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def status():
+    with _lock:
+        info = dict(_status)
+    info["uptime_s"] = round(time.monotonic() - _started, 1)
+    try:
+        snapshot = index_state.active()
+        info["index_version"] = snapshot.version
+        info["chunks"] = len(snapshot.metadata)
+    except RuntimeError:
+        info["index_version"] = None
+    if index_state.last_error:
+        info["index_error"] = index_state.last_error  # π.χ. νέο snapshot με άλλο μοντέλο· μένει το παλιό
+    return info
+
+
+def ensure_ready():
+    """503 μέχρι να φορτωθούν μοντέλο και index."""
+    if not _status["ready"]:
+        if _status["stage"] == "error":
+            detail = f"Η υπηρεσία δεν είναι διαθέσιμη: {_status['error']}"
+        else:
+            detail = f"Η υπηρεσία φορτώνει ({_status['stage']})."
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
@@ -0,0 +1,20 @@
+"""Benchmarks για το indexing pipeline, το /api/ask και την ποιότητα του retrieval.
+
+Εκτέλεση από τον φάκελο backend, π.χ.:
+    python3 -m bench.gen_corpus --out /tmp/bench_docs --files 50
+    python3 -m bench.bench_index --docs /tmp/bench_docs --output results/index.json
+    python3 -m bench.load_test --url http://localhost:8000 --concurrency 16 --output results/ask.json
+    python3 -m bench.eval_retrieval golden.jsonl --url http://localhost:8000 --output results/eval.json
+    python3 -m bench.compare results/old.json results/new.json
+"""
+import os
+import subprocess
+
+
+def git_revision():
+    """Σύντομο git hash για να ξεχωρίζουν τα αποτελέσματα διαφορετικών εκδόσεων."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
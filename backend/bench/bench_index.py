@@ -0,0 +1,175 @@
+"""Χρονομέτρηση του indexing pipeline του index_docs.py (run_index → load_docs,
+process_file, build_index_streaming, BM25, publish).
+
+Τρέχει τις πραγματικές συναρτήσεις του index_docs, με όλα τα paths του
+(/data/docs, pdfs, caches, snapshots, metrics) σε δικό του φάκελο εργασίας,
+οπότε δεν αγγίζει το /data. Στάδια: οι φάσεις του run_index (PHASE_TIMINGS· το
+embed_index χωρίζεται σε embed και index_build) και οι χρόνοι ανά αρχείο του
+process_file (pdf, parse, chunk, pages).
+
+    python3 -m bench.bench_index --docs /tmp/bench_docs --output results/index.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import chunker
+import index_docs
+import snapshots
+from bench import git_revision
+from dedup import DEDUP_THRESHOLD
+from embedding import EMBED_BACKEND, model_id
+from meta_store import open_meta_store
+
+FILE_STAGES = ("pdf", "parse", "chunk", "pages")
+
+
+class RandomEncoder:
+    """--no-embed: ίδιο interface με το SentenceTransformer, σταθερό τυχαίο vector ανά κείμενο."""
+
+    def __init__(self, dim=768):
+        self.dim = dim
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        seeds = [int(hashlib.sha1(t.encode("utf-8")).hexdigest()[:8], 16) for t in texts]
+        return np.stack([np.random.default_rng(s).standard_normal(self.dim) for s in seeds]).astype("float32")
+
+
+def use_work_dir(work, docs, random_vectors=False):
+    """Όλα τα paths του index_docs και των snapshots μέσα στο work (τα .docx διαβάζονται από το docs).
+       Τα τυχαία vectors του --no-embed πάνε σε δικό τους embed cache: κλειδώνονται με το model id του
+       πραγματικού μοντέλου, οπότε ένα επόμενο run στο ίδιο --work θα τα έπαιρνε για πραγματικά.
+    """
+    data = os.path.join(work, "data")
+    os.makedirs(data, exist_ok=True)
+    index_docs.DATA_DIR = data
+    index_docs.DOCS_PATH = docs
+    index_docs.PDF_PATH = os.path.join(data, "pdfs")
+    index_docs.CACHE_FILE = os.path.join(data, "index_cache.json")
+    index_docs.CHUNK_CACHE_DIR = os.path.join(data, "chunk_cache")
+    index_docs.PAGE_CACHE_DIR = os.path.join(data, "page_cache")
+    index_docs.COLLECTIONS_FILE = os.path.join(docs, "collections.json")
+    index_docs.EMBED_CACHE_FILE = os.path.join(data, "embed_cache.random.sqlite" if random_vectors else
+                                                "embed_cache.sqlite")
+    index_docs.INDEX_METRICS_FILE = os.path.join(data, "index_metrics.prom")
+    snapshots.DATA_DIR = data
+    snapshots.SNAPSHOT_DIR = os.path.join(data, "snapshots")
+    snapshots.CURRENT_FILE = os.path.join(data, "CURRENT")
+    snapshots.LOCK_FILE = os.path.join(data, "reindex.lock")
+    os.makedirs(snapshots.SNAPSHOT_DIR, exist_ok=True)
+
+
+def report_stages(counts, model_seconds):
+    """Φάσεις του run_index + χρόνοι ανά αρχείο, στη μορφή {στάδιο: {seconds, items, per_item_ms}}."""
+    items = {"process_files": counts["files"], "embed_index": counts["chunks"], "embed": counts["chunks"],
+             "index_build": counts["chunks"], "bm25": counts["chunks"]}
+    stages = {name: (seconds, items.get(name, 0)) for name, seconds in index_docs.PHASE_TIMINGS.items()}
+    for name in FILE_STAGES:
+        seconds, n = index_docs.FILE_STAGE_SECONDS.totals(stage=name)
+        if n:
+            stages[f"file_{name}"] = (seconds, n)
+    if model_seconds is not None:
+        stages["model_load"] = (model_seconds, 0)
+
+    out = {}
+    for name, (seconds, n) in stages.items():
+        out[name] = {"seconds": round(seconds, 4), "items": n}
+        if n:
+            out[name]["per_item_ms"] = round(seconds * 1000 / n, 4)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Χρόνοι ανά στάδιο του indexing pipeline")
+    parser.add_argument("--docs", required=True, help="Φάκελος με .docx (π.χ. από bench.gen_corpus)")
+    parser.add_argument("--work", help="Φάκελος εργασίας (default: προσωρινός)· με υπάρχον --work "
+                                       "τα PDF και τα embeddings έρχονται από το cache του")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-pdf", action="store_true", help="Χωρίς μετατροπή PDF (και χωρίς σελίδες)")
+    parser.add_argument("--office-instances", type=int, default=1)
+    parser.add_argument("--convert-timeout", type=int, default=180)
+    parser.add_argument("--no-embed", action="store_true", help="Τυχαία vectors αντί για το μοντέλο")
+    parser.add_argument("--factory", default=index_docs.INDEX_FACTORY)
+    parser.add_argument("--vector-storage", choices=sorted(index_docs.VECTOR_CODECS), default="fp32")
+    parser.add_argument("--embed-backend", default=EMBED_BACKEND)
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD)
+    parser.add_argument("--output", help="Αποθήκευση αποτελεσμάτων σε JSON")
+    args = parser.parse_args()
+
+    docs = os.path.abspath(args.docs)
+    n_files = len([f for f in os.listdir(docs) if f.lower().endswith(".docx")])
+    work = args.work or tempfile.mkdtemp(prefix="bench_index_")
+    use_work_dir(work, docs, random_vectors=args.no_embed)
+
+    if args.no_pdf:
+        # Χωρίς LibreOffice και χωρίς κείμενο σελίδων → όλα τα chunks στη σελίδα 1
+        index_docs.convert_to_pdf = lambda docx_path, pdf_dir, timeout=180: os.path.join(
+            pdf_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+        index_docs.load_page_texts = lambda pdf_path: None
+
+    model_seconds = None
+    if args.no_embed:
+        index_docs.load_model = lambda backend=None: RandomEncoder()
+    else:
+        load_model = index_docs.load_model
+
+        def timed_load_model(backend=EMBED_BACKEND):
+            nonlocal model_seconds
+            t0 = time.perf_counter()
+            model = load_model(backend)
+            model_seconds = time.perf_counter() - t0
+            return model
+
+        index_docs.load_model = timed_load_model
+
+    run_args = argparse.Namespace(
+        rebuild=True, workers=args.workers, office_instances=0 if args.no_pdf else args.office_instances,
+        convert_timeout=args.convert_timeout, index_factory=args.factory, vector_storage=args.vector_storage,
+        search_params="", embed_backend=args.embed_backend, dedup_threshold=args.dedup_threshold,
+        prerender_pages="",
+    )
+    t_start = time.perf_counter()
+    result = index_docs.run_index(run_args)
+    total = time.perf_counter() - t_start
+
+    manifest = snapshots.read_manifest(snapshots.current_version()) if result == "published" else {}
+    counts = {"files": n_files, "chunks": manifest.get("chunks", 0), "duplicates": manifest.get("duplicates", 0),
+              "unmatched_pages": 0}
+    if manifest:
+        store = open_meta_store(snapshots.snapshot_path(manifest["version"]))
+        counts["unmatched_pages"] = sum(m.get("page_confidence") == 0.0 for m in store.iter_rows())
+
+    report = {
+        "kind": "index",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "config": {
+            "files": n_files, "factory": args.factory, "vector_storage": args.vector_storage,
+            "chunk_tokens": chunker.CHUNK_TOKENS, "chunk_overlap_tokens": chunker.CHUNK_OVERLAP_TOKENS,
+            "chunker": chunker.CHUNKER_ID, "embed": None if args.no_embed else model_id(args.embed_backend),
+            "pdf": not args.no_pdf, "workers": args.workers, "cpu_count": os.cpu_count(),
+        },
+        "result": result,
+        "counts": counts,
+        "stages": report_stages(counts, model_seconds),
+        "total_seconds": round(total, 3),
+    }
+    print(json.dumps(report["stages"], ensure_ascii=False, indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Αποθηκεύτηκε: {args.output}")
+    if not args.work:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
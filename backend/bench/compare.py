@@ -0,0 +1,69 @@
+"""Σύγκριση δύο αποτελεσμάτων benchmark (bench_index, load_test ή eval_retrieval).
+
+Τυπώνει τη μεταβολή κάθε μέτρησης και βγαίνει με exit code 1 αν κάποια
+χειροτέρεψε πάνω από --threshold τοις εκατό.
+
+    python3 -m bench.compare results/before.json results/after.json --threshold 10
+"""
+import argparse
+import json
+
+
+def metrics(report):
+    """Επίπεδο dict {όνομα: (τιμή, higher_is_better)}."""
+    out = {}
+    if report.get("kind") == "index":
+        for name, stage in report["stages"].items():
+            out[f"{name}.seconds"] = (stage["seconds"], False)
+        out["total_seconds"] = (report["total_seconds"], False)
+    elif report.get("kind") == "ask":
+        out["qps"] = (report["qps"], True)
+        for name, value in report["latency_ms"].items():
+            out[f"latency_ms.{name}"] = (value, False)
+        out["errors"] = (sum(report["errors"].values()), False)
+    elif report.get("kind") == "retrieval":
+        for k, value in report["recall"].items():
+            out[f"recall{k}"] = (value, True)
+        out["mrr"] = (report["mrr"], True)
+        out["qps"] = (report["qps"], True)
+    else:
+        raise SystemExit(f"❌ Άγνωστο είδος αποτελέσματος: {report.get('kind')}")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Σύγκριση δύο JSON αποτελεσμάτων benchmark")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Ανεκτή χειροτέρευση σε %%")
+    args = parser.parse_args()
+
+    with open(args.before, "r", encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, "r", encoding="utf-8") as f:
+        after = json.load(f)
+    if before.get("kind") != after.get("kind"):
+        raise SystemExit("❌ Τα αποτελέσματα δεν είναι του ίδιου είδους")
+
+    old, new = metrics(before), metrics(after)
+    print(f"📊 {before.get('git')} → {after.get('git')}")
+    regressions = []
+    for name in sorted(set(old) & set(new)):
+        (a, higher_is_better), (b, _) = old[name], new[name]
+        if a == 0:
+            change = 0.0 if b == 0 else float("inf")
+        else:
+            change = (b - a) / a * 100
+        worse = -change if higher_is_better else change
+        mark = "❌" if worse > args.threshold else "✅"
+        if worse > args.threshold:
+            regressions.append(name)
+        print(f"{mark} {name:<24} {a:>12} → {b:<12} ({change:+.1f}%)")
+
+    if regressions:
+        raise SystemExit(f"❌ Χειροτέρευση > {args.threshold}%: {', '.join(regressions)}")
+    print("✅ Καμία χειροτέρευση πάνω από το όριο")
+
+
+if __name__ == "__main__":
+    main()
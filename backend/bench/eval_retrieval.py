@@ -0,0 +1,180 @@
+"""Ποιότητα retrieval πάνω σε golden set: recall@k, MRR και ταχύτητα.
+
+Στέλνει τις ερωτήσεις σε batches στο POST /api/search/batch (χωρίς LLM) και
+ελέγχει αν στα top-k εμφανίζονται οι σωστές πηγές. Το golden set είναι JSONL,
+μία ερώτηση ανά γραμμή:
+
+    {"question": "Ποια είναι η προθεσμία ένστασης;",
+     "relevant": [{"filename": "ν_4412_2016.docx", "page": 12},
+                  {"filename": "εγκύκλιος_5.docx", "section": "Άρθρο 3"}],
+     "filters": {"collection": "νόμοι"}}
+
+Κάθε στόχος ταιριάζει με όσα πεδία δίνει (filename χωρίς κατάληξη, page,
+section ως πρόθεμα του section_title, contains ως κομμάτι του κειμένου),
+οπότε δεν εξαρτάται από τα chunk ids και ισχύει και μετά από αλλαγή του
+CHUNK_TOKENS/CHUNK_OVERLAP_TOKENS (chunker.py). Μετράνε και οι "sources" ενός κοινού chunk.
+Σύντομη μορφή: "filename"/"page"/"section" απευθείας στη γραμμή.
+
+    python3 -m bench.eval_retrieval golden.jsonl --url http://localhost:8000 --k 1,3,5,10 --output results/eval.json
+"""
+import argparse
+import json
+import os
+import time
+
+import httpx
+
+from bench import git_revision
+from bench.load_test import percentiles
+from lexical import normalize
+
+TARGET_FIELDS = ("filename", "page", "section", "contains")
+
+
+def load_golden(path):
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            targets = item.get("relevant") or [{key: item[key] for key in TARGET_FIELDS if key in item}]
+            targets = [t for t in targets if t]
+            if not item.get("question") or not targets:
+                raise SystemExit(f"❌ {path}:{n}: χρειάζεται question και relevant (ή filename/page/section)")
+            items.append({"question": item["question"], "targets": targets, "filters": item.get("filters")})
+    return items
+
+
+def _norm(text):
+    """Πεζά, χωρίς τόνους, με απλά κενά (το golden set γράφεται σε μία γραμμή, τα chunks έχουν \n)."""
+    return " ".join(normalize(text).split())
+
+
+def _stem(name):
+    return _norm(os.path.splitext(os.path.basename(name))[0])
+
+
+def matches(target, hit):
+    """Ταιριάζει ο στόχος με το hit ή με κάποια από τις άλλες πηγές του;"""
+    text = _norm(hit.get("text", ""))
+    for loc in [hit] + hit.get("sources", []):
+        if "filename" in target and _stem(target["filename"]) != _stem(loc.get("filename", "")):
+            continue
+        if "page" in target and int(target["page"]) != loc.get("page"):
+            continue
+        if "section" in target and not _norm(loc.get("section_title") or "").startswith(_norm(target["section"])):
+            continue
+        if "contains" in target and _norm(target["contains"]) not in text:
+            continue
+        return True
+    return False
+
+
+def score(item, hits, ks):
+    """recall@k (ποσοστό στόχων στα top-k) και rank του πρώτου σωστού hit (0 = κανένα)."""
+    found = {}  # στόχος → θέση του πρώτου hit που τον καλύπτει
+    for rank, hit in enumerate(hits, 1):
+        for t, target in enumerate(item["targets"]):
+            if t not in found and matches(target, hit):
+                found[t] = rank
+    n = len(item["targets"])
+    recall = {k: sum(1 for rank in found.values() if rank <= k) / n for k in ks}
+    return recall, min(found.values(), default=0)
+
+
+def run(args, items, ks):
+    # Ομάδες ανά φίλτρα (ένα filters ανά request), με σειρά εμφάνισης
+    groups = {}
+    for i, item in enumerate(items):
+        groups.setdefault(json.dumps(item["filters"], sort_keys=True), []).append(i)
+    include_text = any("contains" in t for item in items for t in item["targets"])
+
+    hits = [None] * len(items)
+    latencies, server_ms, info = [], {}, {}
+    with httpx.Client(base_url=args.url, timeout=args.timeout) as client:
+        def search(ids):
+            body = {"questions": [items[i]["question"] for i in ids], "k": max(ks),
+                    "filters": items[ids[0]]["filters"], "include_text": include_text}
+            r = client.post("/api/search/batch", json=body)
+            if r.status_code != 200:
+                raise SystemExit(f"❌ {r.status_code}: {r.text}")
+            return r.json()
+
+        if args.warmup:
+            search(list(range(min(args.batch_size, len(items)))))  # μοντέλο/index ζεστά πριν τη μέτρηση
+
+        t_start = time.perf_counter()
+        for ids in groups.values():
+            for start in range(0, len(ids), args.batch_size):
+                batch = ids[start:start + args.batch_size]
+                t0 = time.perf_counter()
+                data = search(batch)
+                latencies.append(time.perf_counter() - t0)
+                for i, result in zip(batch, data["results"]):
+                    hits[i] = result["hits"]
+                for name, ms in data.get("timings_ms", {}).items():
+                    server_ms[name] = round(server_ms.get(name, 0.0) + ms, 3)
+                info = {"index_version": data["index_version"], "mode": data["mode"]}
+        wall = time.perf_counter() - t_start
+    return hits, latencies, server_ms, info, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recall@k / MRR του retrieval σε golden set")
+    parser.add_argument("golden", help="JSONL με ερωτήσεις και σωστές πηγές")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--k", default="1,3,5,10", help="Τιμές k για recall@k (η μεγαλύτερη ζητείται από τον server)")
+    parser.add_argument("--batch-size", type=int, default=64, help="Ερωτήσεις ανά request")
+    parser.add_argument("--warmup", type=int, default=1, help="Ένα batch πριν τη μέτρηση (0 = όχι)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--show-misses", action="store_true", help="Τύπωσε τις ερωτήσεις χωρίς σωστό hit")
+    parser.add_argument("--output", help="Αποθήκευση αποτελεσμάτων σε JSON")
+    args = parser.parse_args()
+
+    ks = sorted({int(k) for k in args.k.split(",") if k.strip()})
+    items = load_golden(args.golden)
+    print(f"🚀 {len(items)} ερωτήσεις → {args.url}/api/search/batch (batch {args.batch_size}, k={max(ks)})...")
+    hits, latencies, server_ms, info, wall = run(args, items, ks)
+
+    recall = {k: 0.0 for k in ks}
+    reciprocal, misses = 0.0, []
+    for item, item_hits in zip(items, hits):
+        item_recall, first = score(item, item_hits, ks)
+        for k in ks:
+            recall[k] += item_recall[k]
+        if first:
+            reciprocal += 1 / first
+        else:
+            misses.append(item["question"])
+
+    n = len(items)
+    report = {
+        "kind": "retrieval",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "config": {"url": args.url, "golden": os.path.basename(args.golden), "questions": n,
+                   "k": max(ks), "batch_size": args.batch_size, **info},
+        "recall": {f"@{k}": round(recall[k] / n, 4) for k in ks},
+        "mrr": round(reciprocal / n, 4),
+        "misses": len(misses),
+        "wall_seconds": round(wall, 3),
+        "qps": round(n / wall, 2) if wall else 0.0,
+        "batch_latency_ms": percentiles(latencies),
+        "server_ms": server_ms,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.show_misses and misses:
+        print(f"🔍 Χωρίς σωστό hit στα top-{max(ks)}:")
+        for question in misses:
+            print(f"   - {question}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Αποθηκεύτηκε: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Γεννήτρια συνθετικών ελληνικών .docx για benchmarks.
+
+Κάθε αρχείο έχει επικεφαλίδες που πιάνει το read_docx_sections (Heading styles
+και γραμμές "Άρθρο N", "ΕΝΟΤΗΤΑ", "Θέμα", "1.2"), παραγράφους, πίνακες με
+κείμενο που τους προαναγγέλλει ("στον παρακάτω πίνακα") και προαιρετικά πολύ
+μεγάλες ενότητες που ξεπερνούν το CHUNK_TOKENS.
+"""
+import argparse
+import os
+import random
+
+from docx import Document
+
+WORDS = (
+    "ο νόμος ορίζει ότι η αρμόδια υπηρεσία εξετάζει την αίτηση του ενδιαφερομένου εντός προθεσμίας "
+    "τριάντα ημερών από την υποβολή της σύμβαση δημόσιο έργο αναθέτουσα αρχή προσφορά διαγωνισμός "
+    "δικαιολογητικά εγγυητική επιστολή προϋπολογισμός δαπάνη πίστωση φορέας υπουργείο απόφαση "
+    "εγκύκλιος διάταξη παράγραφος εδάφιο τροποποίηση κατάργηση ισχύς δημοσίευση εφημερίδα κυβέρνησης "
+    "υπάλληλος μισθός αποδοχές επίδομα άδεια υπηρεσιακό συμβούλιο πειθαρχικό παράπτωμα κύρωση "
+    "φορολογικός συντελεστής εισόδημα δήλωση προθεσμία πρόστιμο έλεγχος βεβαίωση καταβολή δόση"
+).split()
+
+HEADINGS = [
+    lambda n: f"Άρθρο {n}",
+    lambda n: f"ΑΡΘΡΟ {n} - Ρυθμίσεις για {random.choice(WORDS)}",
+    lambda n: f"Ενότητα {n}: {random.choice(WORDS).capitalize()} και {random.choice(WORDS)}",
+    lambda n: f"Θέμα: {random.choice(WORDS).capitalize()} {random.choice(WORDS)}",
+    lambda n: f"{n}.{random.randint(1, 9)} {random.choice(WORDS).capitalize()}",
+]
+
+
+def sentence(min_words=8, max_words=25):
+    words = random.choices(WORDS, k=random.randint(min_words, max_words))
+    if random.random() < 0.3:
+        words.insert(random.randrange(len(words)), f"ν. {random.randint(1000, 5000)}/{random.randint(1990, 2025)}")
+    if random.random() < 0.3:
+        words.insert(random.randrange(len(words)), f"παρ. {random.randint(1, 12)}")
+    return " ".join(words).capitalize() + "."
+
+
+def paragraph(sentences):
+    return " ".join(sentence() for _ in range(sentences))
+
+
+def add_table(doc, rows, cols):
+    table = doc.add_table(rows=rows, cols=cols)
+    for c in range(cols):
+        table.cell(0, c).text = random.choice(WORDS).capitalize()
+    for r in range(1, rows):
+        for c in range(cols):
+            table.cell(r, c).text = random.choice([
+                f"{random.randint(1, 100000):,} €".replace(",", "."),
+                f"{random.randint(1, 100)}%",
+                " ".join(random.choices(WORDS, k=random.randint(1, 6))),
+            ])
+
+
+def make_document(path, sections, paragraphs, sentences, table_prob, long_prob):
+    doc = Document()
+    doc.add_heading(f"Νόμος {random.randint(1000, 5000)}/{random.randint(1990, 2025)}", level=0)
+    for n in range(1, sections + 1):
+        title = random.choice(HEADINGS)(n)
+        if random.random() < 0.5:
+            doc.add_heading(title, level=2)
+        else:
+            doc.add_paragraph(title)
+        n_paras = paragraphs * (8 if random.random() < long_prob else 1)
+        for _ in range(n_paras):
+            doc.add_paragraph(paragraph(sentences))
+        if random.random() < table_prob:
+            doc.add_paragraph(f"{sentence()} Τα ποσά φαίνονται στον παρακάτω πίνακα:")
+            add_table(doc, rows=random.randint(3, 12), cols=random.randint(2, 5))
+    doc.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Συνθετικό corpus .docx για benchmarks")
+    parser.add_argument("--out", required=True, help="Φάκελος εξόδου")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--sections", type=int, default=30, help="Ενότητες ανά αρχείο")
+    parser.add_argument("--paragraphs", type=int, default=3, help="Παράγραφοι ανά ενότητα")
+    parser.add_argument("--sentences", type=int, default=5, help="Προτάσεις ανά παράγραφο")
+    parser.add_argument("--table-prob", type=float, default=0.2, help="Πιθανότητα πίνακα ανά ενότητα")
+    parser.add_argument("--long-prob", type=float, default=0.05, help="Πιθανότητα πολύ μεγάλης ενότητας")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    for i in range(1, args.files + 1):
+        path = os.path.join(args.out, f"synthetic_{i:05d}.docx")
+        make_document(path, args.sections, args.paragraphs, args.sentences, args.table_prob, args.long_prob)
+    print(f"✅ {args.files} αρχεία στο {args.out}")
+
+
+if __name__ == "__main__":
+    main()
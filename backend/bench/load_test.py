@@ -0,0 +1,132 @@
+"""Load test για το /api/ask: QPS, p50/p95/p99 και σφάλματα.
+
+Στέλνει ερωτήσεις με σταθερό αριθμό ταυτόχρονων clients (closed loop) για
+συγκεκριμένο αριθμό αιτημάτων ή διάρκεια. Οι πρώτες --warmup απαντήσεις δεν
+μετράνε.
+
+    python3 -m bench.load_test --url http://localhost:8000 --concurrency 16 --duration 60
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+
+import httpx
+import numpy as np
+
+from bench import git_revision
+
+DEFAULT_QUESTIONS = [
+    "Ποια είναι η προθεσμία υποβολής της αίτησης;",
+    "Τι προβλέπει το άρθρο 12 για τις αποδοχές;",
+    "Ποια δικαιολογητικά απαιτούνται για τον διαγωνισμό;",
+    "Πότε επιβάλλεται πρόστιμο για εκπρόθεσμη δήλωση;",
+    "Ποιο είναι το ύψος της εγγυητικής επιστολής;",
+    "Ποιος είναι αρμόδιος για τον πειθαρχικό έλεγχο;",
+    "Πώς γίνεται η καταβολή σε δόσεις;",
+    "Τι ισχύει για την άδεια των υπαλλήλων;",
+]
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ms = np.array(samples) * 1000
+    return {
+        "p50": round(float(np.percentile(ms, 50)), 2),
+        "p95": round(float(np.percentile(ms, 95)), 2),
+        "p99": round(float(np.percentile(ms, 99)), 2),
+        "max": round(float(ms.max()), 2),
+        "mean": round(float(ms.mean()), 2),
+    }
+
+
+async def run(args, questions):
+    latencies, errors = [], {}
+    counter = itertools.count()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        async def worker():
+            while True:
+                n = next(counter)
+                if deadline is None and n >= args.requests + args.warmup:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                body = {"question": random.choice(questions)}
+                if args.filename:
+                    body["filters"] = {"filename": args.filename}
+                t0 = time.perf_counter()
+                try:
+                    r = await client.post(args.path, json=body)
+                    status = r.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - t0
+                if n < args.warmup:
+                    continue
+                if status == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - t_start
+    return latencies, errors, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test για το /api/ask")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/ask")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="Σύνολο αιτημάτων (αγνοείται με --duration)")
+    parser.add_argument("--duration", type=float, help="Διάρκεια σε δευτερόλεπτα")
+    parser.add_argument("--warmup", type=int, default=10, help="Αιτήματα που δεν μετράνε")
+    parser.add_argument("--questions", help="Αρχείο με ερωτήσεις (μία ανά γραμμή)")
+    parser.add_argument("--filename", help="Φίλτρο αρχείου σε κάθε ερώτηση")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Αποθήκευση αποτελεσμάτων σε JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+
+    print(f"🚀 {args.url}{args.path} με {args.concurrency} ταυτόχρονους clients...")
+    latencies, errors, wall = asyncio.run(run(args, questions))
+    ok = len(latencies)
+    report = {
+        "kind": "ask",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "config": {
+            "url": args.url, "path": args.path, "concurrency": args.concurrency,
+            "questions": len(questions), "filename": args.filename, "cpu_count": os.cpu_count(),
+        },
+        "requests": ok + sum(errors.values()),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "qps": round(ok / wall, 2) if wall else 0.0,
+        "latency_ms": percentiles(latencies),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Αποθηκεύτηκε: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
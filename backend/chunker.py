@@ -0,0 +1,198 @@
+"""Chunking ενοτήτων με μέτρηση σε tokens του tokenizer του μοντέλου embeddings.
+
+Τα chunks μετρημένα σε λέξεις (500 λέξεις) ξεπερνούσαν συχνά το όριο των 512
+tokens του e5 και κόβονταν σιωπηλά στο encode. Εδώ κάθε κομμάτι κειμένου
+γίνεται tokenize μία φορά (με offsets) και τα όρια των chunks βρίσκονται με
+ένα πέρασμα πάνω στους δείκτες των tokens:
+
+  - κάθε chunk χωράει ακριβώς στο CHUNK_TOKENS (μαζί με το "passage: " και
+    τα special tokens του μοντέλου),
+  - το τέλος προτιμά τέλος πρότασης, αλλιώς τέλος λέξης (ποτέ μέση λέξης),
+  - το επόμενο chunk ξεκινά CHUNK_OVERLAP_TOKENS tokens πριν (σε αρχή λέξης),
+  - πίνακες ενώνονται με το κείμενο που τους προαναγγέλλει ("στον παρακάτω
+    πίνακα:") όπως πριν· όσοι δεν χωρούν σπάνε ανά γραμμές με επανάληψη της
+    επικεφαλίδας.
+
+Το αποτέλεσμα εξαρτάται μόνο από το κείμενο, τον tokenizer και τις
+παραμέτρους· το CHUNKER_ID μπαίνει στο chunk cache ώστε μια αλλαγή τους να
+ξαναφτιάχνει τα chunks.
+"""
+import hashlib
+import json
+import os
+import re
+
+from embedding import HF_CACHE, MODEL_NAME
+
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "480"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "96"))
+MIN_CHUNK_WORDS = 5
+PASSAGE_PREFIX = "passage: "
+CHUNKER_VERSION = 1
+
+TABLE_MARK = "📊 Πίνακας:"
+JOIN_TRIGGERS = ["πίνακα", "πίνακας", "κάτωθι πίνακα", "παρακάτω πίνακα", "ακόλουθο πίνακα", "βλέπε πίνακα", "πίνακα:"]
+SENTENCE_END = re.compile(r"[\.\!\?;:](?=\s)|\n\s*\n")
+
+CHUNKER_ID = hashlib.sha1(json.dumps(
+    {"model": MODEL_NAME, "tokens": CHUNK_TOKENS, "overlap": CHUNK_OVERLAP_TOKENS, "version": CHUNKER_VERSION},
+    sort_keys=True,
+).encode("utf-8")).hexdigest()[:10]
+
+# Ο tokenizer φορτώνεται και μέσα στους workers του ProcessPool
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+_tokenizer = None
+
+
+def get_tokenizer():
+    """Ο (fast) tokenizer του μοντέλου, ένας ανά process."""
+    global _tokenizer
+    if _tokenizer is None:
+        from transformers import AutoTokenizer
+        _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, cache_dir=HF_CACHE)
+    return _tokenizer
+
+
+class TokenChunker:
+    def __init__(self, tokenizer=None, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+        self.tokenizer = tokenizer or get_tokenizer()
+        # Χώρος για "passage: " και [CLS]/[SEP]: το chunk δεν κόβεται ποτέ στο encode
+        reserved = len(self._encode(PASSAGE_PREFIX)[0]) + self.tokenizer.num_special_tokens_to_add(False)
+        limit = getattr(self.tokenizer, "model_max_length", 512)
+        if not limit or limit > 100_000:  # "απεριόριστο" σε ορισμένους tokenizers
+            limit = 512
+        self.max_tokens = max(16, min(max_tokens, limit - reserved))
+        self.overlap = max(0, min(overlap_tokens, self.max_tokens // 2))
+
+    def _encode(self, text):
+        enc = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return enc["input_ids"], enc["offset_mapping"]
+
+    def count(self, text):
+        return len(self._encode(text)[0])
+
+    # -------------------- Κείμενο --------------------
+    def split_text(self, text):
+        """Χωρίζει ένα κομμάτι κειμένου σε chunks ≤ max_tokens. Γραμμικό στο πλήθος tokens."""
+        ids, offsets = self._encode(text)
+        n = len(ids)
+        if n == 0:
+            return []
+        if n <= self.max_tokens:
+            return [text.strip()]
+
+        # Αρχή λέξης: το token ξεκινά μετά από κενό (ή είναι το πρώτο)
+        word_start = [True] * n
+        for i in range(1, n):
+            word_start[i] = offsets[i][0] > offsets[i - 1][1] or text[offsets[i][0] - 1:offsets[i][0]].isspace()
+
+        # sent_end[i]: το token i-1 κλείνει πρόταση → δυνατό τέλος chunk πριν το token i
+        sent_end = [False] * (n + 1)
+        ends = [m.end() for m in SENTENCE_END.finditer(text)]
+        j = 0
+        for i in range(1, n):
+            while j < len(ends) and ends[j] <= offsets[i - 1][0]:
+                j += 1
+            if j < len(ends) and ends[j] <= offsets[i][0]:
+                sent_end[i] = True
+
+        # Τελευταίο σημείο κοπής ≤ i (πρόταση / λέξη), σε ένα πέρασμα
+        last_sent, last_word = [0] * (n + 1), [0] * (n + 1)
+        for i in range(1, n + 1):
+            at_word = i == n or word_start[i]
+            last_word[i] = i if at_word else last_word[i - 1]
+            last_sent[i] = i if (i == n or sent_end[i]) else last_sent[i - 1]
+
+        chunks = []
+        start = 0
+        while start < n:
+            end = min(start + self.max_tokens, n)
+            if end < n:
+                # Προτίμηση σε τέλος πρότασης αν δεν μικραίνει πολύ το chunk, αλλιώς τέλος λέξης
+                if last_sent[end] - start >= self.max_tokens // 2:
+                    end = last_sent[end]
+                elif last_word[end] > start:
+                    end = last_word[end]
+            piece = text[offsets[start][0]:offsets[end - 1][1]].strip()
+            # Το κομμάτι ξανα-tokenized μπορεί να διαφέρει κατά 1-2 tokens στα άκρα → ακριβής έλεγχος
+            while end - start > 1 and self.count(piece) > self.max_tokens:
+                end = last_word[end - 1] if last_word[end - 1] > start else end - 1
+                piece = text[offsets[start][0]:offsets[end - 1][1]].strip()
+            chunks.append(piece)
+            if end >= n:
+                break
+            nxt = max(end - self.overlap, start + 1)
+            while nxt < end and not word_start[nxt]:
+                nxt += 1
+            start = nxt
+        return chunks
+
+    # -------------------- Πίνακες --------------------
+    def split_table(self, table, intro=""):
+        """Πίνακας σε chunks: ολόκληρος αν χωράει, αλλιώς ομάδες γραμμών με την επικεφαλίδα σε καθεμία.
+           Το intro (η πρόταση που τον προαναγγέλλει) μπαίνει στην αρχή του πρώτου.
+        """
+        lines = table.strip().split("\n")
+        head = lines[:3] if len(lines) >= 3 else lines  # "📊 Πίνακας:", επικεφαλίδα, ---
+        rows = lines[len(head):]
+        head_text = "\n".join(head)
+        prefix = intro.rstrip() + "\n\n" if intro else ""
+
+        chunks, cur, cur_tokens = [], [], self.count(prefix + head_text)
+        for row in rows:
+            row_tokens = self.count(row) + 1
+            if cur and cur_tokens + row_tokens > self.max_tokens:
+                chunks.append(prefix + "\n".join(head + cur))
+                prefix, cur, cur_tokens = "", [], self.count(head_text)
+            cur.append(row)
+            cur_tokens += row_tokens
+        chunks.append(prefix + "\n".join(head + cur))
+
+        # Γραμμή που μόνη της δεν χωράει → σπάει σαν κείμενο
+        out = []
+        for c in chunks:
+            out.extend(self.split_text(c) if self.count(c) > self.max_tokens else [c])
+        return out
+
+    # -------------------- Ενότητα --------------------
+    def chunk_section(self, section_text):
+        if not section_text:
+            return []
+        parts = re.split(f"(?={TABLE_MARK})", section_text)
+        chunks = []
+        prev_part = ""
+
+        for part in parts:
+            part = part.strip()
+            if not part:
+                continue
+            if part.startswith(TABLE_MARK):
+                if prev_part and any(trig in prev_part.lower() for trig in JOIN_TRIGGERS):
+                    joined = prev_part.rstrip() + "\n\n" + part
+                    if self.count(joined) <= self.max_tokens:
+                        chunks[-1] = joined
+                    else:
+                        # Δεν χωράει μαζί: ο πίνακας κρατά την τελευταία πρόταση που τον εισάγει
+                        intro = re.split(r"(?<=[\.\!\?;])\s+", prev_part)[-1]
+                        if self.count(intro) > self.max_tokens // 4:
+                            intro = ""
+                        chunks.extend(self.split_table(part, intro))
+                    prev_part = ""
+                else:
+                    chunks.extend(self.split_table(part))
+                continue
+            part_chunks = self.split_text(part)
+            chunks.extend(part_chunks)
+            prev_part = part_chunks[-1] if part_chunks else ""
+        return [c for c in chunks if len(c.split()) > MIN_CHUNK_WORDS]
+
+
+_chunker = None
+
+
+def chunk_section(section_text):
+    """Chunks μιας ενότητας με τον tokenizer του μοντέλου (ένας chunker ανά process)."""
+    global _chunker
+    if _chunker is None:
+        _chunker = TokenChunker()
+    return _chunker.chunk_section(section_text)
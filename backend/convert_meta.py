@@ -0,0 +1,68 @@
+"""Μετατροπή υπαρχόντων docs_meta.json σε SQLite metadata store (εκτελείται μία φορά).
+
+- Snapshots στο /data/snapshots που έχουν ακόμα docs_meta.json αποκτούν docs_meta.sqlite.
+- Αν δεν υπάρχει κανένα snapshot αλλά υπάρχουν τα παλιά /data/faiss.index +
+  /data/docs_meta.json, δημιουργείται από αυτά νέο snapshot και γίνεται ενεργό.
+"""
+import argparse
+import json
+import os
+import shutil
+
+import snapshots
+from meta_store import META_DB_NAME, write_meta_store
+
+LEGACY_INDEX_FILE = os.path.join(snapshots.DATA_DIR, "faiss.index")
+LEGACY_META_FILE = os.path.join(snapshots.DATA_DIR, "docs_meta.json")
+
+
+def convert_snapshot(path, keep_json=False):
+    json_path = os.path.join(path, snapshots.META_NAME)
+    db_path = os.path.join(path, META_DB_NAME)
+    if not os.path.exists(json_path) or os.path.exists(db_path):
+        return False
+    with open(json_path, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    tmp = db_path + ".tmp"
+    write_meta_store(tmp, metadata)
+    os.replace(tmp, db_path)
+    if not keep_json:
+        os.remove(json_path)
+    print(f"✅ {os.path.basename(path)}: {len(metadata)} chunks → {META_DB_NAME}")
+    return True
+
+
+def convert_legacy():
+    with open(LEGACY_META_FILE, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    if not isinstance(metadata, list):
+        raise SystemExit("❌ Το docs_meta.json δεν είναι λίστα chunks (παλιό reindex.py;) – τρέξε το index_docs.py")
+    version = snapshots.new_version()
+    staging = snapshots.staging_dir(version)
+    shutil.copy2(LEGACY_INDEX_FILE, os.path.join(staging, snapshots.INDEX_NAME))
+    write_meta_store(os.path.join(staging, META_DB_NAME), metadata)
+    snapshots.publish(staging, version, {"chunks": len(metadata), "converted_from": "legacy"})
+    print(f"✅ Νέο snapshot {version} από τα παλιά faiss.index/docs_meta.json ({len(metadata)} chunks)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="docs_meta.json → docs_meta.sqlite")
+    parser.add_argument("--keep-json", action="store_true", help="Να μη διαγραφεί το docs_meta.json των snapshots")
+    args = parser.parse_args()
+
+    converted = 0
+    if os.path.isdir(snapshots.SNAPSHOT_DIR):
+        for version in sorted(os.listdir(snapshots.SNAPSHOT_DIR)):
+            if not version.startswith("."):
+                converted += convert_snapshot(snapshots.snapshot_path(version), keep_json=args.keep_json)
+
+    if snapshots.current_version() is None and os.path.exists(LEGACY_INDEX_FILE) and os.path.exists(LEGACY_META_FILE):
+        convert_legacy()
+        converted += 1
+
+    if not converted:
+        print("ℹ️ Δεν βρέθηκε τίποτα για μετατροπή.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Εντοπισμός σχεδόν ίδιων chunks (MinHash + LSH) κατά το indexing.
+
+Κωδικοποιημένα κείμενα και τροποποιήσεις επαναλαμβάνουν τα ίδια άρθρα σχεδόν
+αυτολεξεί σε πολλά αρχεία. Κάθε chunk γίνεται σύνολο από shingles λέξεων
+(κανονικοποιημένων όπως στο BM25) και παίρνει υπογραφή MinHash· το LSH (ζώνες
+της υπογραφής) δίνει υποψήφια ζεύγη σε ένα πέρασμα, που επιβεβαιώνονται με την
+εκτίμηση Jaccard από τις υπογραφές. Δύο chunks δεν ενώνονται ποτέ αν διαφέρουν
+οι αριθμοί ή οι αναφορές τους (lexical.reference_tokens): μια τροποποίηση που
+αλλάζει μόνο "30 ημερών" σε "60 ημερών" μοιάζει σχεδόν αυτολεξεί, αλλά λέει
+άλλο πράγμα και πρέπει να μείνει στο index.
+
+Το πρώτο chunk (με τη σειρά των αρχείων) μένει στο index και τα διπλότυπά του
+δεν αποθηκεύονται· στο "sources" του γράφονται όλα τα αρχεία/σελίδες όπου
+εμφανίζεται. Στη μνήμη μένουν μόνο οι υπογραφές των μοναδικών chunks.
+"""
+import hashlib
+import os
+import zlib
+
+import numpy as np
+
+from lexical import TOKEN_RE, normalize, reference_tokens
+
+# Jaccard (σε shingles λέξεων) από το οποίο δύο chunks θεωρούνται ίδια· 0 = χωρίς dedup.
+# Σχεδόν αυτολεξεί: σε κείμενα τροποποιήσεων μια λέξη διαφορά μπορεί να αλλάζει το νόημα.
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.95"))
+DEDUP_PERMS = 64
+SHINGLE_WORDS = 5
+SOURCE_FIELDS = ("filename", "pdf_path", "page", "section_title", "section_idx")
+
+_rng = np.random.default_rng(20240601)  # σταθερές παράμετροι: ίδιες υπογραφές σε κάθε εκτέλεση
+_A = _rng.integers(1, 2**63, DEDUP_PERMS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, DEDUP_PERMS, dtype=np.uint64)
+
+
+def dedup_settings(threshold):
+    return {"threshold": threshold, "perms": DEDUP_PERMS, "shingle": SHINGLE_WORDS, "refs": True}
+
+
+def lsh_bands(threshold, perms=DEDUP_PERMS):
+    """(ζώνες, γραμμές ανά ζώνη) με κατώφλι LSH (1/b)^(1/r) όσο πιο κοντά γίνεται κάτω από το threshold,
+       ώστε να χάνονται λίγα ζεύγη· τα υποψήφια επιβεβαιώνονται μετά.
+    """
+    best = (perms, 1)
+    for rows in range(1, perms + 1):
+        if perms % rows:
+            continue
+        bands = perms // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def shingles(text):
+    words = TOKEN_RE.findall(normalize(text))
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text):
+    """Υπογραφή MinHash (DEDUP_PERMS × uint32) με multiply-shift hashing πάνω στο crc32 κάθε shingle."""
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64)
+    hashed = (x[:, None] * _A[None, :] + _B[None, :]) >> np.uint64(32)  # wrap-around mod 2^64
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def references_key(text):
+    """Σταθερό 64-bit αποτύπωμα των αριθμών/αναφορών του κειμένου (ίσο μόνο αν είναι ίδιες)."""
+    joined = "\x00".join(sorted(reference_tokens(text)))
+    return int.from_bytes(hashlib.blake2b(joined.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def source_of(entry):
+    return {k: entry.get(k) for k in SOURCE_FIELDS}
+
+
+class NearDuplicateIndex:
+    """LSH πάνω στις υπογραφές των μοναδικών chunks."""
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, perms=DEDUP_PERMS):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_bands(threshold, perms)
+        self.tables = [{} for _ in range(self.bands)]
+        self.signatures = np.empty((1024, perms), dtype=np.uint32)
+        self.refs = np.empty(1024, dtype=np.uint64)  # references_key κάθε μοναδικού
+        self.count = 0
+
+    def _band_keys(self, sig):
+        return [sig[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def add(self, text):
+        """Id του μοναδικού chunk που μοιάζει με το text, αλλιώς None (και το text γίνεται νέο μοναδικό)."""
+        sig = minhash(text)
+        refs = np.uint64(references_key(text))
+        keys = self._band_keys(sig)
+        seen = set()
+        for table, key in zip(self.tables, keys):
+            for cand in table.get(key, ()):
+                if cand in seen:
+                    continue
+                seen.add(cand)
+                if self.refs[cand] == refs and np.mean(self.signatures[cand] == sig) >= self.threshold:
+                    return cand
+        if self.count == len(self.signatures):
+            self.signatures = np.concatenate([self.signatures, np.empty_like(self.signatures)])
+            self.refs = np.concatenate([self.refs, np.empty_like(self.refs)])
+        uid = self.count
+        self.signatures[uid] = sig
+        self.refs[uid] = refs
+        self.count += 1
+        for table, key in zip(self.tables, keys):
+            table.setdefault(key, []).append(uid)
+        return None
+
+
+class Duplicates:
+    """Ποιες θέσεις της ροής chunks (με τη σειρά του iter_metadata) είναι διπλότυπα
+       και ποιες πηγές (αρχεία/σελίδες) συγκεντρώνει κάθε μοναδικό chunk.
+    """
+
+    def __init__(self, threshold=DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.skip = set()     # θέσεις που είναι διπλότυπα
+        self.sources = {}     # θέση μοναδικού chunk → [πηγές των διπλοτύπων του]
+
+    def __len__(self):
+        return len(self.skip)
+
+    def scan(self, entries):
+        """Περνά τα chunks αυτούσια (ώστε να μπαίνει σε υπάρχον πέρασμα) και καταγράφει τα διπλότυπα."""
+        if not self.threshold:
+            yield from entries
+            return
+        lsh = NearDuplicateIndex(self.threshold)
+        positions = []  # id μοναδικού → θέση στη ροή
+        for pos, entry in enumerate(entries):
+            uid = lsh.add(entry.get("text") or "")
+            if uid is None:
+                positions.append(pos)
+            else:
+                self.skip.add(pos)
+                self.sources.setdefault(positions[uid], []).append(source_of(entry))
+            yield entry
+
+    def apply(self, entries):
+        """Τα μοναδικά chunks (συνεχόμενα ids), με "sources" = όλες οι εμφανίσεις τους όπου υπάρχουν διπλότυπα."""
+        for pos, entry in enumerate(entries):
+            if pos in self.skip:
+                continue
+            if pos in self.sources:
+                entry = dict(entry, sources=[source_of(entry)] + self.sources[pos])
+            yield entry
@@ -0,0 +1,63 @@
+"""Φόρτωση του μοντέλου embeddings, κοινή για index_docs.py και api/ask.py.
+
+EMBED_BACKEND:
+  - torch      : πλήρες fp32 PyTorch μοντέλο (default)
+  - int8       : PyTorch με dynamic int8 quantization στα Linear layers
+  - onnx       : ONNX Runtime (sentence-transformers >= 3.2, optimum[onnxruntime])
+  - onnx-int8  : ONNX Runtime με dynamic int8 quantized μοντέλο (γίνεται export μία φορά)
+
+Τα embeddings διαφορετικών backends δεν είναι ίδια, οπότε το model_id()
+μπαίνει στο κλειδί του embedding cache και στο manifest του snapshot. Για το
+onnx-int8 περιέχει και το ONNX_QUANT_CONFIG (άλλο quantized μοντέλο ανά config).
+"""
+import os
+
+MODEL_NAME = "intfloat/multilingual-e5-base"
+HF_CACHE = "/root/.cache/huggingface"
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+ONNX_QUANT_CONFIG = os.getenv("ONNX_QUANT_CONFIG", "avx2")  # arm64 | avx2 | avx512 | avx512_vnni
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+
+
+def model_id(backend=EMBED_BACKEND):
+    if backend == "torch":
+        return MODEL_NAME
+    if backend == "onnx-int8":
+        return f"{MODEL_NAME}@onnx-int8:{ONNX_QUANT_CONFIG}"
+    return f"{MODEL_NAME}@{backend}"
+
+
+def backend_for(model):
+    """Το backend ενός model_id (π.χ. από το manifest), None αν δεν αντιστοιχεί σε κανένα."""
+    return next((b for b in BACKENDS if model_id(b) == model), None)
+
+
+def _onnx_int8_model():
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    path = os.path.join(HF_CACHE, "onnx-int8", MODEL_NAME.replace("/", "--"))
+    file_name = f"onnx/model_qint8_{ONNX_QUANT_CONFIG}.onnx"
+    if not os.path.exists(os.path.join(path, file_name)):
+        print(f"⚙️ Export ONNX int8 ({ONNX_QUANT_CONFIG}) στο {path} ...")
+        model = SentenceTransformer(MODEL_NAME, backend="onnx", cache_folder=HF_CACHE)
+        model.save(path)
+        export_dynamic_quantized_onnx_model(model, ONNX_QUANT_CONFIG, path)
+    return SentenceTransformer(path, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def load_model(backend=EMBED_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Άγνωστο EMBED_BACKEND: {backend} (επιτρέπονται: {', '.join(BACKENDS)})")
+    # import εδώ: το torch αργεί να φορτώσει και το API πρέπει να ξεκινά αμέσως
+    from sentence_transformers import SentenceTransformer
+
+    print(f"🔍 Φόρτωση μοντέλου embeddings ({model_id(backend)})...")
+    if backend == "torch":
+        return SentenceTransformer(MODEL_NAME, cache_folder=HF_CACHE)
+    if backend == "int8":
+        import torch
+        model = SentenceTransformer(MODEL_NAME, cache_folder=HF_CACHE, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(MODEL_NAME, backend="onnx", cache_folder=HF_CACHE)
+    return _onnx_int8_model()
@@ -4,27 +4,153 @@ import hashlib
 import argparse
 from pathlib import Path
 from docx import Document
-from sentence_transformers import SentenceTransformer
 import numpy as np
 import faiss
 import re
+from fnmatch import fnmatch
+from bisect import bisect_right
 import subprocess
+import sqlite3
+import shutil
+import signal
+import sys
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import fitz
+import threading
+import uuid
+from pdf_convert import convert_many
+import snapshots
+from embedding import BACKENDS, EMBED_BACKEND, load_model, model_id
+from meta_store import META_DB_NAME, MetaStoreWriter
+from lexical import build_bm25, lexical_text
+from metrics import INDEX_METRICS_FILE, Counter, Gauge, Histogram, Registry
+from chunker import CHUNKER_ID, chunk_section
+from dedup import DEDUP_THRESHOLD, Duplicates, dedup_settings
+from page_render import FORMATS, PageCache, webp_available
 
 # -------------------- Config --------------------
 DATA_DIR = "/data"
 DOCS_PATH = os.path.join(DATA_DIR, "docs")
 PDF_PATH = os.path.join(DATA_DIR, "pdfs")
-INDEX_FILE = os.path.join(DATA_DIR, "faiss.index")
-META_FILE = os.path.join(DATA_DIR, "docs_meta.json")
-CACHE_FILE = os.path.join(DATA_DIR, "index_cache.json")
-
-CHUNK_SIZE = 500
-CHUNK_OVERLAP = 150
+CACHE_FILE = os.path.join(DATA_DIR, "index_cache.json")  # παλιά μορφή, μεταφέρεται στο CHUNK_CACHE_DIR
+# Chunks + σελίδες ανά .docx (ένα JSON ανά αρχείο, ώστε να μη φορτώνεται όλο το corpus μαζί)
+CHUNK_CACHE_DIR = os.path.join(DATA_DIR, "chunk_cache")
+# Προαιρετικά collections: {"tag": ["αρχείο.docx", "ΦΕΚ_*.docx", ...]}
+COLLECTIONS_FILE = os.path.join(DOCS_PATH, "collections.json")
+EMBED_CACHE_FILE = os.path.join(DATA_DIR, "embed_cache.sqlite")
+
+# Μοντέλο + backend (torch / int8 / onnx / onnx-int8) όπως στο embedding.py
+MODEL_ID = model_id()
+
+# 🔎 Τύπος FAISS index (factory string, π.χ. "Flat", "HNSW32,Flat", "IVF1024,Flat", "IVF1024,PQ48")
+# και παράμετροι αναζήτησης που αποθηκεύονται μαζί με το snapshot (π.χ. "nprobe=16", "efSearch=64")
+INDEX_FACTORY = os.getenv("INDEX_FACTORY", "Flat")
+INDEX_SEARCH_PARAMS = os.getenv("INDEX_SEARCH_PARAMS", "")
+TRAIN_SAMPLE = 100_000
+# Αποθήκευση vectors: fp32 (όπως είναι), fp16 ή sq8 (scalar quantization 8-bit)
+VECTOR_STORAGE = os.getenv("VECTOR_STORAGE", "fp32")
+VECTOR_CODECS = {"fp32": "Flat", "fp16": "SQfp16", "sq8": "SQ8"}
+
+# Τα νέα embeddings υπολογίζονται και μπαίνουν στο cache ανά batch (πρόοδος + τίποτα χαμένο σε ακύρωση)
+EMBED_BATCH = 256
+
+# 🖼️ Σελίδες που αναφέρουν τα chunks, έτοιμες για το GET /api/pdf/.../page/N (π.χ. "png" ή "pdf,png")
+PRERENDER_PAGES = os.getenv("PRERENDER_PAGES", "")
 
 # 🗂️ Page cache folder
 PAGE_CACHE_DIR = os.path.join(DATA_DIR, "page_cache")
-os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+
+# -------------------- Metrics --------------------
+# Δικό του registry: γράφεται στο INDEX_METRICS_FILE και το API το προσθέτει στο /metrics
+INDEX_METRICS = Registry()
+PHASE_SECONDS = Histogram("index_phase_seconds", "Διάρκεια κάθε φάσης του index_docs", ["phase"],
+                          registry=INDEX_METRICS)
+FILE_STAGE_SECONDS = Histogram("index_file_stage_seconds", "Χρόνος ανά αρχείο και στάδιο (pdf, parse, chunk, pages)",
+                               ["stage"], registry=INDEX_METRICS)
+FILES_TOTAL = Counter("index_files_total", "Αρχεία ανά αποτέλεσμα (processed, cached, removed)", ["result"],
+                      registry=INDEX_METRICS)
+EMBED_CACHE_TOTAL = Counter("index_embed_cache_total", "Embedding cache hits / misses", ["result"],
+                            registry=INDEX_METRICS)
+CHUNKS_GAUGE = Gauge("index_chunks", "Chunks της τελευταίας εκτέλεσης", registry=INDEX_METRICS)
+DUPLICATES_GAUGE = Gauge("index_duplicate_chunks", "Σχεδόν ίδια chunks που δεν μπήκαν στο index", registry=INDEX_METRICS)
+LAST_RUN = Gauge("index_last_run_timestamp_seconds", "Πότε τελείωσε η τελευταία εκτέλεση", ["result"],
+                 registry=INDEX_METRICS)
+PHASE_TIMINGS = {}
+
+@contextmanager
+def phase(name):
+    """Χρονομέτρηση φάσης: histogram + PHASE_TIMINGS (τυπώνεται και μπαίνει στο manifest)."""
+    t0 = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - t0
+    PHASE_SECONDS.observe(elapsed, phase=name)
+    # Χωρίς round εδώ: embed / index_build αθροίζονται ανά batch (λίγα ms το καθένα)
+    PHASE_TIMINGS[name] = PHASE_TIMINGS.get(name, 0.0) + elapsed
+
+def write_index_metrics(result):
+    LAST_RUN.set(time.time(), result=result)
+    try:
+        INDEX_METRICS.write_textfile(INDEX_METRICS_FILE)
+    except OSError as e:
+        print(f"⚠️ Δεν γράφτηκαν τα metrics ({INDEX_METRICS_FILE}): {e}")
+    if PHASE_TIMINGS:
+        print("⏱️ Χρόνοι φάσεων: " + ", ".join(f"{k}={v:.2f}s" for k, v in PHASE_TIMINGS.items()))
+
+# -------------------- Πρόοδος --------------------
+class Progress:
+    """Πρόοδος της εκτέλεσης σε JSON (--progress-file) για το GET /api/reindex/progress.
+       Το ETA αφορά το τρέχον στάδιο και βγαίνει από τον ρυθμό του μέχρι τώρα.
+    """
+    # στάδιο → (πεδίο "έγιναν", πεδίο "σύνολο")
+    COUNTERS = {"pdf": ("pdf_done", "pdf_total"), "files": ("files_done", "files_total"),
+                "embedding": ("chunks_embedded", "chunks_total"), "prerender": ("pages_done", "pages_total")}
+    FINISHED = {"published", "unchanged", "empty"}  # τελικά στάδια του run_index: ETA 0
+
+    def __init__(self, path=None, interval=1.0):
+        self.path = path
+        self.interval = interval
+        now = time.time()
+        self.state = {"stage": "starting", "started_at": now, "updated_at": now, "eta_s": None,
+                      "files_total": 0, "files_done": 0, "pdf_total": 0, "pdf_done": 0,
+                      "chunks_total": 0, "chunks_embedded": 0, "chunks_encoded": 0,
+                      "pages_total": 0, "pages_done": 0}
+        self._stage_started, self._stage_base, self._written = now, 0, 0.0
+        self._lock = threading.Lock()  # το καλούν και τα threads της μετατροπής PDF
+
+    def stage(self, name, **values):
+        self.state["stage"] = name
+        self.state.update(values)
+        done_key = self.COUNTERS.get(name, (None,))[0]
+        self._stage_started, self._stage_base = time.time(), self.state.get(done_key, 0)
+        self.update(force=True)
+
+    def update(self, force=False, **values):
+        if not self.path:
+            return
+        with self._lock:
+            self.state.update(values)
+            now = time.time()
+            self.state["updated_at"] = now
+            self.state["eta_s"] = self._eta(now)
+            if force or now - self._written >= self.interval:
+                snapshots.write_json_atomic(self.path, self.state)
+                self._written = now
+
+    def _eta(self, now):
+        if self.state["stage"] in self.FINISHED:
+            return 0.0
+        keys = self.COUNTERS.get(self.state["stage"])
+        if keys is None:
+            return None
+        done, total = self.state[keys[0]], self.state[keys[1]]
+        rate = (done - self._stage_base) / max(now - self._stage_started, 1e-6)
+        if done >= total:
+            return 0.0
+        return round((total - done) / rate, 1) if rate > 0 else None
+
+PROGRESS = Progress()
 
 # -------------------- Helpers --------------------
 def get_file_hash(filepath):
@@ -132,144 +258,325 @@ def read_docx_sections(filepath):
         sections = [{"title": None, "text": all_text}]
     return sections
 
-def chunk_section_text(section_text, max_words=500, overlap_words=100):
-    if not section_text:
-        return []
-    parts = re.split(r'(?=📊 Πίνακας:)', section_text)
-    chunks = []
-    prev_part = ""
-    join_triggers = ["πίνακα", "πίνακας", "κάτωθι πίνακα", "παρακάτω πίνακα", "ακόλουθο πίνακα", "βλέπε πίνακα", "πίνακα:"]
-
-    for part in parts:
-        part = part.strip()
-        if not part:
-            continue
-        if part.startswith("📊 Πίνακας:"):
-            if prev_part and any(trig in prev_part.lower() for trig in join_triggers):
-                prev_part = prev_part.rstrip() + "\n\n" + part.strip()
-                chunks[-1] = prev_part
-                prev_part = ""
-            else:
-                chunks.append(part)
-            continue
-        sentences = re.split(r'(?<=[\.\!\?])\s+', part)
-        cur, cur_count = [], 0
-        for s in sentences:
-            wcount = len(s.split())
-            if cur_count + wcount > max_words and cur:
-                joined = " ".join(cur).strip()
-                chunks.append(joined)
-                tail = " ".join(" ".join(cur).split()[-overlap_words:])
-                cur = [tail, s]
-                cur_count = len(tail.split()) + wcount
-            else:
-                cur.append(s)
-                cur_count += wcount
-        if cur:
-            joined = " ".join(cur).strip()
-            chunks.append(joined)
-            prev_part = joined
-    chunks = [c for c in chunks if len(c.split()) > 5]
-    return chunks
-
-def convert_to_pdf(docx_path, pdf_dir):
+def convert_to_pdf(docx_path, pdf_dir, timeout=180):
     os.makedirs(pdf_dir, exist_ok=True)
     pdf_file = os.path.join(pdf_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
     if not os.path.exists(pdf_file):
         print(f"⚙️ Μετατροπή σε PDF: {os.path.basename(docx_path)} ...")
         try:
+            # Ξεχωριστό profile ανά process ώστε παράλληλα instances να μη συγκρούονται
             subprocess.run([
-                "libreoffice", "--headless", "--convert-to", "pdf",
-                "--outdir", pdf_dir, docx_path
-            ], check=True)
+                "libreoffice", "--headless",
+                f"-env:UserInstallation=file:///tmp/lo_profile_{os.getpid()}",
+                "--convert-to", "pdf", "--outdir", pdf_dir, docx_path
+            ], check=True, timeout=timeout)
         except Exception as e:
             print(f"❌ Σφάλμα στη μετατροπή σε PDF: {e}")
     else:
         print(f"📄 Υπάρχει ήδη PDF για {os.path.basename(docx_path)}")
     return pdf_file
 
-def get_page_for_text(pdf_path, text_snippet):
-    """Επιστρέφει τη σελίδα που περιέχει το text_snippet, με caching ανά PDF
-       και με normalization + fallback σε blocks για πιο σύνθετα layouts.
-    """
-
-    def normalize(s):
-        return (
-            s.lower()
-            .replace("\n", " ")
-            .replace("\r", "")
-            .replace("  ", " ")
-            .strip()
-        )
+def normalize_page_text(s):
+    """Πεζά + ένα κενό ανάμεσα στις λέξεις (τα PDF σπάνε γραμμές αλλού από το .docx)."""
+    return re.sub(r"\s+", " ", s.lower()).strip()
 
+def load_page_texts(pdf_path):
+    """Κείμενο ανά σελίδα του PDF ({"1": "...", ...}), με caching ανά PDF στο PAGE_CACHE_DIR
+       και fallback σε blocks για πιο σύνθετα layouts. Επιστρέφει None σε σφάλμα.
+    """
     pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
     cache_file = os.path.join(PAGE_CACHE_DIR, f"{pdf_name}.json")
 
-    # ---------------------------------------------------------
-    # 1️⃣ Φόρτωση ή δημιουργία cache PDF text ανά σελίδα
-    # ---------------------------------------------------------
     if os.path.exists(cache_file):
         # φόρτωσε από cache
         with open(cache_file, "r", encoding="utf-8") as f:
-            page_cache = json.load(f)
-    else:
-        # δημιουργία cache
-        page_cache = {"pages": {}}
-        try:
-            doc = fitz.open(pdf_path)
+            return json.load(f)["pages"]
 
-            for page_num in range(doc.page_count):
-                page = doc.load_page(page_num)
+    # δημιουργία cache
+    page_cache = {"pages": {}}
+    try:
+        doc = fitz.open(pdf_path)
 
-                # βασικό text extraction
-                text = page.get_text("text").strip()
+        for page_num in range(doc.page_count):
+            page = doc.load_page(page_num)
 
-                # fallback σε blocks σε περίπτωση κακού layout PDF
-                if not text:
-                    blocks = page.get_text("blocks")
-                    text = " ".join(b[4] for b in blocks if b[4].strip())
+            # βασικό text extraction
+            text = page.get_text("text").strip()
 
-                page_cache["pages"][str(page_num + 1)] = text
+            # fallback σε blocks σε περίπτωση κακού layout PDF
+            if not text:
+                blocks = page.get_text("blocks")
+                text = " ".join(b[4] for b in blocks if b[4].strip())
 
-            # save cache
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(page_cache, f, ensure_ascii=False)
+            page_cache["pages"][str(page_num + 1)] = text
 
-        except Exception as e:
-            print(f"⚠️ Σφάλμα στη δημιουργία cache PDF για {pdf_name}: {e}")
-            return 1
+        # save cache
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(page_cache, f, ensure_ascii=False)
 
-    # ---------------------------------------------------------
-    # 2️⃣ Normalized αναζήτηση snippet → σελίδα PDF
-    # ---------------------------------------------------------
-    snippet = text_snippet[:120].strip()
-    norm_snippet = normalize(snippet)
-    short_snippet = norm_snippet[:40]  # πιο σταθερό matching
+    except Exception as e:
+        print(f"⚠️ Σφάλμα στη δημιουργία cache PDF για {pdf_name}: {e}")
+        return None
 
-    for num, text in page_cache["pages"].items():
-        norm_text = normalize(text)
-        if short_snippet in norm_text:
-            return int(num)
+    return page_cache["pages"]
 
-    # ---------------------------------------------------------
-    # 3️⃣ Αν αποτύχει → default page 1
-    # ---------------------------------------------------------
-    return 1
+class PageLocator:
+    """Ευρετήριο snippet → σελίδα για ένα PDF, χτίζεται μία φορά για όλα τα chunks του αρχείου.
 
-def load_docs(rebuild=False):
-    metadata, all_chunks = [], []
+    Κρατά όλο το normalized κείμενο σε ένα string με τα offsets όπου ξεκινά κάθε σελίδα,
+    ώστε το exact match να είναι ένα str.find + bisect. Αν δεν βρεθεί ακριβές match,
+    ψηφίζουν τα word n-grams του chunk ανά σελίδα.
+    """
 
-    os.makedirs(PDF_PATH, exist_ok=True)
+    NGRAM = 3
 
-    # Load cache
-    cache = {}
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            cache = json.load(f)
+    def __init__(self, pages):
+        parts = []
+        self.starts, self.page_nums = [], []
+        offset = 0
+        for num, text in sorted(pages.items(), key=lambda kv: int(kv[0])):
+            norm = normalize_page_text(text)
+            self.starts.append(offset)
+            self.page_nums.append(int(num))
+            parts.append(norm)
+            offset += len(norm) + 1
+        self.text = " ".join(parts)
+        self._cursor = 0
+        self._grams = None
+
+    def _ngrams(self, text):
+        words = re.findall(r"\w+", text)
+        return {" ".join(words[i:i + self.NGRAM]) for i in range(max(0, len(words) - self.NGRAM + 1))}
+
+    def _build_ngram_index(self):
+        self._grams = {}
+        bounds = self.starts[1:] + [len(self.text)]
+        for idx, (start, end) in enumerate(zip(self.starts, bounds)):
+            for gram in self._ngrams(self.text[start:end]):
+                self._grams.setdefault(gram, []).append(idx)
+
+    def page_at(self, offset):
+        return self.page_nums[max(0, bisect_right(self.starts, offset) - 1)]
+
+    def locate(self, snippet):
+        """Επιστρέφει (σελίδα, confidence). confidence 1.0 = ακριβές match, 0.0 = δεν βρέθηκε."""
+        if not self.page_nums:
+            return 1, 0.0
+
+        # 1️⃣ Ακριβές match της αρχής του chunk. Τα chunks έρχονται με τη σειρά του
+        #    εγγράφου, οπότε ψάχνουμε πρώτα από το προηγούμενο match και μετά.
+        key = normalize_page_text(snippet[:120])[:40]
+        if key:
+            pos = self.text.find(key, self._cursor)
+            if pos < 0:
+                pos = self.text.find(key)
+            if pos >= 0:
+                self._cursor = pos
+                return self.page_at(pos), 1.0
+
+        # 2️⃣ Ψηφοφορία n-grams (λέξεις σπασμένες με παύλες, πίνακες, headers κ.λπ.)
+        if self._grams is None:
+            self._build_ngram_index()
+        grams = self._ngrams(normalize_page_text(snippet))
+        if not grams:
+            return 1, 0.0
+        votes = {}
+        for gram in grams:
+            for idx in self._grams.get(gram, ()):
+                votes[idx] = votes.get(idx, 0) + 1
+        if not votes:
+            return 1, 0.0
+        best = max(votes, key=lambda idx: (votes[idx], -idx))
+        return self.page_nums[best], round(votes[best] / len(grams), 3)
+
+def get_page_locator(pdf_path):
+    pages = load_page_texts(pdf_path)
+    return PageLocator(pages or {})
+
+# -------------------- Embedding cache --------------------
+def chunk_cache_key(passage, model_name=MODEL_ID):
+    """Κλειδί cache: hash του κειμένου που κωδικοποιείται + όνομα μοντέλου."""
+    return hashlib.sha1(f"{model_name}\n{passage}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """Μόνιμη αποθήκη embeddings ανά chunk (sqlite), ώστε ένα reindex
+       να κωδικοποιεί μόνο τα νέα ή αλλαγμένα chunks.
+    """
 
-    # Track existing files to remove deleted ones
-    existing_files = [f for f in os.listdir(DOCS_PATH) if f.lower().endswith(".docx")]
-    deleted_files = [f for f in cache.keys() if f not in existing_files]
+    def __init__(self, path=EMBED_CACHE_FILE, model_name=MODEL_ID):
+        self.model_name = model_name
+        self.run = uuid.uuid4().hex  # σημαδεύει ό,τι χρησιμοποιήθηκε σε αυτό το indexing (για το prune)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL, seen TEXT)"
+        )
+        try:
+            self.conn.execute("ALTER TABLE embeddings ADD COLUMN seen TEXT")  # cache παλιότερης μορφής
+        except sqlite3.OperationalError:
+            pass
+
+    def get_many(self, keys, batch=500):
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), batch):
+            part = keys[start:start + batch]
+            rows = self.conn.execute(
+                f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+            )
+            for key, vec in rows:
+                found[key] = np.frombuffer(vec, dtype="float32")
+        return found
+
+    def put_many(self, items):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vec) VALUES (?, ?, ?, ?)",
+                [(k, self.model_name, int(v.shape[0]), np.asarray(v, dtype="float32").tobytes()) for k, v in items],
+            )
+
+    def touch(self, keys):
+        with self.conn:
+            self.conn.executemany("UPDATE embeddings SET seen = ? WHERE key = ?", [(self.run, k) for k in keys])
+
+    def prune(self):
+        """Διαγράφει embeddings του ίδιου μοντέλου που δεν χρησιμοποιήθηκαν σε αυτό το indexing
+           (chunks που δεν υπάρχουν πλέον), χωρίς να κρατά όλα τα keys στη μνήμη.
+        """
+        with self.conn:
+            cur = self.conn.execute(
+                "DELETE FROM embeddings WHERE model = ? AND (seen IS NULL OR seen != ?)", (self.model_name, self.run)
+            )
+        return cur.rowcount
+
+    def close(self):
+        self.conn.close()
+
+def embed_batch(chunks, cache, get_model):
+    """Embeddings (float32) ενός batch chunks, κωδικοποιώντας μόνο όσα λείπουν από το cache.
+       Κάθε batch γράφεται αμέσως στο cache: ένα διακομμένο indexing συνεχίζει από
+       το τελευταίο ολοκληρωμένο batch χωρίς να ξανατρέξει το μοντέλο.
+    """
+    passages = [f"passage: {c}" for c in chunks]
+    keys = [chunk_cache_key(p, cache.model_name) for p in passages]
+    found = cache.get_many(keys)
+
+    missing = list(dict.fromkeys(k for k in keys if k not in found))
+    EMBED_CACHE_TOTAL.inc(len(keys) - len(missing), result="hit")
+    EMBED_CACHE_TOTAL.inc(len(missing), result="miss")
+    if missing:
+        todo = dict(zip(keys, passages))
+        vecs = get_model().encode([todo[k] for k in missing], convert_to_numpy=True).astype("float32")
+        cache.put_many(zip(missing, vecs))
+        found.update(zip(missing, vecs))
+    cache.touch(keys)
+    return np.vstack([found[k] for k in keys]).astype("float32"), len(missing)
+
+def process_file(fname, file_hash, convert_timeout=180):
+    """Πλήρης επεξεργασία ενός .docx (PDF, ενότητες, chunks, σελίδες).
+       convert_timeout: όριο της μετατροπής σε PDF, αν το PDF δεν έγινε ήδη μαζικά (--convert-timeout).
+       Είναι top-level ώστε να τρέχει και σε worker process.
+       Επιστρέφει και τους χρόνους ανά στάδιο (για τα metrics του κύριου process).
+    """
+    path = os.path.join(DOCS_PATH, fname)
+    timings = {"pdf": 0.0, "parse": 0.0, "chunk": 0.0, "pages": 0.0}
+    t0 = time.perf_counter()
+    pdf_path = convert_to_pdf(path, PDF_PATH, timeout=convert_timeout)
+    t1 = time.perf_counter()
+    sections = read_docx_sections(path)
+    t2 = time.perf_counter()
+    timings["pdf"], timings["parse"] = t1 - t0, t2 - t1
+    file_cache = {"hash": file_hash, "chunker": CHUNKER_ID, "pages": {}, "metadata": []}
+    locator = get_page_locator(pdf_path)
+    timings["pages"] += time.perf_counter() - t2
+    unmatched = 0
+
+    for si, sec in enumerate(sections):
+        sec_title = sec.get("title")
+        sec_text = sec.get("text") or ""
+        t0 = time.perf_counter()
+        chunks = chunk_section(sec_text)
+        if not chunks and sec_text.strip():
+            chunks = [sec_text.strip()]
+        t1 = time.perf_counter()
+        timings["chunk"] += t1 - t0
+        for cj, chunk in enumerate(chunks):
+            page, confidence = locator.locate(chunk)
+            if confidence == 0.0:
+                unmatched += 1
+            file_cache["pages"][str(cj)] = page
+            entry = {
+                "filename": fname,
+                "pdf_path": pdf_path,
+                "section_title": sec_title,
+                "section_idx": si,
+                "chunk_id": cj,
+                "page": page,
+                "page_confidence": confidence,
+                "text": chunk
+            }
+            file_cache["metadata"].append(entry)
+        timings["pages"] += time.perf_counter() - t1
+
+    if unmatched:
+        print(f"⚠️ {fname}: {unmatched} chunks χωρίς σελίδα στο PDF (→ σελίδα 1)")
+
+    return file_cache, len(sections), timings
+
+def pdf_path_for(fname):
+    return os.path.join(PDF_PATH, os.path.splitext(fname)[0] + ".pdf")
+
+def chunk_file_key(file_hash, chunker_id=CHUNKER_ID):
+    # Hash αρχείου + ρυθμίσεις chunker: αλλαγή σε οποιοδήποτε από τα δύο → νέα chunks
+    return f"{file_hash}-{chunker_id}"
+
+def chunk_cache_path(fname, key):
+    # Το κλειδί στο όνομα: έλεγχος "άλλαξε;" χωρίς να διαβαστεί το αρχείο
+    return os.path.join(CHUNK_CACHE_DIR, f"{fname}.{key}.json")
+
+def scan_chunk_cache():
+    """{fname: (κλειδί, path)} για όσα αρχεία έχουν αποθηκευμένα chunks."""
+    cached = {}
+    for name in os.listdir(CHUNK_CACHE_DIR):
+        parts = name.rsplit(".", 2)
+        if len(parts) == 3 and parts[2] == "json":
+            cached[parts[0]] = (parts[1], os.path.join(CHUNK_CACHE_DIR, name))
+    return cached
+
+def save_file_cache(fname, file_cache):
+    # Chunks χωρίς "chunker" είναι της παλιάς κοπής σε λέξεις
+    path = chunk_cache_path(fname, chunk_file_key(file_cache["hash"], file_cache.get("chunker", "words")))
+    snapshots.write_json_atomic(path, file_cache)
+    return path
+
+def migrate_cache_file():
+    """Παλιό index_cache.json (όλα τα metadata σε ένα αρχείο) → ένα αρχείο ανά .docx."""
+    if not os.path.exists(CACHE_FILE):
+        return
+    with open(CACHE_FILE, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    for fname, file_cache in cache.items():
+        if "metadata" in file_cache:
+            save_file_cache(fname, file_cache)
+    os.remove(CACHE_FILE)
+    print(f"📦 Το {CACHE_FILE} μεταφέρθηκε στο {CHUNK_CACHE_DIR} (ένα αρχείο ανά έγγραφο).")
+
+def load_docs(rebuild=False, workers=1, office_instances=1, convert_timeout=180):
+    """Επεξεργάζεται ό,τι άλλαξε και επιστρέφει τα αρχεία (ταξινομημένα) με τα paths των chunks τους.
+       Τα chunks κάθε αρχείου αποθηκεύονται μόλις τελειώσει, οπότε μια διακοπή
+       δεν χάνει τα αρχεία που ήδη έγιναν. Τα ίδια τα chunks διαβάζονται μετά
+       με iter_metadata(), ένα αρχείο τη φορά.
+    """
+    os.makedirs(PDF_PATH, exist_ok=True)
+    os.makedirs(CHUNK_CACHE_DIR, exist_ok=True)
+    os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+    PROGRESS.stage("scanning")
+    migrate_cache_file()
+    cached = scan_chunk_cache()
+
+    # Track existing files to remove deleted ones (ταξινομημένα για ντετερμινιστική σειρά metadata)
+    existing_files = sorted(f for f in os.listdir(DOCS_PATH) if f.lower().endswith(".docx"))
+    deleted_files = [f for f in cached if f not in existing_files]
     for f in deleted_files:
         print(f"🗑️ Αφαιρέθηκε: {f} → διαγράφονται chunks και PDF")
         # Remove PDF
@@ -282,96 +589,418 @@ def load_docs(rebuild=False):
             os.remove(cache_file)
 
         # Remove cache entry
-        cache.pop(f, None)
+        os.remove(cached.pop(f)[1])
+        FILES_TOTAL.inc(result="removed")
 
+    # Εντοπισμός αρχείων που άλλαξαν
+    todo, paths = [], {}
     for i, fname in enumerate(existing_files, start=1):
-        path = os.path.join(DOCS_PATH, fname)
-        file_hash = get_file_hash(path)
+        file_hash = get_file_hash(os.path.join(DOCS_PATH, fname))
 
         # Check cache
-        skip_file = fname in cache and cache[fname]["hash"] == file_hash and not rebuild
+        skip_file = fname in cached and cached[fname][0] == chunk_file_key(file_hash) and not rebuild
         if skip_file:
             print(f"⏩ Παράλειψη (δεν άλλαξε): {fname}")
-            # load chunks and metadata from previous cache
-            for chunk_entry in cache[fname]["metadata"]:
-                metadata.append(chunk_entry)
-                all_chunks.append(chunk_entry["text"])
+            FILES_TOTAL.inc(result="cached")
+            paths[fname] = cached[fname][1]
             continue
+        todo.append((i, fname, file_hash))
+
+        # Αλλαγμένο αρχείο → το παλιό PDF και το page cache δεν ισχύουν πλέον
+        # (αν άλλαξε μόνο ο chunker, το PDF μένει)
+        if fname in cached and cached[fname][0].split("-")[0] != file_hash:
+            stale = [pdf_path_for(fname), os.path.join(PAGE_CACHE_DIR, os.path.splitext(fname)[0] + ".json")]
+            for stale_file in stale:
+                if os.path.exists(stale_file):
+                    os.remove(stale_file)
+
+    # Μαζική μετατροπή σε PDF με ζεστά instances LibreOffice· ό,τι αποτύχει
+    # ξαναδοκιμάζεται με το κλασικό convert_to_pdf μέσα στο process_file
+    to_convert = [(os.path.join(DOCS_PATH, fname), pdf_path_for(fname))
+                  for _, fname, _ in todo if not os.path.exists(pdf_path_for(fname))]
+    PROGRESS.update(files_total=len(existing_files), files_done=len(existing_files) - len(todo))
+    if to_convert and office_instances > 0:
+        print(f"⚙️ Μετατροπή {len(to_convert)} αρχείων σε PDF με {office_instances} LibreOffice workers...")
+        PROGRESS.stage("pdf", pdf_total=len(to_convert), pdf_done=0)
+        with phase("pdf_convert"):
+            failed = convert_many(to_convert, instances=office_instances, timeout=convert_timeout,
+                                  on_progress=lambda n, total: PROGRESS.update(pdf_done=n))
+        if failed:
+            print(f"⚠️ {len(failed)} αρχεία θα ξαναδοκιμαστούν με μεμονωμένη μετατροπή.")
+
+    def done(i, fname, file_cache, n_sections, timings):
+        paths[fname] = save_file_cache(fname, file_cache)
+        if fname in cached and cached[fname][1] != paths[fname]:
+            os.remove(cached[fname][1])  # chunks της προηγούμενης έκδοσης του αρχείου
+        FILES_TOTAL.inc(result="processed")
+        for stage, seconds in timings.items():
+            FILE_STAGE_SECONDS.observe(seconds, stage=stage)
+        PROGRESS.update(files_done=PROGRESS.state["files_done"] + 1)
+        print(f"✅ ({i}/{len(existing_files)}) Ολοκληρώθηκε: {fname} ({n_sections} ενότητες)")
+
+    PROGRESS.stage("files")
+    with phase("process_files"):
+        if workers > 1 and len(todo) > 1:
+            print(f"🚀 Παράλληλη επεξεργασία {len(todo)} αρχείων με {workers} workers...")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(process_file, fname, file_hash, convert_timeout): (i, fname)
+                           for i, fname, file_hash in todo}
+                for future in as_completed(futures):
+                    i, fname = futures[future]
+                    done(i, fname, *future.result())
+        else:
+            for i, fname, file_hash in todo:
+                print(f"📘 ({i}/{len(existing_files)}) Επεξεργασία: {fname}")
+                done(i, fname, *process_file(fname, file_hash, convert_timeout))
+
+    return [(fname, paths[fname]) for fname in existing_files]
+
+def iter_metadata(files, dups=None):
+    """Τα chunks όλων των αρχείων με τη σειρά των FAISS ids· στη μνήμη μόνο ένα αρχείο τη φορά.
+       Με dups παραλείπονται τα διπλότυπα (και τα μοναδικά παίρνουν "sources").
+    """
+    if dups is not None:
+        yield from dups.apply(iter_metadata(files))
+        return
+    for _, path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)["metadata"]
+
+def iter_batches(entries, size):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def metadata_hash(metadata):
+    h = hashlib.sha1()
+    for entry in metadata:
+        h.update(json.dumps(entry, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
 
-        print(f"📘 ({i}/{len(existing_files)}) Επεξεργασία: {fname}")
-        pdf_path = convert_to_pdf(path, PDF_PATH)
-        sections = read_docx_sections(path)
-        file_cache = {"hash": file_hash, "pages": {}, "metadata": []}
-
-        for si, sec in enumerate(sections):
-            sec_title = sec.get("title")
-            sec_text = sec.get("text") or ""
-            chunks = chunk_section_text(sec_text, max_words=CHUNK_SIZE, overlap_words=CHUNK_OVERLAP)
-            if not chunks and sec_text.strip():
-                chunks = [sec_text.strip()]
-            for cj, chunk in enumerate(chunks):
-                page = get_page_for_text(pdf_path, chunk)
-                file_cache["pages"][str(cj)] = page
-                entry = {
-                    "filename": fname,
-                    "pdf_path": pdf_path,
-                    "section_title": sec_title,
-                    "section_idx": si,
-                    "chunk_id": cj,
-                    "page": page,
-                    "text": chunk
-                }
-                metadata.append(entry)
-                all_chunks.append(chunk)
-                file_cache["metadata"].append(entry)
-
-        cache[fname] = file_cache
-        print(f"✅ Ολοκληρώθηκε: {fname} ({len(sections)} ενότητες)")
-
-    # Save cache
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
-
-    return all_chunks, metadata
-
-def create_faiss_index(embeddings):
+def create_faiss_index(embeddings, factory="Flat"):
     faiss.normalize_L2(embeddings)
     dim = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dim)
+    index = faiss.index_factory(dim, factory, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        # IVF / PQ χρειάζονται training σε δείγμα των vectors
+        rng = np.random.default_rng(0)
+        sample = embeddings
+        if len(embeddings) > TRAIN_SAMPLE:
+            sample = embeddings[np.sort(rng.choice(len(embeddings), TRAIN_SAMPLE, replace=False))]
+        print(f"🏋️ Training index {factory} σε {len(sample)} vectors...")
+        index.train(sample)
     index.add(embeddings)
     return index
 
+def train_sample_ids(n_chunks):
+    """Ίδιο δείγμα με το create_faiss_index για το ίδιο πλήθος chunks."""
+    if n_chunks <= TRAIN_SAMPLE:
+        return None
+    rng = np.random.default_rng(0)
+    return set(np.sort(rng.choice(n_chunks, TRAIN_SAMPLE, replace=False)).tolist())
+
+def train_streaming(index, factory, files, n_chunks, cache, get_model, dups=None):
+    """Πρώτο πέρασμα μόνο για IVF / PQ: μαζεύει (και βάζει στο cache) τα vectors του δείγματος training."""
+    sample_ids = train_sample_ids(n_chunks)
+    sample, chunk_id = [], 0
+    for batch in iter_batches(iter_metadata(files, dups), EMBED_BATCH):
+        picked = [m["text"] for j, m in enumerate(batch) if sample_ids is None or chunk_id + j in sample_ids]
+        chunk_id += len(batch)
+        if picked:
+            with phase("embed"):
+                vecs, _ = embed_batch(picked, cache, get_model)
+                faiss.normalize_L2(vecs)
+            sample.append(vecs)
+    sample = np.vstack(sample)
+    print(f"🏋️ Training index {factory} σε {len(sample)} vectors...")
+    with phase("index_build"):
+        index.train(sample)
+
+def build_index_streaming(files, n_chunks, factory, cache, get_model, meta_path, dups=None):
+    """Αρχεία → chunks → batches των EMBED_BATCH: κάθε batch κωδικοποιείται (ή έρχεται από
+       το cache), προστίθεται στο FAISS index και τα metadata του γράφονται στο sqlite.
+       Στη μνήμη μένει μόνο το ίδιο το index και ένα batch, όχι όλα τα chunks/embeddings.
+       Οι χρόνοι encode ("embed") και FAISS train/add ("index_build") μετριούνται χωριστά.
+    """
+    PROGRESS.stage("embedding", chunks_total=n_chunks, chunks_embedded=0, chunks_encoded=0)
+    writer = MetaStoreWriter(meta_path)
+    index, done, encoded = None, 0, 0
+    try:
+        for batch in iter_batches(iter_metadata(files, dups), EMBED_BATCH):
+            with phase("embed"):
+                vecs, n_new = embed_batch([m["text"] for m in batch], cache, get_model)
+                faiss.normalize_L2(vecs)
+            if index is None:
+                index = faiss.index_factory(vecs.shape[1], factory, faiss.METRIC_INNER_PRODUCT)
+                if not index.is_trained:
+                    train_streaming(index, factory, files, n_chunks, cache, get_model, dups)
+            with phase("index_build"):
+                index.add(vecs)
+            writer.add(batch)
+            done, encoded = done + len(batch), encoded + n_new
+            PROGRESS.update(chunks_embedded=done, chunks_encoded=encoded)
+    finally:
+        writer.close()
+    print(f"♻️ Από cache: {done - encoded} chunks — νέα embeddings: {encoded}")
+    return index
+
+def load_collections(filenames):
+    """collections.json → {tag: [filenames]} (δέχεται και wildcards)."""
+    if not os.path.exists(COLLECTIONS_FILE):
+        return {}
+    with open(COLLECTIONS_FILE, "r", encoding="utf-8") as f:
+        patterns = json.load(f)
+    collections = {}
+    for tag, pats in patterns.items():
+        if isinstance(pats, str):
+            pats = [pats]
+        collections[tag] = sorted({fn for fn in filenames for p in pats if fnmatch(fn, p)})
+    return collections
+
+def build_id_ranges(metadata):
+    """Συνεχόμενα ranges από chunk ids ανά αρχείο και ανά ενότητα (τα metadata είναι ταξινομημένα ανά αρχείο),
+       για φιλτραρισμένη αναζήτηση χωρίς post-filtering. Chunks που υπάρχουν και σε άλλα αρχεία
+       (sources του dedup) μπαίνουν στο "shared" εκείνων ως [τίτλος ενότητας, id].
+    """
+    files, sections, shared = {}, {}, {}
+    for i, m in enumerate(metadata):
+        for src in m.get("sources") or ():
+            if src["filename"] != m["filename"]:
+                shared.setdefault(src["filename"], []).append([src.get("section_title"), i])
+        fname = m["filename"]
+        if fname in files:
+            files[fname][1] = i + 1
+        else:
+            files[fname] = [i, i + 1]
+        secs = sections.setdefault(fname, [])
+        if secs and secs[-1][0] == m["section_idx"]:
+            secs[-1][3] = i + 1
+        else:
+            secs.append([m["section_idx"], m.get("section_title"), i, i + 1])
+    return {
+        "files": files,
+        "sections": {fname: [[title, start, end] for _, title, start, end in secs] for fname, secs in sections.items()},
+        "shared": shared,
+    }
+
+def apply_vector_storage(factory, storage):
+    """Αλλάζει τον codec "Flat" του factory string σε fp16/sq8 (π.χ. HNSW32,Flat → HNSW32,SQfp16)."""
+    codec = VECTOR_CODECS[storage]
+    if storage == "fp32":
+        return factory
+    parts = factory.split(",")
+    if parts[-1] != "Flat":
+        raise ValueError(f"--vector-storage {storage} θέλει factory που τελειώνει σε Flat (δόθηκε: {factory})")
+    parts[-1] = codec
+    return ",".join(parts)
+
+def index_settings(factory, search_params):
+    return {"factory": factory, "search_params": search_params}
+
+def prerender_formats(spec):
+    """"pdf,png" → ["pdf", "png"], χωρίς άγνωστες μορφές ή webp όταν λείπει το Pillow."""
+    formats = []
+    for fmt in (f.strip().lower() for f in spec.split(",")):
+        if not fmt or fmt in formats:
+            continue
+        if fmt not in FORMATS:
+            print(f"⚠️ Άγνωστη μορφή σελίδας για pre-render: {fmt} (επιτρέπονται {', '.join(FORMATS)})")
+        elif fmt == "webp" and not webp_available():
+            print("⚠️ Το pre-render σε webp χρειάζεται Pillow – παραλείπεται.")
+        else:
+            formats.append(fmt)
+    return formats
+
+def prerender_pages(files, formats):
+    """Render (αν λείπουν) όλες τις σελίδες που αναφέρει κάποιο chunk, στο cache του page_render.py.
+       Τα διπλότυπα chunks μετρούν κι αυτά: οι σελίδες τους είναι οι "sources" του κρατημένου.
+    """
+    pdfs = {}  # χωρίς PDF (αποτυχημένη μετατροπή) δεν υπάρχουν σελίδες για render
+    pages = sorted({(m["pdf_path"], m["page"]) for m in iter_metadata(files)
+                    if m.get("pdf_path") and pdfs.setdefault(m["pdf_path"], os.path.exists(m["pdf_path"]))})
+    cache = PageCache()
+    PROGRESS.stage("prerender", pages_total=len(pages) * len(formats), pages_done=0)
+    rendered = failed = done = 0
+    for pdf_path, page in pages:
+        for fmt in formats:
+            try:
+                rendered += cache.ensure(pdf_path, page, fmt)
+            except Exception as e:
+                failed += 1
+                print(f"⚠️ Σελίδα {page} του {os.path.basename(pdf_path)} ({fmt}): {e}")
+            done += 1
+            PROGRESS.update(pages_done=done)
+    print(f"🖼️ Pre-render σελίδων: {rendered} νέες, {done - rendered - failed} υπήρχαν ήδη, {failed} αποτυχίες.")
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--rebuild", action="store_true", help="Ολικό rebuild index")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INDEX_WORKERS", "1")),
+                        help="Αριθμός processes για παράλληλη επεξεργασία αρχείων")
+    parser.add_argument("--office-instances", type=int, default=int(os.getenv("OFFICE_INSTANCES", "1")),
+                        help="Ζεστά instances LibreOffice για μετατροπή PDF (0 = ένα process ανά αρχείο)")
+    parser.add_argument("--index-factory", default=INDEX_FACTORY,
+                        help="FAISS factory string για τον τύπο index (π.χ. Flat, HNSW32,Flat, IVF1024,Flat)")
+    parser.add_argument("--vector-storage", choices=sorted(VECTOR_CODECS), default=VECTOR_STORAGE,
+                        help="Ακρίβεια αποθήκευσης vectors στο FAISS (fp32, fp16, sq8)")
+    parser.add_argument("--embed-backend", choices=BACKENDS, default=EMBED_BACKEND,
+                        help="Backend του encoder (torch, int8, onnx, onnx-int8)")
+    parser.add_argument("--search-params", default=INDEX_SEARCH_PARAMS,
+                        help="Παράμετροι αναζήτησης που αποθηκεύονται στο snapshot (π.χ. nprobe=16,efSearch=64)")
+    parser.add_argument("--convert-timeout", type=int, default=180,
+                        help="Timeout (s) ανά μετατροπή πριν γίνει restart του LibreOffice worker")
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD,
+                        help="Ομοιότητα (Jaccard) από την οποία ένα chunk θεωρείται διπλότυπο (0 = χωρίς dedup)")
+    parser.add_argument("--prerender-pages", default=PRERENDER_PAGES,
+                        help="Μορφές (pdf,png,webp) στις οποίες γίνονται render οι σελίδες των chunks (κενό = καμία)")
+    parser.add_argument("--progress-file", help="JSON με την πρόοδο (το γράφει για το POST /api/reindex)")
+    parser.add_argument("--lock-fd", type=int, help=argparse.SUPPRESS)  # lock που κράτησε ήδη το API
     args = parser.parse_args()
 
-    chunks, metadata = load_docs(rebuild=args.rebuild)
-
-    # ✅ Αν δεν έγινε rebuild και υπάρχουν ήδη index/meta, έλεγξε αν υπήρξαν αλλαγές
-    if not args.rebuild and os.path.exists(INDEX_FILE) and os.path.exists(META_FILE):
-        with open(META_FILE, "r", encoding="utf-8") as f:
-            old_meta = json.load(f)
-        if len(old_meta) == len(metadata):
-            print("✅ Δεν εντοπίστηκαν αλλαγές – διατηρείται το υπάρχον FAISS index.")
-            return
-
-    print(f"➡️ Βρέθηκαν {len(chunks)} chunks προς επεξεργασία.")
-    print("🔍 Φόρτωση μοντέλου embeddings...")
-    model = SentenceTransformer("intfloat/multilingual-e5-base", cache_folder="/root/.cache/huggingface")
-
-    print("🧠 Δημιουργία embeddings...")
-    embeddings = model.encode([f"passage: {c}" for c in chunks], convert_to_numpy=True, show_progress_bar=True)
-    embeddings = embeddings.astype('float32')
-
-    print("🔧 Κανονικοποίηση embeddings (L2) + δημιουργία FAISS index...")
-    index = create_faiss_index(embeddings)
-    faiss.write_index(index, INDEX_FILE)
-
-    with open(META_FILE, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=2)
-
-    print("✅ Indexing ολοκληρώθηκε επιτυχώς!")
+    # 🔒 Ένα indexing τη φορά: το API περνά το lock που ήδη κρατά, από CLI το παίρνουμε εδώ
+    if args.lock_fd is None and snapshots.try_lock() is None:
+        print("⏳ Τρέχει ήδη άλλο indexing (CLI ή POST /api/reindex) – δοκίμασε αργότερα.")
+        sys.exit(75)
+
+    # Ακύρωση (SIGTERM από το POST /api/reindex/cancel): κανονικός τερματισμός ώστε να
+    # καθαριστούν staging και LibreOffice workers. Τα workers του ProcessPool απλώς τερματίζουν.
+    main_pid = os.getpid()
+
+    def on_sigterm(signum, frame):
+        if os.getpid() != main_pid:
+            os._exit(1)
+        raise SystemExit(143)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+    PROGRESS.path = args.progress_file
+
+    try:
+        result = run_index(args)
+    except SystemExit:
+        PROGRESS.stage("cancelled")
+        write_index_metrics("cancelled")
+        raise
+    except BaseException as e:
+        PROGRESS.stage("failed", error=f"{type(e).__name__}: {e}")
+        write_index_metrics("failed")
+        raise
+    PROGRESS.stage(result)
+
+def run_prerender(files, args):
+    formats = prerender_formats(args.prerender_pages)
+    if formats:
+        print(f"🖼️ Pre-render σελίδων ({', '.join(formats)})...")
+        with phase("prerender"):
+            prerender_pages(files, formats)
+
+def run_index(args):
+    """Όλη η διαδικασία indexing. Επιστρέφει published / unchanged / empty."""
+    with phase("load_docs"):
+        files = load_docs(rebuild=args.rebuild, workers=args.workers,
+                          office_instances=args.office_instances, convert_timeout=args.convert_timeout)
+
+    # Πρώτο πέρασμα στα chunks (χωρίς embeddings): hash για τον έλεγχο αλλαγών, πλήθος, αρχεία, διπλότυπα
+    stats = {"chunks": 0, "files": set()}
+    dups = Duplicates(args.dedup_threshold)
+
+    def counted(entries):
+        for m in entries:
+            stats["chunks"] += 1
+            stats["files"].add(m["filename"])
+            yield m
+
+    with phase("scan"):
+        meta_hash = metadata_hash(dups.scan(counted(iter_metadata(files))))
+    n_chunks = stats["chunks"] - len(dups)
+    CHUNKS_GAUGE.set(n_chunks)
+    DUPLICATES_GAUGE.set(len(dups))
+
+    # ✅ Αν δεν έγινε rebuild και υπάρχει ήδη snapshot, έλεγξε αν υπήρξαν αλλαγές
+    factory = apply_vector_storage(args.index_factory, args.vector_storage)
+    settings = index_settings(factory, args.search_params)
+    dedup = dedup_settings(args.dedup_threshold)
+    embed_model_id = model_id(args.embed_backend)
+    collections = load_collections(sorted(stats["files"]))
+    current = snapshots.current_version()
+    manifest = snapshots.read_manifest(current)
+    if (not args.rebuild and current and manifest.get("meta_hash") == meta_hash
+            and manifest.get("index") == settings and manifest.get("collections", {}) == collections
+            and manifest.get("dedup") == dedup
+            and manifest.get("model") == embed_model_id):
+        print(f"✅ Δεν εντοπίστηκαν αλλαγές – διατηρείται το υπάρχον FAISS index ({current}).")
+        run_prerender(files, args)  # π.χ. πρώτη φορά με --prerender-pages σε αμετάβλητο index
+        write_index_metrics("unchanged")
+        return "unchanged"
+
+    print(f"➡️ Βρέθηκαν {n_chunks} chunks προς επεξεργασία.")
+    if len(dups):
+        print(f"🧬 {len(dups)} σχεδόν ίδια chunks αποθηκεύονται μία φορά ({len(dups.sources)} με πολλές πηγές).")
+    if not n_chunks:
+        print("⚠️ Δεν βρέθηκαν chunks – δεν δημιουργείται index.")
+        write_index_metrics("empty")
+        return "empty"
+
+    # Το μοντέλο φορτώνεται μόνο αν χρειαστεί (όλα τα embeddings μπορεί να υπάρχουν ήδη στο cache)
+    model = None
+
+    def get_model():
+        nonlocal model
+        if model is None:
+            model = load_model(args.embed_backend)
+        return model
+
+    # 📦 Νέο snapshot: γράφεται σε staging και δημοσιεύεται ατομικά (το API το φορτώνει μόνο του)
+    version = snapshots.new_version()
+    staging = snapshots.staging_dir(version)
+    try:
+        print("🧠 Embeddings + FAISS index ανά batch...")
+        embed_cache = EmbeddingCache(EMBED_CACHE_FILE, model_name=embed_model_id)
+        try:
+            with phase("embed_index"):
+                index = build_index_streaming(files, n_chunks, factory, embed_cache, get_model,
+                                              os.path.join(staging, META_DB_NAME), dups)
+            removed = embed_cache.prune()
+            if removed:
+                print(f"🧹 Αφαιρέθηκαν {removed} παλιά embeddings από το cache.")
+        finally:
+            embed_cache.close()
+
+        PROGRESS.stage("writing")
+        with phase("write_index"):
+            faiss.write_index(index, os.path.join(staging, snapshots.INDEX_NAME))
+        del index
+        print("🔤 Δημιουργία BM25 index για lexical αναζήτηση...")
+        with phase("bm25"):
+            build_bm25((lexical_text(m) for m in iter_metadata(files, dups)), staging)
+        filters = build_id_ranges(iter_metadata(files, dups))
+        filters["collections"] = collections
+        with open(os.path.join(staging, snapshots.FILTERS_NAME), "w", encoding="utf-8") as f:
+            json.dump(filters, f, ensure_ascii=False)
+        with phase("publish"):
+            snapshots.publish(staging, version, {
+                "model": embed_model_id,
+                "chunks": n_chunks,
+                "files": len(stats["files"]),
+                "duplicates": len(dups),
+                "meta_hash": meta_hash,
+                "index": settings,
+                "dedup": dedup,
+                "collections": collections,
+                "timings": {k: round(v, 3) for k, v in PHASE_TIMINGS.items()},
+            })
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)  # μισό snapshot (π.χ. ακύρωση) δεν μένει στον δίσκο
+        raise
+
+    print(f"✅ Indexing ολοκληρώθηκε επιτυχώς! Νέο snapshot: {version}")
+    run_prerender(files, args)
+    write_index_metrics("published")
+    return "published"
 
 if __name__ == "__main__":
     main()
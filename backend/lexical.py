@@ -0,0 +1,161 @@
+"""BM25 inverted index για ακριβείς νομικές αναφορές ("άρθρο 12 παρ. 3", "ν. 4412/2016").
+
+Χτίζεται από το index_docs.py πάνω στα ίδια chunk ids με το FAISS index και
+αποθηκεύεται στο snapshot ως CSR πίνακες (.npy), ώστε να φορτώνεται γρήγορα
+(και με mmap). Τα βάρη BM25 υπολογίζονται στο build, οπότε μια αναζήτηση
+είναι απλό άθροισμα βαρών πάνω στις λίστες των όρων της ερώτησης.
+"""
+import json
+from array import array
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+BM25_DIR = "bm25"
+K1 = 1.5
+B = 0.75
+# Όροι σε περισσότερα από αυτό το ποσοστό των chunks (π.χ. "αρθρο", που μπαίνει από τους τίτλους
+# ενοτήτων σχεδόν παντού) έχουν μικρό idf αλλά τις μεγαλύτερες λίστες: παραλείπονται στην
+# αναζήτηση όταν η ερώτηση έχει και σπανιότερους όρους (0 ή ≥ 1 = χωρίς παράλειψη)
+BM25_MAX_DF = float(os.getenv("BM25_MAX_DF", "0.5"))
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = {
+    "ο", "η", "το", "οι", "τα", "του", "της", "των", "τον", "την", "τη", "τις", "τους",
+    "και", "να", "σε", "στο", "στη", "στην", "στον", "στα", "στις", "στους", "με", "για",
+    "απο", "ως", "που", "ειναι", "δεν", "θα", "αν", "ενα", "μια", "ενας", "οτι",
+    "κατα", "μετα", "προς", "επι", "δια", "οπως", "αυτο", "αυτη", "αυτα",
+}
+
+
+def normalize(text):
+    """Πεζά χωρίς τόνους/διαλυτικά (άρθρο → αρθρο, ΆΡΘΡΟ → αρθρο, ς → σ)."""
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return text.casefold()
+
+
+def tokenize(text):
+    words = [w for w in TOKEN_RE.findall(normalize(text)) if w not in STOPWORDS]
+    # Ζεύγη "λέξη_αριθμός" ώστε το "άρθρο 12" να ταιριάζει ακριβώς και όχι κάθε "12"
+    pairs = [f"{a}_{b}" for a, b in zip(words, words[1:]) if b.isdigit() and not a.isdigit()]
+    return words + pairs
+
+
+def reference_tokens(text):
+    """Αριθμοί και αναφορές ("30", "4412", "αρθρο_12") του κειμένου: δύο κείμενα που διαφέρουν
+       μόνο σε αυτά (π.χ. προθεσμία 30 → 60 ημερών) δεν είναι ίδια, όσο κι αν μοιάζουν.
+    """
+    return frozenset(t for t in tokenize(text) if any(ch.isdigit() for ch in t))
+
+
+def lexical_text(entry):
+    """Κείμενο που ευρετηριάζεται: τίτλος ενότητας (π.χ. "Άρθρο 12") + chunk."""
+    return f"{entry.get('section_title') or ''}\n{entry.get('text') or ''}"
+
+
+def build_bm25(texts, directory):
+    """Χτίζει και αποθηκεύει το BM25 index για τα texts (με σειρά chunk id).
+       Τα texts μπορεί να είναι generator· τα postings κρατιούνται σε compact arrays.
+    """
+    vocab = {}
+    post_docs, post_tfs = [], []
+    doc_lens = array("i")
+    for doc_id, text in enumerate(texts):
+        counts = {}
+        tokens = tokenize(text)
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+        doc_lens.append(len(tokens))
+        for tok, tf in counts.items():
+            tid = vocab.get(tok)
+            if tid is None:
+                tid = vocab[tok] = len(vocab)
+                post_docs.append(array("i"))
+                post_tfs.append(array("f"))
+            post_docs[tid].append(doc_id)
+            post_tfs[tid].append(tf)
+
+    n_docs = len(doc_lens)
+    doc_lens = np.asarray(doc_lens, dtype="float32")
+    avgdl = float(doc_lens.mean()) if n_docs else 1.0
+
+    offsets = np.zeros(len(vocab) + 1, dtype="int64")
+    offsets[1:] = np.cumsum([len(p) for p in post_docs])
+    docs = np.empty(int(offsets[-1]), dtype="int32")
+    weights = np.empty(int(offsets[-1]), dtype="float32")
+    for tid in range(len(vocab)):
+        start, end = offsets[tid], offsets[tid + 1]
+        d = np.frombuffer(post_docs[tid], dtype="int32")
+        tf = np.frombuffer(post_tfs[tid], dtype="float32")
+        df = len(d)
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = tf + K1 * (1 - B + B * doc_lens[d] / max(avgdl, 1e-6))
+        docs[start:end] = d
+        weights[start:end] = idf * tf * (K1 + 1) / norm
+
+    path = os.path.join(directory, BM25_DIR)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "docs.npy"), docs)
+    np.save(os.path.join(path, "weights.npy"), weights)
+    with open(os.path.join(path, "terms.json"), "w", encoding="utf-8") as f:
+        json.dump({"n_docs": n_docs, "terms": list(vocab)}, f, ensure_ascii=False)
+    return n_docs, len(vocab)
+
+
+class BM25Index:
+    def __init__(self, directory, mmap=False):
+        path = os.path.join(directory, BM25_DIR)
+        mode = "r" if mmap else None
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode=mode)
+        self.docs = np.load(os.path.join(path, "docs.npy"), mmap_mode=mode)
+        self.weights = np.load(os.path.join(path, "weights.npy"), mmap_mode=mode)
+        with open(os.path.join(path, "terms.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.n_docs = data["n_docs"]
+        self.vocab = {term: i for i, term in enumerate(data["terms"])}
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, BM25_DIR, "terms.json"))
+
+    def search(self, query, k=20, mask=None):
+        """Επιστρέφει (ids, scores) των top-k chunks, ταξινομημένα φθίνουσα.
+           mask: προαιρετικός bool πίνακας n_docs με τα επιτρεπτά chunks.
+           Τα scores αθροίζονται κατευθείαν σε πίνακα n_docs (χωρίς ταξινόμηση των postings).
+        """
+        tids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not tids:
+            return np.empty(0, dtype="int64"), np.empty(0, dtype="float32")
+        spans = [(int(self.offsets[t]), int(self.offsets[t + 1])) for t in tids]
+        if 0 < BM25_MAX_DF < 1:
+            rare = [(s, e) for s, e in spans if e - s <= BM25_MAX_DF * self.n_docs]
+            spans = rare or spans
+
+        scores = np.zeros(self.n_docs, dtype="float32")
+        for start, end in spans:
+            # Μέσα σε μία λίστα κάθε chunk εμφανίζεται μία φορά → το += με fancy indexing είναι σωστό
+            scores[self.docs[start:end]] += self.weights[start:end]
+        if mask is not None:
+            scores[~mask] = 0.0
+
+        if k < self.n_docs:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(self.n_docs)
+        top = top[scores[top] > 0]
+        top = top[np.lexsort((top, -scores[top]))]  # φθίνουσα, και ανά id στις ισοβαθμίες
+        return top.astype("int64"), scores[top]
+
+
+def rrf_fuse(rankings, k=60, limit=None):
+    """Reciprocal rank fusion: λίστες ids (καλύτερο πρώτο) → [(id, score)] φθίνουσα."""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + 1.0 / (k + rank + 1)
+    ordered = sorted(fused.items(), key=lambda kv: (-kv[1], kv[0]))
+    return ordered[:limit] if limit else ordered
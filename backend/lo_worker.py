@@ -0,0 +1,99 @@
+"""Μόνιμος worker μετατροπής .docx → PDF μέσω LibreOffice (UNO).
+
+Τρέχει με τον system python που έχει το module `uno` (π.χ. /usr/bin/python3)
+και κρατά ένα headless soffice ζεστό. Διαβάζει εντολές JSON ανά γραμμή από
+stdin και απαντά JSON ανά γραμμή στο stdout:
+
+    {"src": "/data/docs/a.docx", "out": "/data/pdfs/a.pdf"}
+    → {"ok": true, "out": "/data/pdfs/a.pdf"}  ή  {"ok": false, "error": "..."}
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import uno
+from com.sun.star.beans import PropertyValue
+from com.sun.star.connection import NoConnectException
+
+
+def reply(**payload):
+    sys.stdout.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def prop(name, value):
+    p = PropertyValue()
+    p.Name = name
+    p.Value = value
+    return p
+
+
+def start_office(slot, soffice):
+    pipe_name = f"lo_worker_{slot}_{os.getpid()}"
+    proc = subprocess.Popen([
+        soffice, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+        f"-env:UserInstallation=file:///tmp/lo_worker_profile_{slot}",
+        f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, pipe_name
+
+
+def connect(pipe_name, timeout=60):
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+    deadline = time.time() + timeout
+    while True:
+        try:
+            ctx = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+            return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+        except NoConnectException:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def convert(desktop, src, out):
+    tmp = out + ".part"
+    doc = desktop.loadComponentFromURL(uno.systemPathToFileUrl(os.path.abspath(src)), "_blank", 0,
+                                       (prop("Hidden", True), prop("ReadOnly", True)))
+    if doc is None:
+        raise RuntimeError("το LibreOffice δεν άνοιξε το αρχείο")
+    try:
+        doc.storeToURL(uno.systemPathToFileUrl(os.path.abspath(tmp)), (prop("FilterName", "writer_pdf_Export"),))
+    finally:
+        doc.close(True)
+    os.replace(tmp, out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slot", type=int, default=0)
+    parser.add_argument("--soffice", default="soffice")
+    args = parser.parse_args()
+
+    office, pipe_name = start_office(args.slot, args.soffice)
+    try:
+        desktop = connect(pipe_name)
+        reply(ready=True, pid=office.pid)
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            try:
+                convert(desktop, job["src"], job["out"])
+                reply(ok=True, out=job["out"])
+            except Exception as e:
+                reply(ok=False, error=str(e))
+    finally:
+        office.terminate()
+        try:
+            office.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            office.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from api.ask import router as ask_router
+from api.admin import router as admin_router
+from api.health import router as health_router
+from api.reindex import router as reindex_router
+from api.pages import router as pages_router
+from api.search import router as search_router
+from api import service
 import os
 
 # Δημιουργία εφαρμογής FastAPI
@@ -23,6 +29,16 @@ app.mount("/pdf", StaticFiles(directory=PDF_FOLDER), name="pdf")
 
 # Εγγραφή των routes από το api/ask.py
 app.include_router(ask_router)
+app.include_router(admin_router)
+app.include_router(health_router)
+app.include_router(reindex_router)
+app.include_router(pages_router)
+app.include_router(search_router)
+
+# Μοντέλο/index φορτώνονται στο background ώστε ο server να ακούει αμέσως (βλ. /healthz, /readyz)
+@app.on_event("startup")
+def load_in_background():
+    service.start()
 
 # Απλό route για έλεγχο ότι τρέχει
 @app.get("/")
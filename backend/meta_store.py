@@ -0,0 +1,127 @@
+"""Metadata των chunks σε SQLite (ένα row ανά FAISS id).
+
+Το API δεν φορτώνει πια όλα τα metadata στη μνήμη: ανοίγει το αρχείο
+read-only και διαβάζει μόνο τα top-k rows κάθε αναζήτησης.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+META_DB_NAME = "docs_meta.sqlite"
+
+COLUMNS = ("filename", "pdf_path", "section_title", "section_idx", "chunk_id", "page", "page_confidence", "text")
+COLUMN_TYPES = {"section_idx": "INTEGER", "chunk_id": "INTEGER", "page": "INTEGER", "page_confidence": "REAL"}
+
+
+class MetaStoreWriter:
+    """Γράφει metadata με τη σειρά των FAISS ids (0, 1, 2, ...)."""
+
+    def __init__(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(
+            "CREATE TABLE chunks (id INTEGER PRIMARY KEY, "
+            + ", ".join(f"{c} {COLUMN_TYPES.get(c, 'TEXT')}" for c in COLUMNS)
+            + ", extra TEXT)"
+        )
+        self.count = 0
+
+    def add(self, entries):
+        rows = []
+        for entry in entries:
+            extra = {k: v for k, v in entry.items() if k not in COLUMNS}
+            rows.append((self.count, *(entry.get(c) for c in COLUMNS), json.dumps(extra, ensure_ascii=False) if extra else None))
+            self.count += 1
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO chunks VALUES ({', '.join('?' * (len(COLUMNS) + 2))})", rows)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def write_meta_store(path, metadata):
+    writer = MetaStoreWriter(path)
+    try:
+        writer.add(metadata)
+    finally:
+        writer.close()
+
+
+def _row_to_dict(row):
+    entry = dict(zip(COLUMNS, row[1:-1]))
+    if row[-1]:
+        entry.update(json.loads(row[-1]))
+    return entry
+
+
+class MetaStore:
+    """Read-only πρόσβαση στα metadata ενός snapshot, μία σύνδεση ανά thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._count = self._conn().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # immutable=1: το snapshot δεν αλλάζει ποτέ, οπότε χωρίς locking
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._count
+
+    def get_many(self, ids):
+        """{id: metadata} για τα ids που υπάρχουν."""
+        ids = [int(i) for i in ids if 0 <= int(i) < self._count]
+        if not ids:
+            return {}
+        rows = self._conn().execute(
+            f"SELECT * FROM chunks WHERE id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall()
+        return {row[0]: _row_to_dict(row) for row in rows}
+
+    def iter_rows(self, batch=1000):
+        """Όλα τα rows με σειρά id (για εργαλεία offline)."""
+        last = -1
+        while True:
+            rows = self._conn().execute(
+                "SELECT * FROM chunks WHERE id > ? ORDER BY id LIMIT ?", (last, batch)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_dict(row)
+            last = rows[-1][0]
+
+
+class ListMetaStore:
+    """Ίδιο interface πάνω σε λίστα (παλιά snapshots με docs_meta.json)."""
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+
+    def __len__(self):
+        return len(self.metadata)
+
+    def get_many(self, ids):
+        return {int(i): self.metadata[int(i)] for i in ids if 0 <= int(i) < len(self.metadata)}
+
+    def iter_rows(self, batch=1000):
+        return iter(self.metadata)
+
+
+def open_meta_store(directory, json_name="docs_meta.json"):
+    """MetaStore για φάκελο snapshot: SQLite αν υπάρχει, αλλιώς fallback στο JSON."""
+    db_path = os.path.join(directory, META_DB_NAME)
+    if os.path.exists(db_path):
+        return MetaStore(db_path)
+    with open(os.path.join(directory, json_name), "r", encoding="utf-8") as f:
+        return ListMetaStore(json.load(f))
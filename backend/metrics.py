@@ -0,0 +1,220 @@
+"""Ελαφριά metrics (counters / gauges / histograms) σε μορφή κειμένου Prometheus.
+
+Χωρίς εξωτερικές εξαρτήσεις: κάθε observe είναι ένα bisect και μια πρόσθεση
+κάτω από lock, οπότε μπορεί να μένει ενεργό και στην παραγωγή.
+
+  - Το API τα εκθέτει στο GET /metrics (api/health.py).
+  - Το index_docs.py τρέχει ως ξεχωριστό process: γράφει τα δικά του σε
+    textfile (INDEX_METRICS_FILE) που προστίθεται στο /metrics του API.
+
+Με METRICS_LOG=1 κάθε request τυπώνει και μία γραμμή JSON με τους χρόνους
+ανά στάδιο (RequestTimer).
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_LOG = os.getenv("METRICS_LOG", "0") == "1"
+INDEX_METRICS_FILE = os.getenv("INDEX_METRICS_FILE", "/data/index_metrics.prom")
+
+# Δευτερόλεπτα: από encode λίγων ms μέχρι κλήσεις LLM / φάσεις indexing
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+
+
+def _labels_text(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: αναμένονται labels {self.labelnames}, δόθηκαν {tuple(labels)}")
+        return tuple(labels[n] for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda kv: tuple(map(str, kv[0])))
+            lines.extend(self._samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self, items):
+        return [f"{self.name}{_labels_text(self.labelnames, key)} {_fmt(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def totals(self, **labels):
+        """(άθροισμα, πλήθος) των τιμών με αυτά τα labels."""
+        state = self._values.get(self._key(labels))
+        return (state[1], state[2]) if state else (0.0, 0)
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def _samples(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                labels = _labels_text(self.labelnames + ("le",), key + (_fmt(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Το metric {metric.name} υπάρχει ήδη")
+        self._metrics[metric.name] = metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Ατομική εγγραφή (μορφή node_exporter textfile collector)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+
+# -------------------- Χρόνοι ανά request --------------------
+_current = contextvars.ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Χρόνοι σταδίων ενός request: κάθε stage() γράφει στο histogram και,
+       για το structured log, στο dict του request. Το τρέχον στάδιο μένει
+       στο self.stage_name ώστε ένα σφάλμα να δηλώνει πού συνέβη.
+    """
+
+    def __init__(self, endpoint, histogram):
+        self.endpoint = endpoint
+        self.histogram = histogram
+        self.stages = {}
+        self.fields = {}
+        self.stage_name = None
+        self._t0 = time.perf_counter()
+        self._token = _current.set(self)
+
+    @contextmanager
+    def stage(self, name):
+        self.stage_name = name
+        t0 = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - t0
+        self.histogram.observe(elapsed, stage=name)
+        self.stages[name] = round(self.stages.get(name, 0.0) + elapsed * 1000, 3)
+        self.stage_name = None
+
+    def finish(self, status):
+        total = time.perf_counter() - self._t0
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            pass  # finish από άλλο context (π.χ. στο τέλος ενός stream)
+        if METRICS_LOG:
+            print(json.dumps({
+                "event": "request", "endpoint": self.endpoint, "status": status,
+                "total_ms": round(total * 1000, 3), "stages": self.stages, **self.fields,
+            }, ensure_ascii=False), flush=True)
+        return total
+
+
+@contextmanager
+def stage(name, histogram=None):
+    """Στάδιο του τρέχοντος request (αν υπάρχει), αλλιώς μόνο στο histogram."""
+    timer = _current.get()
+    if timer is not None:
+        with timer.stage(name):
+            yield
+    elif histogram is not None:
+        with histogram.time(stage=name):
+            yield
+    else:
+        yield
+
+
+def current_timer():
+    return _current.get()
@@ -0,0 +1,162 @@
+"""Μία σελίδα PDF ως μικρό PDF ή εικόνα (PNG / WebP), με cache στον δίσκο.
+
+Οι πηγές των απαντήσεων δείχνουν μία σελίδα, αλλά ο browser κατέβαζε όλο το
+PDF. Εδώ η σελίδα εξάγεται (PDF μίας σελίδας) ή αποδίδεται (PyMuPDF) και
+αποθηκεύεται στο PAGE_RENDER_DIR. Το κλειδί βγαίνει από το PDF (όνομα,
+μέγεθος, mtime), τη σελίδα, τη μορφή και τα dpi, οπότε:
+  - χρησιμεύει και ως ETag χωρίς να διαβαστεί τίποτα,
+  - ένα νέο PDF (μετά από αλλαγή του .docx) δίνει νέα κλειδιά.
+Όριο μεγέθους LRU: κάθε χρήση ανανεώνει το mtime του αρχείου και όταν το
+σύνολο ξεπεράσει το PAGE_RENDER_MAX_MB φεύγουν τα παλαιότερα.
+
+Το ίδιο cache γεμίζει και από το index_docs.py (--prerender-pages) για τις
+σελίδες που αναφέρουν τα chunks.
+"""
+import hashlib
+import os
+import threading
+
+import fitz
+
+PAGE_RENDER_DIR = os.getenv("PAGE_RENDER_DIR", "/data/page_render")
+PAGE_RENDER_MAX_MB = float(os.getenv("PAGE_RENDER_MAX_MB", "2048"))
+PAGE_RENDER_DPI = int(os.getenv("PAGE_RENDER_DPI", "110"))
+MAX_DPI = 300
+FORMATS = {"pdf": "application/pdf", "png": "image/png", "webp": "image/webp"}
+
+
+# Το PyMuPDF δεν είναι thread-safe και τα sync endpoints τρέχουν στο threadpool
+# του FastAPI → ένα render τη φορά ανά process.
+_FITZ_LOCK = threading.Lock()
+_page_counts = {}  # pdf_path -> ((size, mtime_ns), σελίδες)
+
+
+class PageNotFound(LookupError):
+    pass
+
+
+def render_page(pdf_path, page, fmt="pdf", dpi=PAGE_RENDER_DPI):
+    """bytes της σελίδας (1-based). PageNotFound αν η σελίδα δεν υπάρχει."""
+    with _FITZ_LOCK:
+        return _render_page(pdf_path, page, fmt, dpi)
+
+
+def page_count(pdf_path):
+    """Σελίδες του PDF, cached ανά (μέγεθος, mtime)· FileNotFoundError αν δεν υπάρχει."""
+    st = os.stat(pdf_path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    cached = _page_counts.get(pdf_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with _FITZ_LOCK, fitz.open(pdf_path) as doc:
+        count = doc.page_count
+    _page_counts[pdf_path] = (stamp, count)
+    return count
+
+
+def _render_page(pdf_path, page, fmt, dpi):
+    with fitz.open(pdf_path) as doc:
+        if not 1 <= page <= doc.page_count:
+            raise PageNotFound(f"Το {os.path.basename(pdf_path)} έχει {doc.page_count} σελίδες")
+        if fmt == "pdf":
+            with fitz.open() as out:
+                out.insert_pdf(doc, from_page=page - 1, to_page=page - 1)
+                return out.tobytes(garbage=3, deflate=True)
+        pix = doc[page - 1].get_pixmap(dpi=dpi)
+        if fmt == "png":
+            return pix.tobytes("png")
+        # Το PyMuPDF δεν γράφει WebP μόνο του → Pillow (προαιρετικό)
+        return pix.pil_tobytes(format="WEBP", quality=80, method=4)
+
+
+def webp_available():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PageCache:
+    def __init__(self, directory=PAGE_RENDER_DIR, max_bytes=int(PAGE_RENDER_MAX_MB * 2**20)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None  # υπολογίζεται στο πρώτο put
+        self._lock = threading.Lock()
+
+    def key(self, pdf_path, page, fmt, dpi=PAGE_RENDER_DPI):
+        """Κλειδί (και ETag) της σελίδας· FileNotFoundError αν δεν υπάρχει το PDF."""
+        st = os.stat(pdf_path)
+        dpi = dpi if fmt != "pdf" else 0
+        ident = f"{os.path.basename(pdf_path)}|{st.st_size}|{st.st_mtime_ns}|{page}|{fmt}|{dpi}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:24]
+
+    def path(self, key, fmt):
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    def get(self, pdf_path, page, fmt, dpi=PAGE_RENDER_DPI):
+        """(key, bytes, rendered) της σελίδας, με render αν δεν υπάρχει ήδη στο cache."""
+        key = self.key(pdf_path, page, fmt, dpi)
+        path = self.path(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # LRU: πρόσφατη χρήση
+            return key, data, False
+        except FileNotFoundError:
+            pass
+        data = render_page(pdf_path, page, fmt, dpi)
+        self._put(path, data)
+        return key, data, True
+
+    def ensure(self, pdf_path, page, fmt, dpi=PAGE_RENDER_DPI):
+        """Render μόνο αν λείπει (pre-render στο indexing). True αν έγινε render."""
+        path = self.path(self.key(pdf_path, page, fmt, dpi), fmt)
+        if os.path.exists(path):
+            return False
+        self._put(path, render_page(pdf_path, page, fmt, dpi))
+        return True
+
+    def _put(self, path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # το έσβησε άλλος worker
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Σβήνει τα λιγότερο πρόσφατα μέχρι το 90% του ορίου (όχι σε κάθε put)."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, name in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
@@ -0,0 +1,166 @@
+"""Pool από ζεστά instances LibreOffice για μαζική μετατροπή .docx → PDF.
+
+Κάθε OfficeWorker κρατά ένα lo_worker.py (με δικό του soffice) ανοιχτό και
+του στέλνει έγγραφα ένα-ένα, ώστε το κόστος εκκίνησης να πληρώνεται μία φορά
+ανά batch και όχι ανά αρχείο. Αν μια μετατροπή κολλήσει, ο worker σκοτώνεται
+και ξεκινά ξανά για το επόμενο αρχείο.
+"""
+import atexit
+import json
+import os
+import queue
+import select
+import signal
+import subprocess
+import threading
+import time
+
+UNO_PYTHON = os.getenv("UNO_PYTHON", "/usr/bin/python3")
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lo_worker.py")
+STARTUP_TIMEOUT = 90
+
+# Ζωντανοί workers: σε τερματισμό (π.χ. ακύρωση reindex) σκοτώνονται κι αυτοί, αφού
+# τρέχουν σε δικό τους process group και δεν τους φτάνει το signal του γονέα
+_live = set()
+
+
+class OfficeWorker:
+    def __init__(self, slot, timeout=180):
+        self.slot = slot
+        self.timeout = timeout
+        self.proc = None
+        self._buf = b""  # ό,τι διαβάστηκε από το stdout μετά την τελευταία πλήρη γραμμή
+
+    def start(self):
+        # bufsize=0, binary: το select βλέπει το fd, οπότε δεν πρέπει να μένουν γραμμές
+        # κρυμμένες σε buffer του Python (→ ψεύτικο timeout)· οι γραμμές χωρίζονται στο _read_reply
+        self.proc = subprocess.Popen(
+            [UNO_PYTHON, WORKER_SCRIPT, "--slot", str(self.slot)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0,
+            start_new_session=True,  # ίδιο process group με το soffice → kill και των δύο
+        )
+        self._buf = b""
+        _live.add(self)
+        ready = self._read_reply(STARTUP_TIMEOUT)
+        if not ready or not ready.get("ready"):
+            self.stop()
+            raise RuntimeError(f"Ο LibreOffice worker {self.slot} δεν ξεκίνησε")
+
+    def _read_reply(self, timeout):
+        deadline = time.time() + timeout
+        fd = self.proc.stdout.fileno()
+        while True:
+            line, sep, rest = self._buf.partition(b"\n")
+            if sep:
+                self._buf = rest
+                try:
+                    return json.loads(line)
+                except ValueError:  # JSONDecodeError ή UnicodeDecodeError: όχι γραμμή του worker
+                    continue
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return None  # ο worker τερμάτισε
+            self._buf += chunk
+
+    def _send(self, request):
+        data = (json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8")
+        while data:  # χωρίς buffer ένα write μπορεί να γράψει μέρος μόνο
+            data = data[self.proc.stdin.write(data):]
+
+    def convert(self, src, out):
+        """Μετατρέπει ένα αρχείο. Επιστρέφει True/False· σε timeout κάνει restart τον worker."""
+        if self.proc is None or self.proc.poll() is not None:
+            self.start()
+        try:
+            self._send({"src": src, "out": out})
+        except BrokenPipeError:
+            self.stop()
+            return False
+        result = self._read_reply(self.timeout)
+        if result is None:
+            print(f"⏱️ Timeout μετατροπής ({self.timeout}s): {os.path.basename(src)} → restart LibreOffice worker {self.slot}")
+            self.stop()
+            part = out + ".part"
+            if os.path.exists(part):
+                os.remove(part)
+            return False
+        if not result.get("ok"):
+            print(f"❌ Σφάλμα στη μετατροπή σε PDF: {os.path.basename(src)}: {result.get('error')}")
+            return False
+        return True
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            if self.proc.poll() is None:
+                self.proc.stdin.close()
+                try:
+                    self.proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+                    self.proc.wait()
+        except (OSError, ValueError):
+            pass
+        self.proc = None
+        _live.discard(self)
+
+
+@atexit.register
+def _kill_live_workers():
+    for worker in list(_live):
+        try:
+            os.killpg(worker.proc.pid, signal.SIGKILL)
+        except (OSError, AttributeError):
+            pass
+
+
+def convert_many(jobs, instances=1, timeout=180, on_progress=None):
+    """Μετατρέπει λίστα (docx_path, pdf_path) με `instances` ζεστούς workers.
+       Επιστρέφει τη λίστα των docx που απέτυχαν. Το on_progress(done, total)
+       καλείται μετά από κάθε αρχείο.
+    """
+    pending = queue.Queue()
+    for job in jobs:
+        pending.put(job)
+    failed = []
+    lock = threading.Lock()
+    total = len(jobs)
+    done = [0]
+
+    def run(slot):
+        worker = OfficeWorker(slot, timeout=timeout)
+        try:
+            while True:
+                try:
+                    src, out = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    ok = worker.convert(src, out)
+                except Exception as e:
+                    print(f"❌ LibreOffice worker {slot}: {e}")
+                    worker.stop()
+                    ok = False
+                with lock:
+                    done[0] += 1
+                    if not ok:
+                        failed.append(src)
+                    print(f"⚙️ PDF ({done[0]}/{total}): {os.path.basename(src)} {'✅' if ok else '❌'}")
+                    if on_progress is not None:
+                        on_progress(done[0], total)
+        finally:
+            worker.stop()
+
+    threads = [threading.Thread(target=run, args=(slot,), daemon=True) for slot in range(max(1, instances))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return failed
@@ -0,0 +1,122 @@
+"""Έλεγχος ποιότητας του βελτιστοποιημένου encoder / vector storage έναντι του fp32.
+
+Παίρνει δείγμα chunks από το ενεργό snapshot και ερωτήσεις (από αρχείο ή την
+αρχή τυχαίων chunks), κωδικοποιεί με το fp32 μοντέλο και με το backend που
+ελέγχεται, και αναφέρει την επικάλυψη των top-k αποτελεσμάτων (overlap@k)
+καθώς και τον χρόνο encode ανά ερώτηση.
+
+    EMBED_BACKEND=onnx-int8 python3 quant_check.py --vector-storage sq8 --sample 3000
+"""
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+import index_docs
+import snapshots
+from embedding import BACKENDS, EMBED_BACKEND, load_model, model_id
+from meta_store import open_meta_store
+
+
+def sample_chunks(n, seed):
+    version = snapshots.current_version()
+    if not version:
+        raise SystemExit("❌ Δεν υπάρχει ενεργό snapshot – τρέξε πρώτα το index_docs.py")
+    metadata = open_meta_store(snapshots.snapshot_path(version), json_name=snapshots.META_NAME)
+    rng = np.random.default_rng(seed)
+    ids = sorted(rng.choice(len(metadata), min(n, len(metadata)), replace=False).tolist())
+    rows = metadata.get_many(ids)
+    return version, [rows[i]["text"] for i in ids]
+
+
+def encode(model, texts):
+    t0 = time.perf_counter()
+    vecs = model.encode(texts, convert_to_numpy=True, batch_size=32).astype("float32")
+    elapsed = time.perf_counter() - t0
+    faiss.normalize_L2(vecs)
+    return vecs, elapsed
+
+
+def query_latency_ms(model, questions, repeats=1):
+    samples = []
+    for _ in range(repeats):
+        for q in questions:
+            t0 = time.perf_counter()
+            model.encode([q], convert_to_numpy=True)
+            samples.append(time.perf_counter() - t0)
+    return round(float(np.percentile(samples, 50)) * 1000, 2), round(float(np.percentile(samples, 99)) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlap@k βελτιστοποιημένου encoder/storage έναντι fp32")
+    parser.add_argument("--backend", choices=BACKENDS, default=EMBED_BACKEND)
+    parser.add_argument("--vector-storage", choices=sorted(index_docs.VECTOR_CODECS), default=index_docs.VECTOR_STORAGE)
+    parser.add_argument("--sample", type=int, default=2000, help="Chunks του corpus που χρησιμοποιούνται")
+    parser.add_argument("--queries", type=int, default=200, help="Ερωτήσεις από την αρχή τυχαίων chunks")
+    parser.add_argument("--questions", help="Αρχείο με ερωτήσεις (μία ανά γραμμή)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-overlap", type=float, default=0.9, help="Κάτω όριο για exit code 0")
+    parser.add_argument("--output", help="Αποθήκευση αποτελεσμάτων σε JSON")
+    args = parser.parse_args()
+
+    version, chunks = sample_chunks(args.sample, args.seed)
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+    else:
+        rng = np.random.default_rng(args.seed + 1)
+        picks = rng.choice(len(chunks), min(args.queries, len(chunks)), replace=False)
+        questions = [" ".join(chunks[i].split()[:15]) for i in picks]
+    passages = [f"passage: {c}" for c in chunks]
+    print(f"📊 Snapshot {version}: {len(chunks)} chunks, {len(questions)} ερωτήσεις, k={args.k}")
+
+    baseline = load_model("torch")
+    base_docs, base_doc_s = encode(baseline, passages)
+    base_q, _ = encode(baseline, questions)
+    base_p50, base_p99 = query_latency_ms(baseline, questions[:50])
+
+    candidate = baseline if args.backend == "torch" else load_model(args.backend)
+    cand_docs, cand_doc_s = encode(candidate, passages)
+    cand_q, _ = encode(candidate, questions)
+    cand_p50, cand_p99 = query_latency_ms(candidate, questions[:50])
+
+    flat = faiss.IndexFlatIP(base_docs.shape[1])
+    flat.add(base_docs)
+    _, truth = flat.search(base_q, args.k)
+
+    factory = index_docs.apply_vector_storage("Flat", args.vector_storage)
+    cand_index = index_docs.create_faiss_index(cand_docs.copy(), factory=factory)
+    _, found = cand_index.search(cand_q, args.k)
+
+    overlap = float(np.mean([len(set(t) & set(f)) / args.k for t, f in zip(truth.tolist(), found.tolist())]))
+    top1 = float(np.mean(truth[:, 0] == found[:, 0]))
+    report = {
+        "snapshot": version,
+        "backend": model_id(args.backend),
+        "vector_storage": args.vector_storage,
+        "chunks": len(chunks),
+        "queries": len(questions),
+        f"overlap@{args.k}": round(overlap, 4),
+        "top1_agreement": round(top1, 4),
+        "query_encode_ms": {"fp32": {"p50": base_p50, "p99": base_p99}, args.backend: {"p50": cand_p50, "p99": cand_p99}},
+        "passage_encode_s": {"fp32": round(base_doc_s, 2), args.backend: round(cand_doc_s, 2)},
+        "index_size_mb": {
+            "fp32": round(faiss.serialize_index(flat).nbytes / 1e6, 2),
+            args.vector_storage: round(faiss.serialize_index(cand_index).nbytes / 1e6, 2),
+        },
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if overlap < args.min_overlap:
+        raise SystemExit(f"❌ overlap@{args.k}={overlap:.3f} < {args.min_overlap}")
+    print(f"✅ overlap@{args.k}={overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Εκκίνηση του API (αντί για σκέτο `uvicorn main:app`).
+
+WEB_WORKERS=1 (default): ένα uvicorn process με το μοντέλο μέσα του, όπως πριν.
+
+WEB_WORKERS>1: ξεκινά πρώτα ένας embed server (api/embed_server.py) με το
+μοντέλο e5 και μετά οι uvicorn workers, που:
+  - κωδικοποιούν τις ερωτήσεις μέσω του Unix socket του (EMBED_SERVER_SOCKET),
+  - φορτώνουν FAISS index και BM25 με mmap (INDEX_MMAP=1), οπότε μοιράζονται
+    ένα αντίγραφο στο page cache· τα metadata είναι ήδη SQLite στον δίσκο.
+Έτσι η μνήμη δεν μεγαλώνει γραμμικά με τους workers. Ιστορικό συνομιλίας,
+cache απαντήσεων και /metrics παραμένουν ανά worker.
+
+Αν ο embed server τερματιστεί, ξαναξεκινά (με αυξανόμενη αναμονή αν πέφτει
+συνεχώς)· οι workers ξανασυνδέονται μόνοι τους και μέχρι τότε το /readyz
+επιστρέφει 503.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import uvicorn
+
+from api.embed_server import DEFAULT_SOCKET
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+EMBED_RESTART_MAX_DELAY = 30.0
+EMBED_STABLE_AFTER = 60.0  # μετά από τόσα δευτερόλεπτα λειτουργίας η αναμονή μηδενίζεται
+
+
+class EmbedServerProcess:
+    """Ο embed server ως child process, με restart όταν τερματιστεί απρόσμενα."""
+
+    def __init__(self, cwd):
+        self.cwd = cwd
+        self.proc = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()  # stop() και restart δεν τρέχουν ταυτόχρονα
+
+    def _spawn(self):
+        with self._lock:
+            if not self._stopping.is_set():
+                self.proc = subprocess.Popen([sys.executable, "-m", "api.embed_server"], cwd=self.cwd)
+        return self.proc
+
+    def start(self):
+        self._spawn()
+        threading.Thread(target=self._supervise, name="embed-supervisor", daemon=True).start()
+        return self.proc.pid
+
+    def _supervise(self):
+        delay = 1.0
+        while True:
+            started = time.monotonic()
+            code = self.proc.wait()
+            if self._stopping.is_set():
+                return
+            if time.monotonic() - started >= EMBED_STABLE_AFTER:
+                delay = 1.0
+            print(f"⚠️ Ο embed server τερματίστηκε (exit {code}) – επανεκκίνηση σε {delay:.0f}s", flush=True)
+            if self._stopping.wait(delay):
+                return
+            delay = min(delay * 2, EMBED_RESTART_MAX_DELAY)
+            if self._spawn().returncode is not None:
+                return  # stop() στο μεταξύ
+            print(f"🔄 Embed server (pid {self.proc.pid})", flush=True)
+
+    def stop(self):
+        with self._lock:
+            self._stopping.set()
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def main():
+    if WEB_WORKERS <= 1:
+        uvicorn.run("main:app", host=HOST, port=PORT)
+        return
+
+    # Τα env περνούν στους workers (νέα processes που κάνουν import το app από την αρχή)
+    os.environ.setdefault("EMBED_SERVER_SOCKET", DEFAULT_SOCKET)
+    os.environ.setdefault("INDEX_MMAP", "1")
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    server = EmbedServerProcess(backend_dir)
+    print(f"🚀 Embed server (pid {server.start()}) + {WEB_WORKERS} uvicorn workers")
+    try:
+        uvicorn.run("main:app", host=HOST, port=PORT, workers=WEB_WORKERS)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Versioned snapshots του index στο /data/snapshots.
+
+Το index_docs.py γράφει κάθε νέο index σε staging φάκελο, τον μετονομάζει
+ατομικά σε snapshots/<version> και μετά αλλάζει το /data/CURRENT (πάλι
+ατομικά, με os.replace). Το API διαβάζει μόνο ολοκληρωμένα snapshots.
+"""
+import fcntl
+import json
+import os
+import shutil
+import time
+import uuid
+
+DATA_DIR = "/data"
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+CURRENT_FILE = os.path.join(DATA_DIR, "CURRENT")
+KEEP_SNAPSHOTS = int(os.getenv("KEEP_SNAPSHOTS", "3"))
+# Ένα indexing τη φορά (CLI ή POST /api/reindex)
+LOCK_FILE = os.path.join(DATA_DIR, "reindex.lock")
+
+INDEX_NAME = "faiss.index"
+META_NAME = "docs_meta.json"
+MANIFEST_NAME = "manifest.json"
+FILTERS_NAME = "filters.json"
+
+
+def new_version():
+    return time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+def snapshot_path(version):
+    return os.path.join(SNAPSHOT_DIR, version)
+
+
+def staging_dir(version):
+    path = os.path.join(SNAPSHOT_DIR, f".staging-{version}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def current_version():
+    try:
+        with open(CURRENT_FILE, "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    if version and os.path.isdir(snapshot_path(version)):
+        return version
+    return None
+
+
+def try_lock(path=LOCK_FILE):
+    """flock χωρίς αναμονή. Επιστρέφει το fd (το lock κρατιέται όσο είναι ανοιχτό,
+       και από processes που το κληρονομούν) ή None αν τρέχει ήδη άλλο indexing.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def read_manifest(version):
+    if not version:
+        return {}
+    path = os.path.join(snapshot_path(version), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json_atomic(path, data, **kwargs):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def publish(staging, version, manifest):
+    """Ολοκληρώνει το snapshot: manifest → rename → CURRENT → καθάρισμα παλιών."""
+    manifest = dict(manifest, version=version, created_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    write_json_atomic(os.path.join(staging, MANIFEST_NAME), manifest, indent=2)
+    final = snapshot_path(version)
+    os.replace(staging, final)
+
+    tmp = f"{CURRENT_FILE}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CURRENT_FILE)
+
+    prune(keep=KEEP_SNAPSHOTS)
+    return final
+
+
+def prune(keep=KEEP_SNAPSHOTS):
+    """Κρατά τα `keep` πιο πρόσφατα snapshots (και πάντα το CURRENT)."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return
+    current = current_version()
+    versions = sorted(v for v in os.listdir(SNAPSHOT_DIR) if not v.startswith("."))
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            shutil.rmtree(snapshot_path(version), ignore_errors=True)
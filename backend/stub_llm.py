@@ -0,0 +1,47 @@
+"""Stub του Ollama για τοπικές δοκιμές του /api/ask/stream.
+
+    uvicorn stub_llm:app --port 11434
+    OLLAMA_URL=http://localhost:11434 uvicorn main:app
+
+Απαντά στο POST /api/generate με NDJSON, όπως το Ollama, στέλνοντας μία λέξη
+ανά STUB_TOKEN_DELAY δευτερόλεπτα. Για δοκιμές σφαλμάτων (και στο tests/):
+STUB_STATUS ≠ 200 → HTTP σφάλμα πριν από κάθε token, STUB_FAIL_AFTER=N →
+γραμμή {"error": ...} μετά από N tokens, όπως όταν το Ollama σταματά στη μέση.
+"""
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+TOKEN_DELAY = float(os.getenv("STUB_TOKEN_DELAY", "0.05"))
+ANSWER = os.getenv("STUB_ANSWER", "Σύμφωνα με τις πηγές που βρέθηκαν, η απάντηση είναι η εξής.")
+STATUS = int(os.getenv("STUB_STATUS", "200"))
+FAIL_AFTER = int(os.getenv("STUB_FAIL_AFTER", "-1"))  # -1 = χωρίς σφάλμα
+
+app = FastAPI(title="Stub LLM")
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+    words = ANSWER.split(" ")
+
+    if STATUS != 200:
+        return JSONResponse({"error": f"stub status {STATUS}"}, status_code=STATUS)
+
+    async def lines():
+        for i, word in enumerate(words):
+            if i == FAIL_AFTER:
+                yield json.dumps({"error": "stub: το μοντέλο σταμάτησε"}, ensure_ascii=False) + "\n"
+                return
+            await asyncio.sleep(TOKEN_DELAY)
+            token = word if i == 0 else " " + word
+            yield json.dumps({"model": model, "response": token, "done": False}, ensure_ascii=False) + "\n"
+        yield json.dumps({"model": model, "response": "", "done": True}) + "\n"
+
+    if not body.get("stream", True):
+        return {"model": model, "response": ANSWER, "done": True}
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Τα modules του backend γίνονται import όπως στο container (WORKDIR /app = backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,125 @@
+"""AnswerCache: L1 (κανονικοποιημένο κείμενο), L2 (cosine + ίδιες αναφορές), εκδόσεις index, όρια."""
+import numpy as np
+import pytest
+
+from api import answer_cache
+from api.answer_cache import AnswerCache, normalize_question
+from api.filters import SearchFilters
+
+ANSWER = {"answers": [{"answer": "δέκα ημέρες", "score": 0.9}], "context": ["..."], "llm_answer": "Δέκα ημέρες."}
+
+
+def emb(*values):
+    v = np.asarray([values], dtype="float32")
+    return v / np.linalg.norm(v)
+
+
+def test_normalize_question():
+    assert normalize_question("Ποια είναι η  ΠΡΟΘΕΣΜΊΑ;") == normalize_question("ποια ειναι η προθεσμια")
+    assert normalize_question("Τι ισχύει;!…  ") == "τι ισχυει"
+    assert normalize_question("άρθρο 12") != normalize_question("άρθρο 13")
+
+
+def test_l1_hit_and_miss():
+    cache = AnswerCache()
+    cache.put("v1", "Ποια είναι η προθεσμία;", None, ANSWER)
+    assert cache.get("v1", "ποια ειναι η προθεσμια") == ANSWER
+    assert cache.get("v1", "Ποια είναι η εγγύηση;") is None
+
+
+def test_filters_are_part_of_the_key():
+    cache = AnswerCache()
+    cache.put("v1", "προθεσμία", emb(1, 0), ANSWER, SearchFilters(filename="a.docx"))
+    assert cache.get("v1", "προθεσμία") is None
+    assert cache.get("v1", "προθεσμία", SearchFilters(filename="b.docx")) is None
+    assert cache.get("v1", "προθεσμία", SearchFilters(filename="a.docx")) == ANSWER
+    # κενά φίλτρα = χωρίς φίλτρα
+    cache.put("v1", "εγγύηση", emb(0, 1), ANSWER, SearchFilters())
+    assert cache.get("v1", "εγγύηση") == ANSWER
+    assert cache.get_similar("v1", "εγγυηση τωρα", emb(0, 1), SearchFilters(filename="a.docx")) is None
+
+
+def test_new_index_version_empties_both_levels():
+    cache = AnswerCache()
+    cache.put("v1", "προθεσμία", emb(1, 0), ANSWER)
+    assert cache.get("v2", "προθεσμία") is None
+    assert cache.get_similar("v2", "προθεσμία", emb(1, 0)) is None
+    assert cache.stats() == {"version": "v2", "entries": 0, "vectors": 0}
+    assert cache.get("v1", "προθεσμία") is None  # δεν επιστρέφει ούτε στην παλιά έκδοση
+
+
+def test_old_version_requests_do_not_reset_the_cache():
+    cache = AnswerCache()
+    cache.put("v1", "παλιά", emb(0, 1), ANSWER)
+    cache.put("v2", "προθεσμία", emb(1, 0), ANSWER)
+    # request που ξεκίνησε πριν από το reload: miss, χωρίς αποθήκευση και χωρίς reset
+    assert cache.get("v1", "προθεσμία") is None
+    assert cache.get_similar("v1", "προθεσμία", emb(1, 0)) is None
+    cache.put("v1", "παλιά", emb(0, 1), ANSWER)
+    assert cache.stats() == {"version": "v2", "entries": 1, "vectors": 1}
+    assert cache.get("v2", "προθεσμία") == ANSWER
+    assert cache.get("v2", "παλιά") is None
+
+
+def test_snapshot_versions_are_newer_than_legacy():
+    cache = AnswerCache()
+    cache.put("legacy", "προθεσμία", None, ANSWER)
+    assert cache.get("20260101T000000-abcdef", "προθεσμία") is None
+    cache.put("legacy", "προθεσμία", None, ANSWER)
+    assert cache.stats()["version"] == "20260101T000000-abcdef"
+    assert cache.stats()["entries"] == 0
+
+
+def test_l2_similarity_threshold():
+    cache = AnswerCache(similarity=0.95)
+    cache.put("v1", "Ποια είναι η προθεσμία ένστασης;", emb(1, 0.1), ANSWER)
+    assert cache.get_similar("v1", "Σε πόσες μέρες κάνω ένσταση;", emb(1, 0.15)) == ANSWER
+    assert cache.get_similar("v1", "Τι είναι η εγγυητική επιστολή;", emb(0.2, 1)) is None
+
+
+def test_l2_requires_equal_references():
+    cache = AnswerCache(similarity=0.9)
+    cache.put("v1", "Τι ορίζει το άρθρο 12;", emb(1, 0), ANSWER)
+    assert cache.get_similar("v1", "Τι ορίζει το άρθρο 13;", emb(1, 0)) is None
+    assert cache.get_similar("v1", "Τι ορίζει το άρθρο;", emb(1, 0)) is None
+    assert cache.get_similar("v1", "Τι λέει το άρθρο 12;", emb(1, 0)) == ANSWER
+
+
+def test_l2_returns_best_match():
+    cache = AnswerCache(similarity=0.5)
+    cache.put("v1", "πρώτη", emb(1, 0), {"llm_answer": "1"})
+    cache.put("v1", "δεύτερη", emb(0.6, 0.8), {"llm_answer": "2"})
+    assert cache.get_similar("v1", "τρίτη", emb(0.7, 0.7))["llm_answer"] == "2"
+
+
+def test_put_without_embedding_updates_l2_answer():
+    # Μετά από L1 hit δεν γίνεται encode· το L2 πρέπει να δίνει την ίδια (νεότερη) απάντηση
+    cache = AnswerCache()
+    cache.put("v1", "προθεσμία", emb(1, 0), {"answers": [], "context": []})
+    cache.put("v1", "προθεσμία", None, ANSWER)
+    assert cache.get("v1", "προθεσμία") == ANSWER
+    assert cache.get_similar("v1", "προθεσμια τωρα", emb(1, 0)) == ANSWER
+    assert cache.stats()["vectors"] == 1
+
+
+def test_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(answer_cache.time, "monotonic", lambda: now[0])
+    cache = AnswerCache(ttl=10)
+    cache.put("v1", "προθεσμία", emb(1, 0), ANSWER)
+    now[0] += 11
+    assert cache.get("v1", "προθεσμία") is None
+    assert cache.get_similar("v1", "προθεσμία", emb(1, 0)) is None
+    assert cache.stats()["vectors"] == 0
+
+
+@pytest.mark.parametrize("max_entries, max_vectors", [(2, 2), (2, 0)])
+def test_lru_limits(max_entries, max_vectors):
+    cache = AnswerCache(max_entries=max_entries, max_vectors=max_vectors)
+    cache.put("v1", "α", emb(1, 0), ANSWER)
+    cache.put("v1", "β", emb(0, 1), ANSWER)
+    cache.get("v1", "α")  # το α γίνεται πιο πρόσφατο
+    cache.put("v1", "γ", emb(1, 1), ANSWER)
+    assert cache.get("v1", "β") is None
+    assert cache.get("v1", "α") == ANSWER and cache.get("v1", "γ") == ANSWER
+    assert cache.stats()["vectors"] == max_vectors
@@ -0,0 +1,181 @@
+"""/api/ask/stream πάνω στο stub_llm.py (χωρίς Ollama, μοντέλο e5 ή snapshot στον δίσκο).
+
+Ελέγχει το SSE framing (sources → token… → done), την απάντηση σε ένα token
+από το cache, και τα σφάλματα: πριν το stream με HTTP κωδικό + X-Error-Stage,
+μέσα στο stream ως event: error.
+"""
+import json
+
+import faiss
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import stub_llm
+from api import ask, index_state, llm, service
+from meta_store import ListMetaStore
+
+DIM = 8
+CHUNKS = [
+    {"filename": "ν_4412_2016.docx", "page": 3, "text": "Η προθεσμία ένστασης είναι δέκα ημέρες."},
+    {"filename": "εγκύκλιος_5.docx", "page": 1, "text": "Η εγγυητική επιστολή καταθέτεται με την προσφορά."},
+]
+
+
+class FakeEncoder:
+    """Ίδιο vector για κάθε κείμενο: η κατάταξη δεν ενδιαφέρει εδώ, μόνο η ροή του endpoint."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def encode(self, texts):
+        if self.error is not None:
+            raise self.error
+        return np.ones((len(texts), DIM), dtype="float32")
+
+
+def parse_sse(body):
+    """[(event, data)] από το κείμενο ενός text/event-stream."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch):
+    index = faiss.IndexFlatIP(DIM)
+    vectors = np.random.default_rng(0).standard_normal((len(CHUNKS), DIM)).astype("float32")
+    faiss.normalize_L2(vectors)
+    index.add(vectors)
+    monkeypatch.setattr(index_state, "_active", index_state.IndexSnapshot("test", index, ListMetaStore(CHUNKS)))
+    monkeypatch.setattr(service, "encoder", FakeEncoder())
+    monkeypatch.setitem(service._status, "ready", True)
+    monkeypatch.setattr(stub_llm, "TOKEN_DELAY", 0.0)
+    # Το LLM client μιλά κατευθείαν στο ASGI app του stub (νέος client ανά request: κάθε TestClient request έχει δικό του loop)
+    monkeypatch.setattr(llm, "client", lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=stub_llm.app),
+                                                                   base_url="http://stub-llm"))
+    ask.CACHE.clear()
+
+    app = FastAPI()
+    app.include_router(ask.router)
+    return TestClient(app)
+
+
+def stream(client, question, **body):
+    r = client.post("/api/ask/stream", json={"question": question, **body})
+    return r, parse_sse(r.text) if r.status_code == 200 else None
+
+
+def test_stream_events(client):
+    r, events = stream(client, "Ποια είναι η προθεσμία ένστασης;")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    names = [name for name, _ in events]
+    assert names[0] == "sources" and names[-1] == "done"
+    assert set(names[1:-1]) == {"token"}
+    assert len(names) - 2 == len(stub_llm.ANSWER.split(" "))
+
+    sources = events[0][1]
+    assert sources["query"] == "Ποια είναι η προθεσμία ένστασης;"
+    assert {"answer", "score", "page_url"} <= set(sources["answers"][0])
+    tokens = "".join(data["text"] for name, data in events if name == "token")
+    assert tokens == stub_llm.ANSWER
+    assert events[-1][1] == {"llm_answer": stub_llm.ANSWER}
+
+
+def test_cache_hit_is_single_token(client, monkeypatch):
+    question = "Ποια είναι η προθεσμία ένστασης;"
+    stream(client, question)
+    # Αν ξανακαλούνταν το LLM θα έστελνε αυτό
+    monkeypatch.setattr(stub_llm, "ANSWER", "άλλη απάντηση")
+
+    r, events = stream(client, "ποια ειναι η προθεσμια ενστασης")
+    assert [name for name, _ in events] == ["sources", "token", "done"]
+    assert events[0][1]["cached"] is True
+    assert events[1][1] == {"text": "Σύμφωνα με τις πηγές που βρέθηκαν, η απάντηση είναι η εξής."}
+    assert events[2][1]["cached"] is True
+
+
+def test_no_results(client, monkeypatch):
+    monkeypatch.setattr(index_state, "_active",
+                        index_state.IndexSnapshot("empty", faiss.IndexFlatIP(DIM), ListMetaStore([])))
+    r, events = stream(client, "Κάτι")
+    assert [name for name, _ in events] == ["sources", "done"]
+    assert events[0][1]["answers"][0]["answer"] == ask.NO_RESULTS
+
+
+@pytest.mark.parametrize("status", [500, 404])
+def test_llm_http_error_mid_stream(client, monkeypatch, status):
+    monkeypatch.setattr(stub_llm, "STATUS", status)
+    r, events = stream(client, "Ποια είναι η προθεσμία ένστασης;")
+    # Οι πηγές έχουν ήδη σταλεί με 200 → το σφάλμα έρχεται ως event, με το στάδιο
+    assert r.status_code == 200
+    assert [name for name, _ in events] == ["sources", "error"]
+    error = events[1][1]
+    assert error["stage"] == "llm"
+    assert f"LLM HTTP {status}" in error["detail"]
+
+
+def test_llm_error_after_some_tokens(client, monkeypatch):
+    monkeypatch.setattr(stub_llm, "FAIL_AFTER", 3)
+    r, events = stream(client, "Ποια είναι η προθεσμία ένστασης;")
+    assert [name for name, _ in events] == ["sources", "token", "token", "token", "error"]
+    assert events[-1][1]["stage"] == "llm"
+    assert "σταμάτησε" in events[-1][1]["detail"]
+    # Μισή απάντηση δεν μπαίνει στο cache
+    assert ask.CACHE.stats()["entries"] == 0
+
+
+def test_empty_question(client):
+    r, _ = stream(client, "   ")
+    assert r.status_code == 400
+
+
+def test_not_ready(client, monkeypatch):
+    monkeypatch.setitem(service._status, "ready", False)
+    r, _ = stream(client, "Ποια είναι η προθεσμία;")
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "5"
+
+
+@pytest.mark.parametrize("error, status", [
+    (RuntimeError("το μοντέλο κατέρρευσε"), 500),
+    (ConnectionRefusedError("embed server down"), 503),
+])
+def test_error_before_stream_has_stage(client, monkeypatch, error, status):
+    monkeypatch.setattr(service, "encoder", FakeEncoder(error))
+    r, _ = stream(client, "Ποια είναι η προθεσμία;")
+    assert r.status_code == status
+    assert r.headers["x-error-stage"] == "encode"
+
+
+def test_filters_without_support(client):
+    r, _ = stream(client, "Ποια είναι η προθεσμία;", filters={"filename": "ν_4412_2016.docx"})
+    assert r.status_code == 400
+
+
+def test_sync_ask_fills_cache_without_llm_answer(client, monkeypatch):
+    question = "Ποια είναι η προθεσμία ένστασης;"
+    first = client.post("/api/ask", json={"question": question}).json()
+    assert "cached" not in first
+
+    second = client.post("/api/ask", json={"question": "ποια ειναι η προθεσμια ενστασης"}).json()
+    assert second["cached"] is True
+    assert second["answers"] == first["answers"]
+    assert second["llm_answer"] == ask.LLM_PLACEHOLDER
+
+    # Το stream παίρνει τις πηγές από το cache αλλά καλεί το LLM, όχι το placeholder
+    monkeypatch.setattr(service, "encoder", FakeEncoder(RuntimeError("δεν έπρεπε να γίνει encode")))
+    r, events = stream(client, question)
+    assert events[0][1]["cached"] is True
+    assert events[0][1]["answers"] == first["answers"]
+    assert events[-1][1] == {"llm_answer": stub_llm.ANSWER}
+
+    # …και η απάντηση του LLM μένει πλέον στο cache και για τα δύο endpoints
+    third = client.post("/api/ask", json={"question": question}).json()
+    assert third["llm_answer"] == stub_llm.ANSWER
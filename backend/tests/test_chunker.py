@@ -0,0 +1,117 @@
+"""TokenChunker με έναν μικρό tokenizer σε μορφή HF (χωρίς λήψη του tokenizer του e5):
+κάθε λέξη σπάει σε κομμάτια των 4 χαρακτήρων, ώστε να υπάρχουν και "subword" tokens.
+"""
+import importlib
+import re
+
+import pytest
+
+import chunker
+from chunker import TABLE_MARK, TokenChunker
+
+PIECE = 4
+
+
+class SubwordTokenizer:
+    model_max_length = 512
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=True):
+        offsets = []
+        for m in re.finditer(r"\w+|[^\w\s]", text):
+            for start in range(m.start(), m.end(), PIECE):
+                offsets.append((start, min(start + PIECE, m.end())))
+        return {"input_ids": list(range(len(offsets))), "offset_mapping": offsets}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+
+def make_chunker(max_tokens=40, overlap=10):
+    return TokenChunker(SubwordTokenizer(), max_tokens=max_tokens, overlap_tokens=overlap)
+
+
+def sentences(n):
+    return " ".join(f"Η διάταξη {i} ορίζει την προθεσμία υποβολής της αίτησης." for i in range(n))
+
+
+def test_short_text_is_one_chunk():
+    c = make_chunker()
+    assert c.split_text("  Η προθεσμία είναι δέκα ημέρες.  ") == ["Η προθεσμία είναι δέκα ημέρες."]
+    assert c.split_text("") == []
+
+
+def test_limit_leaves_room_for_prefix_and_special_tokens():
+    tok = SubwordTokenizer()
+    c = TokenChunker(tok, max_tokens=10_000)
+    # "passage: " = 3 tokens ("pass", "age", ":") + [CLS]/[SEP]
+    assert c.max_tokens == tok.model_max_length - 3 - 2
+    assert TokenChunker(tok, max_tokens=40, overlap_tokens=100).overlap == 20
+
+
+def test_chunks_fit_and_end_on_words():
+    c = make_chunker()
+    text = sentences(20)
+    chunks = c.split_text(text)
+    assert len(chunks) > 1
+    words = set(text.replace(".", " ").split())
+    for chunk in chunks:
+        assert c.count(chunk) <= c.max_tokens
+        assert chunk in text
+        first, last = chunk.split()[0], chunk.rstrip(".").split()[-1]
+        assert first in words and last in words  # ούτε αρχή ούτε τέλος στη μέση λέξης
+
+
+def test_prefers_sentence_end():
+    chunks = make_chunker().split_text(sentences(20))
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def test_consecutive_chunks_overlap():
+    c = make_chunker(overlap=10)
+    text = sentences(20)
+    chunks = c.split_text(text)
+    starts = [text.index(chunks[0])]
+    for chunk in chunks[1:]:
+        starts.append(text.index(chunk, starts[-1] + 1))
+    for prev, start, nxt_start in zip(chunks, starts, starts[1:]):
+        shared = text[nxt_start:start + len(prev)]
+        assert shared and prev.endswith(shared)  # το επόμενο ξαναρχίζει μέσα στο προηγούμενο
+        assert c.count(shared) <= c.overlap
+    assert text.endswith(chunks[-1])
+
+
+def test_single_long_word_still_progresses():
+    c = make_chunker(max_tokens=16, overlap=4)
+    chunks = c.split_text("α" * 200)
+    assert "".join(chunks) == "α" * 200
+    assert all(c.count(chunk) <= c.max_tokens for chunk in chunks)
+
+
+def test_table_joined_with_intro():
+    c = make_chunker(max_tokens=200)
+    table = f"{TABLE_MARK}\nΕίδος | Ποσό\n--- | ---\nΑμοιβή | 100\nΈξοδα | 20"
+    section = f"Τα ποσά της σύμβασης φαίνονται στον παρακάτω πίνακα:\n{table}"
+    assert c.chunk_section(section) == [f"Τα ποσά της σύμβασης φαίνονται στον παρακάτω πίνακα:\n\n{table}"]
+
+
+def test_large_table_repeats_header():
+    c = make_chunker(max_tokens=40)
+    rows = [f"Γραμμή {i} | τιμή {i} ευρώ" for i in range(30)]
+    table = "\n".join([TABLE_MARK, "Περιγραφή | Ποσό", "--- | ---"] + rows)
+    chunks = c.split_table(table)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith(f"{TABLE_MARK}\nΠεριγραφή | Ποσό\n--- | ---")
+        assert c.count(chunk) <= c.max_tokens
+    assert [r for chunk in chunks for r in chunk.split("\n")[3:]] == rows
+
+
+def test_chunker_id_follows_parameters(monkeypatch):
+    default = chunker.CHUNKER_ID
+    monkeypatch.setenv("CHUNK_TOKENS", str(chunker.CHUNK_TOKENS + 1))
+    try:
+        assert importlib.reload(chunker).CHUNKER_ID != default
+    finally:
+        monkeypatch.delenv("CHUNK_TOKENS")
+        importlib.reload(chunker)
+    assert chunker.CHUNKER_ID == default
@@ -0,0 +1,81 @@
+"""MinHash/LSH dedup: ποια chunks ενώνονται και τι πηγές κρατά το μοναδικό."""
+import pytest
+
+from dedup import Duplicates, NearDuplicateIndex, lsh_bands
+
+ARTICLE = (
+    "Η αναθέτουσα αρχή εξετάζει τις προσφορές των οικονομικών φορέων και αποφασίζει για την ανάθεση "
+    "της σύμβασης εντός προθεσμίας τριάντα ημερών από την ολοκλήρωση της αξιολόγησης, σύμφωνα με "
+    "τους όρους της διακήρυξης και τις διατάξεις του ν. 4412/2016 για τις δημόσιες συμβάσεις έργων."
+)
+
+
+def entry(filename, text, page=1):
+    return {"filename": filename, "pdf_path": f"/data/pdfs/{filename}.pdf", "page": page,
+            "section_title": "Άρθρο 5", "section_idx": 0, "text": text}
+
+
+def run(entries, threshold=0.9):
+    dups = Duplicates(threshold)
+    assert list(dups.scan(entries)) == entries  # το scan περνά τα chunks αυτούσια
+    return dups, list(dups.apply(entries))
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9, 0.95])
+def test_lsh_bands_below_threshold(threshold):
+    bands, rows = lsh_bands(threshold)
+    assert bands * rows == 64
+    assert (1 / bands) ** (1 / rows) <= threshold
+
+
+def test_exact_and_formatting_copies_are_merged():
+    entries = [entry("a.docx", ARTICLE), entry("b.docx", ARTICLE.upper(), page=7),
+               entry("c.docx", "  " + ARTICLE.replace("ά", "α") + "\n")]
+    dups, unique = run(entries)
+    assert len(dups) == 2 and len(unique) == 1
+    assert [(s["filename"], s["page"]) for s in unique[0]["sources"]] == [("a.docx", 1), ("b.docx", 7), ("c.docx", 1)]
+
+
+def test_one_word_difference_follows_threshold():
+    # Μία λέξη διαφορά: ~0.8 Jaccard στα shingles των 5 λέξεων
+    changed = ARTICLE.replace("εξετάζει", "αξιολογεί")
+    assert len(run([entry("a.docx", ARTICLE), entry("b.docx", changed)], threshold=0.7)[0]) == 1
+    assert len(run([entry("a.docx", ARTICLE), entry("b.docx", changed)], threshold=0.95)[0]) == 0
+
+
+def test_different_numbers_stay_apart():
+    entries = [entry("a.docx", ARTICLE), entry("b.docx", ARTICLE.replace("τριάντα ημερών", "60 ημερών")),
+               entry("c.docx", ARTICLE.replace("4412/2016", "4782/2021"))]
+    dups, unique = run(entries, threshold=0.5)
+    assert len(dups) == 0 and len(unique) == 3
+    assert all("sources" not in m for m in unique)
+
+
+def test_same_numbers_different_text_stay_apart():
+    other = "Ο προϋπολογισμός του φορέα εγκρίνεται με απόφαση του υπουργού οικονομικών κάθε έτος ν. 4412/2016."
+    dups, unique = run([entry("a.docx", ARTICLE), entry("b.docx", other)])
+    assert len(dups) == 0 and len(unique) == 2
+
+
+def test_threshold_zero_disables_dedup():
+    entries = [entry("a.docx", ARTICLE), entry("b.docx", ARTICLE)]
+    dups, unique = run(entries, threshold=0)
+    assert len(dups) == 0 and unique == entries
+
+
+def test_first_occurrence_is_kept_and_ids_stay_contiguous():
+    entries = [entry("a.docx", "Πρώτο μοναδικό κείμενο για την εγγυητική επιστολή συμμετοχής."),
+               entry("a.docx", ARTICLE), entry("b.docx", ARTICLE),
+               entry("b.docx", "Δεύτερο μοναδικό κείμενο για την κατάθεση των δικαιολογητικών.")]
+    dups, unique = run(entries)
+    assert dups.skip == {2}
+    assert [m["text"] for m in unique] == [entries[0]["text"], ARTICLE, entries[3]["text"]]
+    assert unique[1]["filename"] == "a.docx"
+
+
+def test_near_duplicate_index_returns_unique_id():
+    lsh = NearDuplicateIndex(0.9)
+    assert lsh.add(ARTICLE) is None
+    assert lsh.add("Εντελώς άλλο κείμενο χωρίς καμία σχέση με το προηγούμενο άρθρο.") is None
+    assert lsh.add(ARTICLE + " ") == 0
+    assert lsh.count == 2
@@ -0,0 +1,118 @@
+"""Κοινός embed server σε Unix socket (προσωρινό path) και mmap του FAISS index."""
+import os
+import socket
+import threading
+
+import faiss
+import numpy as np
+import pytest
+
+from api import index_state, service
+from api.embed_server import EmbedServer, RemoteEncoder
+
+DIM = 4
+
+
+class FakeEncoder:
+    def encode(self, texts):
+        if any(t == "σφάλμα" for t in texts):
+            raise ValueError("κακό κείμενο")
+        return np.array([[len(t), i, 1, 0] for i, t in enumerate(texts)], dtype="float32")
+
+
+def start_server(path):
+    server = EmbedServer(path, FakeEncoder(), {"model": "e5@test", "dim": DIM, "pid": os.getpid()})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+    os.remove(server.server_address)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "embed.sock")
+
+
+@pytest.fixture
+def server(path):
+    server = start_server(path)
+    yield server
+    if os.path.exists(path):
+        stop_server(server)
+
+
+def test_encode_roundtrip(server, path):
+    client = RemoteEncoder(path, timeout=5)
+    vectors = client.encode(["ένα", "δύο κείμενα"])
+    assert vectors.dtype == np.float32 and vectors.shape == (2, DIM)
+    assert vectors[:, 0].tolist() == [3, 11]
+    vectors[0, 0] = 0  # εγγράψιμο αντίγραφο (το faiss.normalize_L2 γράφει in place)
+    assert client.info()["model"] == "e5@test"
+    assert client.ping()["dim"] == DIM
+
+
+def test_server_error_is_raised(server, path):
+    client = RemoteEncoder(path, timeout=5)
+    with pytest.raises(RuntimeError, match="κακό κείμενο"):
+        client.encode(["σφάλμα"])
+    # η σύνδεση παραμένει συγχρονισμένη
+    assert client.encode(["ok"]).shape == (1, DIM)
+
+
+def test_concurrent_threads(server, path):
+    client = RemoteEncoder(path, timeout=5)
+    results = {}
+
+    def worker(i):
+        results[i] = client.encode(["x" * i])[0, 0]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {i: i for i in range(1, 9)}
+
+
+def test_reconnects_after_restart(server, path):
+    client = RemoteEncoder(path, timeout=5)
+    client.encode(["πριν"])
+    stop_server(server)
+    with pytest.raises(OSError):
+        client.ping()
+    # Ο server του test κρατά ανοιχτές τις παλιές συνδέσεις· ένα πραγματικό restart τις κλείνει
+    client._local.sock.shutdown(socket.SHUT_RDWR)
+    restarted = start_server(path)
+    try:
+        assert client.encode(["μετά"]).shape == (1, DIM)
+    finally:
+        stop_server(restarted)
+
+
+def test_readiness_reports_dead_server(server, path, monkeypatch):
+    monkeypatch.setattr(service, "encoder", RemoteEncoder(path, timeout=5))
+    assert service.embed_server_error() is None
+    stop_server(server)
+    assert service.embed_server_error()
+
+
+@pytest.mark.parametrize("factory", ["Flat", "HNSW8,Flat", "IVF4,Flat"])
+def test_mmap_index_matches(tmp_path, factory):
+    xb = np.random.default_rng(0).standard_normal((200, DIM)).astype("float32")
+    index = faiss.index_factory(DIM, factory, faiss.METRIC_INNER_PRODUCT)
+    index.train(xb)
+    index.add(xb)
+    path = str(tmp_path / "faiss.index")
+    faiss.write_index(index, path)
+
+    mapped = index_state.read_index(path, mmap=True)
+    loaded = index_state.read_index(path, mmap=False)
+    D1, I1 = mapped.search(xb[:5], 3)
+    D2, I2 = loaded.search(xb[:5], 3)
+    assert mapped.ntotal == 200
+    np.testing.assert_array_equal(I1, I2)
+    np.testing.assert_allclose(D1, D2)
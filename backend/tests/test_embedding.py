@@ -0,0 +1,22 @@
+"""model_id: κλειδί του embedding cache και του manifest ανά backend."""
+import embedding
+from embedding import MODEL_NAME, model_id
+
+
+def test_model_ids_differ_per_backend():
+    ids = [model_id(b) for b in embedding.BACKENDS]
+    assert ids[0] == MODEL_NAME and len(set(ids)) == len(ids)
+
+
+def test_onnx_int8_id_includes_quant_config(monkeypatch):
+    monkeypatch.setattr(embedding, "ONNX_QUANT_CONFIG", "avx2")
+    avx2 = model_id("onnx-int8")
+    monkeypatch.setattr(embedding, "ONNX_QUANT_CONFIG", "arm64")
+    assert model_id("onnx-int8") == f"{MODEL_NAME}@onnx-int8:arm64" != avx2
+    assert model_id("onnx") == f"{MODEL_NAME}@onnx"
+
+
+def test_backend_for_manifest_model():
+    for backend in embedding.BACKENDS:
+        assert embedding.backend_for(model_id(backend)) == backend
+    assert embedding.backend_for("άλλο/μοντέλο") is None
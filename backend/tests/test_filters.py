@@ -0,0 +1,136 @@
+"""Φίλτρα αναζήτησης: ranges από τα metadata (όπως τα γράφει το index_docs) και
+αναζήτηση μέσα σε αυτά για Flat / HNSW / IVF, με και χωρίς brute force.
+"""
+import faiss
+import numpy as np
+import pytest
+
+from api import filters
+from api.filters import SearchFilters, filtered_search, ranges_mask, resolve_ranges
+from index_docs import build_id_ranges
+
+DIM = 16
+
+
+def chunk(filename, section_idx, title, sources=None):
+    m = {"filename": filename, "section_idx": section_idx, "section_title": title}
+    if sources:
+        m["sources"] = sources
+    return m
+
+
+METADATA = [
+    chunk("ν_4412_2016.docx", 0, "Άρθρο 1 Πεδίο"),
+    chunk("ν_4412_2016.docx", 0, "Άρθρο 1 Πεδίο"),
+    chunk("ν_4412_2016.docx", 1, "Άρθρο 12 Προθεσμίες",
+          sources=[{"filename": "ν_4412_2016.docx", "section_title": "Άρθρο 12 Προθεσμίες"},
+                   {"filename": "εγκύκλιος_5.docx", "section_title": "Άρθρο 3"}]),
+    chunk("ν_4412_2016.docx", 2, "Άρθρο 13"),
+    chunk("εγκύκλιος_5.docx", 0, "Άρθρο 1"),
+    chunk("εγκύκλιος_5.docx", 1, "Άρθρο 3"),
+    chunk("εγκύκλιος_5.docx", 1, "Άρθρο 3"),
+]
+
+
+@pytest.fixture
+def data():
+    d = build_id_ranges(METADATA)
+    d["collections"] = {"νόμοι": ["ν_4412_2016.docx"]}
+    return d
+
+
+def resolve(data, **kw):
+    return resolve_ranges(data, SearchFilters(**kw))
+
+
+def test_build_id_ranges(data):
+    assert data["files"] == {"ν_4412_2016.docx": [0, 4], "εγκύκλιος_5.docx": [4, 7]}
+    assert data["sections"]["ν_4412_2016.docx"] == [["Άρθρο 1 Πεδίο", 0, 2], ["Άρθρο 12 Προθεσμίες", 2, 3],
+                                                    ["Άρθρο 13", 3, 4]]
+    assert data["shared"] == {"εγκύκλιος_5.docx": [["Άρθρο 3", 2]]}
+
+
+def test_filename_without_extension_and_shared_chunks(data):
+    assert resolve(data, filename="ν_4412_2016") == [(0, 4)]
+    # Το chunk 2 υπάρχει και στην εγκύκλιο (dedup) → ανήκει και στο φίλτρο της
+    assert resolve(data, filename="ΕΓΚΎΚΛΙΟΣ_5.pdf") == [(2, 3), (4, 7)]
+
+
+def test_section_prefix(data):
+    # "Άρθρο 1…", "Άρθρο 12…", "Άρθρο 13" και "Άρθρο 1" της εγκυκλίου, σε ένα συνεχόμενο range
+    assert resolve(data, section_prefix="άρθρο 1") == [(0, 5)]
+    assert resolve(data, section_prefix="Άρθρο 3") == [(2, 3), (5, 7)]
+    assert resolve(data, filename="ν_4412_2016.docx", section_prefix="Άρθρο 12") == [(2, 3)]
+    assert resolve(data, section_prefix="Παράρτημα") == []
+
+
+def test_collection(data):
+    assert resolve(data, collection="νόμοι") == [(0, 4)]
+    assert resolve(data, collection="νόμοι", filename="εγκύκλιος_5.docx") == []
+
+
+@pytest.mark.parametrize("kw", [{"filename": "άγνωστο.docx"}, {"collection": "άγνωστη"}])
+def test_unknown_filter(data, kw):
+    with pytest.raises(ValueError):
+        resolve(data, **kw)
+
+
+def test_ranges_mask():
+    assert ranges_mask([(1, 3), (5, 6)], 7).tolist() == [False, True, True, False, False, True, False]
+
+
+# -------------------- filtered_search --------------------
+N = 600
+RANGES = [(10, 40), (300, 320), (598, 600)]
+
+
+def vectors():
+    xb = np.random.default_rng(1).standard_normal((N, DIM)).astype("float32")
+    faiss.normalize_L2(xb)
+    return xb
+
+
+def make_index(factory, xb):
+    index = faiss.index_factory(DIM, factory, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(xb)
+    index.add(xb)
+    if "IVF" in factory:
+        faiss.extract_index_ivf(index).nprobe = 8  # όλες οι λίστες → ακριβές
+    if "HNSW" in factory:
+        faiss.downcast_index(index).hnsw.efSearch = 256
+    return index
+
+
+def expected(xb, q, k, ranges):
+    ids = np.concatenate([np.arange(s, e) for s, e in ranges])
+    scores = q @ xb[ids].T
+    return [ids[np.argsort(-row, kind="stable")[:k]].tolist() for row in scores]
+
+
+@pytest.mark.parametrize("factory", ["Flat", "HNSW16,Flat", "IVF8,Flat"])
+@pytest.mark.parametrize("brute_force_max", [4096, 0])
+def test_filtered_search_stays_in_ranges(monkeypatch, factory, brute_force_max):
+    monkeypatch.setattr(filters, "BRUTE_FORCE_MAX", brute_force_max)
+    xb = vectors()
+    index = make_index(factory, xb)
+    q = xb[[15, 310, 100]] + 0.01
+    faiss.normalize_L2(q)
+    D, I = filtered_search(index, q, 5, RANGES)
+    assert D.shape == I.shape == (3, 5)
+    assert I.tolist() == expected(xb, q, 5, RANGES)
+    mask = ranges_mask(RANGES, N)
+    assert mask[I].all()
+    assert np.all(np.diff(D, axis=1) <= 1e-6)
+
+
+def test_filtered_search_fewer_than_k():
+    xb = vectors()
+    D, I = filtered_search(make_index("Flat", xb), xb[:2], 5, [(7, 9)])
+    assert I[:, 2:].tolist() == [[-1] * 3] * 2
+    assert sorted(I[0, :2].tolist()) == [7, 8]
+
+
+def test_filtered_search_empty_ranges():
+    D, I = filtered_search(make_index("Flat", vectors()), vectors()[:1], 3, [])
+    assert I.tolist() == [[-1, -1, -1]]
@@ -0,0 +1,105 @@
+"""SessionHistory: όρια ανά session, TTL και συνολικά όρια μνήμης."""
+import pytest
+
+from api import history
+from api.history import CHARS_PER_TOKEN, SessionHistory, estimate_tokens
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(history.time, "monotonic", clock)
+    return clock
+
+
+def test_without_session_id_nothing_is_kept():
+    h = SessionHistory()
+    h.add_turn(None, "ερώτηση", "απάντηση")
+    assert h.get(None) == [] and h.stats() == {"sessions": 0, "tokens": 0}
+
+
+def test_sessions_are_separate():
+    h = SessionHistory()
+    h.add_turn("a", "ερώτηση α", "απάντηση α")
+    h.add_turn("b", "ερώτηση β", "απάντηση β")
+    assert h.get("a") == [("user", "ερώτηση α"), ("assistant", "απάντηση α")]
+    assert h.get("b")[0] == ("user", "ερώτηση β")
+    assert h.get("c") == []
+
+
+def test_keeps_last_messages():
+    h = SessionHistory(max_messages=4)
+    for i in range(5):
+        h.add_turn("s", f"ερώτηση {i}", f"απάντηση {i}")
+    assert h.get("s") == [("user", "ερώτηση 3"), ("assistant", "απάντηση 3"),
+                          ("user", "ερώτηση 4"), ("assistant", "απάντηση 4")]
+
+
+def test_token_limit_drops_oldest_and_keeps_totals():
+    h = SessionHistory(max_messages=100, max_tokens=60)
+    for i in range(10):
+        h.add_turn("s", "ε" * 30 + str(i), "α" * 30 + str(i))
+    messages = h.get("s")
+    tokens = sum(estimate_tokens(text) for _, text in messages)
+    assert tokens <= 60 and messages[-1] == ("assistant", "α" * 30 + "9")
+    assert h.stats()["tokens"] == tokens
+
+
+def test_long_message_is_truncated_not_dropped():
+    h = SessionHistory(max_tokens=100)
+    h.add_turn("s", "σύντομη ερώτηση", "α" * 10_000)
+    answer = h.get("s")[-1][1]
+    assert answer.endswith("…") and len(answer) == 100 * CHARS_PER_TOKEN // 2 + 1
+    assert h.get("s")[0] == ("user", "σύντομη ερώτηση")
+
+
+def test_ttl_expires_idle_sessions(clock):
+    h = SessionHistory(ttl=60)
+    h.add_turn("old", "ερώτηση", "απάντηση")
+    clock.now += 30
+    h.add_turn("new", "ερώτηση", "απάντηση")
+    clock.now += 31
+    assert h.get("old") == [] and h.get("new") != []
+    assert h.stats()["sessions"] == 1
+
+
+def test_activity_renews_ttl(clock):
+    h = SessionHistory(ttl=60)
+    h.add_turn("s", "ερώτηση 1", "απάντηση 1")
+    clock.now += 50
+    h.add_turn("s", "ερώτηση 2", "απάντηση 2")
+    clock.now += 50
+    assert len(h.get("s")) == 4
+
+
+def test_max_sessions_drops_least_recent():
+    h = SessionHistory(max_sessions=2)
+    h.add_turn("a", "ε", "α")
+    h.add_turn("b", "ε", "α")
+    h.add_turn("a", "ε", "α")  # το a γίνεται πιο πρόσφατο από το b
+    h.add_turn("c", "ε", "α")
+    assert h.get("b") == [] and h.get("a") and h.get("c")
+
+
+def test_total_token_limit():
+    h = SessionHistory(max_tokens=1000, max_total_tokens=100)
+    for s in range(10):
+        h.add_turn(str(s), "ε" * 60, "α" * 60)
+    assert h.stats()["tokens"] <= 100
+    assert h.get("9") and not h.get("0")
+
+
+def test_clear():
+    h = SessionHistory()
+    h.add_turn("s", "ερώτηση", "απάντηση")
+    h.clear("s")
+    h.clear("άγνωστο")
+    assert h.get("s") == [] and h.stats() == {"sessions": 0, "tokens": 0}
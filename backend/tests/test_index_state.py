@@ -0,0 +1,70 @@
+"""Φόρτωση snapshots από προσωρινό /data: έλεγχος ότι το μοντέλο του manifest
+ταιριάζει με το μοντέλο του API πριν γίνει ενεργό το snapshot.
+"""
+import json
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+import snapshots
+from api import index_state, service
+
+DIM = 4
+CHUNKS = [{"filename": "a.docx", "page": 1, "text": "κείμενο"}]
+
+
+def make_snapshot(model):
+    version = snapshots.new_version()
+    path = snapshots.snapshot_path(version)
+    os.makedirs(path)
+    index = faiss.IndexFlatIP(DIM)
+    index.add(np.ones((len(CHUNKS), DIM), dtype="float32"))
+    faiss.write_index(index, os.path.join(path, snapshots.INDEX_NAME))
+    with open(os.path.join(path, snapshots.META_NAME), "w", encoding="utf-8") as f:
+        json.dump(CHUNKS, f, ensure_ascii=False)
+    with open(os.path.join(path, snapshots.MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({"model": model, "version": version}, f)
+    with open(snapshots.CURRENT_FILE, "w", encoding="utf-8") as f:
+        f.write(version)
+    return version
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(snapshots, "CURRENT_FILE", str(tmp_path / "CURRENT"))
+    monkeypatch.setattr(index_state, "_active", None)
+    monkeypatch.setattr(index_state, "last_error", None)
+    monkeypatch.setattr(index_state, "_model", "e5@onnx-int8")
+
+
+def test_same_model_loads():
+    version = make_snapshot("e5@onnx-int8")
+    assert index_state.reload_if_changed()
+    assert index_state.active().version == version
+    assert "index_error" not in service.status()
+
+
+def test_other_model_is_refused():
+    make_snapshot("e5")
+    with pytest.raises(RuntimeError, match="e5@onnx-int8"):
+        index_state.reload_if_changed()
+    with pytest.raises(RuntimeError):
+        index_state.active()
+
+
+def test_other_model_keeps_previous_snapshot():
+    version = make_snapshot("e5@onnx-int8")
+    index_state.reload_if_changed()
+    make_snapshot("e5@torch")
+    with pytest.raises(RuntimeError):
+        index_state.reload_if_changed()
+    assert index_state.active().version == version
+    assert "e5@torch" in service.status()["index_error"]
+
+
+def test_manifest_without_model_loads():
+    make_snapshot(None)
+    assert index_state.reload_if_changed()
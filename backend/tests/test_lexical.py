@@ -0,0 +1,85 @@
+"""BM25 (build + search σε προσωρινό φάκελο) και reciprocal rank fusion."""
+import numpy as np
+import pytest
+
+import lexical
+from lexical import BM25Index, build_bm25, reference_tokens, rrf_fuse, tokenize
+
+TEXTS = [
+    "Άρθρο 12\nΗ προθεσμία ένστασης είναι δέκα ημέρες.",
+    "Άρθρο 13\nΗ εγγυητική επιστολή συμμετοχής κατατίθεται με την προσφορά.",
+    "Άρθρο 1\nΠεδίο εφαρμογής του ν. 4412/2016 για τις δημόσιες συμβάσεις.",
+    "Άρθρο 2\nΟρισμοί: προθεσμία, ένσταση, προσφορά, σύμβαση.",
+    "Γενικές διατάξεις χωρίς αναφορές.",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    assert build_bm25(iter(TEXTS), str(tmp_path))[0] == len(TEXTS)
+    return BM25Index(str(tmp_path))
+
+
+def test_tokenize_normalizes_and_pairs_numbers():
+    tokens = tokenize("Το ΆΡΘΡΟ 12 του ν. 4412/2016")
+    assert "αρθρο" in tokens and "το" not in tokens and "του" not in tokens
+    assert {"αρθρο_12", "ν_4412"} <= set(tokens)
+    assert "12_4412" not in tokens  # μόνο λέξη + αριθμός
+
+
+def test_reference_tokens():
+    assert reference_tokens("Άρθρο 12, προθεσμία 30 ημερών") == {"12", "30", "αρθρο_12", "προθεσμια_30"}
+    assert reference_tokens("χωρίς αριθμούς") == frozenset()
+
+
+def test_exact_reference_ranks_first(index):
+    ids, scores = index.search("τι λέει το άρθρο 12;", k=3)
+    assert ids[0] == 0
+    assert list(scores) == sorted(scores, reverse=True)
+    assert index.search("ν. 4412/2016", k=1)[0].tolist() == [2]
+
+
+def test_unknown_terms(index):
+    ids, scores = index.search("φορολογία εισοδήματος")
+    assert len(ids) == 0 and len(scores) == 0
+
+
+def test_k_larger_than_matches(index):
+    ids, scores = index.search("προθεσμία", k=50)
+    assert sorted(ids.tolist()) == [0, 3]
+    assert (scores > 0).all()
+
+
+def test_mask_limits_results(index):
+    mask = np.zeros(index.n_docs, dtype=bool)
+    mask[3] = True
+    assert index.search("προθεσμία ένστασης", k=5, mask=mask)[0].tolist() == [3]
+    assert len(index.search("εγγυητική", k=5, mask=mask)[0]) == 0
+
+
+def test_common_terms_skipped_only_with_rarer_terms(index, monkeypatch):
+    monkeypatch.setattr(lexical, "BM25_MAX_DF", 0.5)
+    # "αρθρο" υπάρχει σε 4/5 chunks: μόνο του βρίσκει ακόμα αποτελέσματα
+    assert len(index.search("άρθρο", k=10)[0]) == 4
+    # μαζί με σπανιότερο όρο μετρά μόνο ο σπανιότερος
+    ids, scores = index.search("άρθρο εγγυητική", k=10)
+    assert ids.tolist() == [1]
+    monkeypatch.setattr(lexical, "BM25_MAX_DF", 0)
+    assert len(index.search("άρθρο εγγυητική", k=10)[0]) == 4
+
+
+def test_mmap_gives_same_results(index, tmp_path):
+    mapped = BM25Index(str(tmp_path), mmap=True)
+    for query in ("άρθρο 13 προσφορά", "προθεσμία ένστασης"):
+        a, b = index.search(query), mapped.search(query)
+        assert a[0].tolist() == b[0].tolist()
+        np.testing.assert_allclose(a[1], b[1])
+
+
+def test_rrf_fuse():
+    fused = rrf_fuse([[1, 2, 3], [3, 1]], k=60)
+    assert [doc for doc, _ in fused] == [1, 3, 2]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+    # ισοβαθμία → μικρότερο id πρώτο
+    assert rrf_fuse([[5, 4], [4, 5]], k=60, limit=1) == [(4, pytest.approx(1 / 61 + 1 / 62))]
+    assert rrf_fuse([[]]) == []
@@ -0,0 +1,52 @@
+"""PageLocator: ακριβές match, ψηφοφορία n-grams και chunks που δεν βρίσκονται."""
+from index_docs import PageLocator
+
+PAGES = {
+    "1": "ΑΡΘΡΟ 1\nΠεδίο εφαρμογής. Ο παρών νόμος ρυθμίζει τις δημόσιες συμβάσεις έργων.",
+    "2": "Άρθρο 2\nΟρισμοί. Αναθέτουσα αρχή είναι το κράτος και οι οργανισμοί δημοσίου δικαίου.",
+    "3": "Άρθρο 3\nΠροθεσμίες. Η προθεσμία ένστασης είναι δέκα ημέρες από την κοινοποίηση της\n"
+         "πράξης στον ενδιαφερόμενο οικονομικό φορέα.",
+}
+
+
+def test_exact_match_across_line_breaks_and_case():
+    locator = PageLocator(PAGES)
+    assert locator.locate("Ορισμοί.   Αναθέτουσα αρχή είναι το κράτος") == (2, 1.0)
+    assert locator.locate("αρθρο 1 πεδίο εφαρμογής") == (1, 1.0)
+
+
+def test_chunk_spanning_two_pages_gets_first():
+    locator = PageLocator(PAGES)
+    assert locator.locate("δημόσιες συμβάσεις έργων. Άρθρο 2 Ορισμοί.") == (1, 1.0)
+
+
+def test_search_continues_from_previous_match():
+    pages = {"1": "Κοινή φράση επικεφαλίδας. Κείμενο α.", "2": "Κοινή φράση επικεφαλίδας. Κείμενο β."}
+    locator = PageLocator(pages)
+    assert locator.locate("Κείμενο β.") == (2, 1.0)
+    # Η ίδια αρχή υπάρχει και στη σελίδα 1, αλλά τα chunks έρχονται με τη σειρά του εγγράφου
+    assert locator.locate("Κοινή φράση επικεφαλίδας. Κείμενο β.") == (2, 1.0)
+    # …και αν δεν βρεθεί μετά, ψάχνει από την αρχή
+    assert locator.locate("Κοινή φράση επικεφαλίδας. Κείμενο α.") == (1, 1.0)
+
+
+def test_ngram_fallback_when_start_differs():
+    locator = PageLocator(PAGES)
+    # Η αρχή του chunk (συλλαβισμός με παύλα) δεν υπάρχει στο PDF, το υπόλοιπο ναι
+    page, confidence = locator.locate("Η προθε-σμία ένστασης είναι δέκα ημέρες από την κοινοποίηση της πράξης")
+    assert page == 3
+    assert 0.0 < confidence < 1.0
+
+
+def test_unmatched_chunk_has_zero_confidence():
+    assert PageLocator(PAGES).locate("Εντελώς άσχετο κείμενο για φορολογία εισοδήματος") == (1, 0.0)
+    assert PageLocator(PAGES).locate("") == (1, 0.0)
+
+
+def test_empty_pdf():
+    assert PageLocator({}).locate("Οτιδήποτε") == (1, 0.0)
+
+
+def test_pages_sorted_numerically():
+    pages = {str(n): f"Σελίδα αριθμός {n} με μοναδικό περιεχόμενο {n * 7}." for n in range(1, 12)}
+    assert PageLocator(pages).locate("Σελίδα αριθμός 10 με μοναδικό") == (10, 1.0)
@@ -0,0 +1,75 @@
+"""page_render: render σελίδων και το endpoint /api/pdf/{αρχείο}/page/{σελίδα}."""
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+import page_render
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "έγγραφο.pdf"
+    with fitz.open() as doc:
+        for i in range(3):
+            doc.new_page().insert_text((72, 72), f"Σελίδα {i + 1}")
+        doc.save(str(path))
+    return str(path)
+
+
+def test_render_single_page_pdf(pdf):
+    with fitz.open(stream=page_render.render_page(pdf, 2), filetype="pdf") as out:
+        assert out.page_count == 1
+
+
+def test_missing_page_raises(pdf):
+    with pytest.raises(page_render.PageNotFound):
+        page_render.render_page(pdf, 4)
+
+
+def test_concurrent_renders_are_serialized(pdf, monkeypatch):
+    active, peak = 0, 0
+    render = page_render._render_page
+
+    def tracked(*args):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            return render(*args)
+        finally:
+            active -= 1
+
+    monkeypatch.setattr(page_render, "_render_page", tracked)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda p: page_render.render_page(pdf, p, "png", 36), [1, 2, 3] * 4))
+    assert peak == 1
+    assert all(r.startswith(b"\x89PNG") for r in results)
+
+
+@pytest.fixture
+def client(pdf, tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api import pages
+
+    monkeypatch.setattr(pages, "PDF_FOLDER", str(tmp_path))
+    monkeypatch.setattr(pages, "PAGES", page_render.PageCache(str(tmp_path / "render")))
+    app = FastAPI()
+    app.include_router(pages.router)
+    return TestClient(app)
+
+
+def test_etag_revalidation_without_render(client, monkeypatch):
+    r = client.get("/api/pdf/έγγραφο.docx/page/2")
+    assert r.status_code == 200
+    monkeypatch.setattr(page_render, "_render_page", lambda *args: pytest.fail("render στο 304"))
+    r = client.get("/api/pdf/έγγραφο.docx/page/2", headers={"If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
+
+
+@pytest.mark.parametrize("page", [0, 4])
+def test_missing_page_is_404_even_with_if_none_match(client, page):
+    r = client.get(f"/api/pdf/έγγραφο.docx/page/{page}", headers={"If-None-Match": "*"})
+    assert r.status_code == 404
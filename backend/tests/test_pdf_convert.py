@@ -0,0 +1,46 @@
+"""OfficeWorker: πρωτόκολλο JSON ανά γραμμή με ψεύτικο lo_worker (χωρίς LibreOffice)."""
+import sys
+
+import pytest
+
+import pdf_convert
+
+# Γράφει κάθε απάντηση μαζί με μια γραμμή log σε ένα write: με buffered stdout η
+# απάντηση έμενε στον buffer και το select έδινε timeout.
+FAKE_WORKER = r"""
+import json, os, sys
+os.write(1, b'log: soffice ok\n{"ready": true}\n')
+for line in sys.stdin:
+    req = json.loads(line)
+    if req["src"].endswith("hang.docx"):
+        continue
+    open(req["out"], "w").close()
+    os.write(1, b"converting " + req["src"].encode() + b"\n" + json.dumps({"ok": True}).encode() + b"\n")
+"""
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    monkeypatch.setattr(pdf_convert, "UNO_PYTHON", sys.executable)
+    monkeypatch.setattr(pdf_convert, "WORKER_SCRIPT", str(script))
+    monkeypatch.setattr(pdf_convert, "STARTUP_TIMEOUT", 5)
+    w = pdf_convert.OfficeWorker(0, timeout=5)
+    yield w
+    w.stop()
+
+
+def test_replies_after_log_lines_in_the_same_write(worker, tmp_path):
+    for i in range(3):
+        out = tmp_path / f"έγγραφο{i}.pdf"
+        assert worker.convert(f"έγγραφο{i}.docx", str(out))
+        assert out.exists()
+
+
+def test_timeout_restarts_worker(worker, tmp_path):
+    worker.timeout = 0.5
+    assert not worker.convert("hang.docx", str(tmp_path / "hang.pdf"))
+    assert worker.proc is None
+    worker.timeout = 5
+    assert worker.convert("ok.docx", str(tmp_path / "ok.pdf"))
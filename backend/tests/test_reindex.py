@@ -0,0 +1,27 @@
+"""Validation του POST /api/reindex: τιμές που δεν φτάνουν ποτέ στο index_docs.py."""
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import auth, reindex
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(auth, "REINDEX_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(reindex.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("workers", [0, -1, (os.cpu_count() or 1) + 1, 10000])
+def test_workers_out_of_range(client, workers):
+    r = client.post("/api/reindex", json={"workers": workers}, headers={"X-Admin-Token": "secret"})
+    assert r.status_code == 422
+
+
+def test_requires_token(client):
+    r = client.post("/api/reindex", json={"workers": 1})
+    assert r.status_code == 401
@@ -2,13 +2,13 @@ import { NextRequest, NextResponse } from "next/server";
 
 export async function POST(req: NextRequest) {
   try {
-    const { question } = await req.json();
+    const { question, session_id } = await req.json();
 
     // Κλήση στο backend container που τρέχει το local LLM
     const res = await fetch("http://144.91.115.48:8000/api/ask", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ question }),
+      body: JSON.stringify({ question, session_id }),
     });
 
     if (!res.ok) {
@@ -10,11 +10,26 @@ type Message = {
   activeTab: number; // ποιο tab εμφανίζεται
 };
 
+// Το crypto.randomUUID υπάρχει μόνο σε secure context (HTTPS ή localhost)· η εφαρμογή σερβίρεται και με σκέτο HTTP
+function makeId(): string {
+  const c = globalThis.crypto;
+  if (typeof c?.randomUUID === "function") return c.randomUUID();
+  const bytes = new Uint8Array(16);
+  if (typeof c?.getRandomValues === "function") {
+    c.getRandomValues(bytes);
+  } else {
+    for (let i = 0; i < bytes.length; i++) bytes[i] = Math.floor(Math.random() * 256);
+  }
+  return Array.from(bytes, b => b.toString(16).padStart(2, "0")).join("");
+}
+
 export default function ChatClient() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement | null>(null);
+  // Ξεχωριστό ιστορικό follow-up ανά καρτέλα browser
+  const [sessionId] = useState(() => makeId());
 
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -33,7 +48,7 @@ export default function ChatClient() {
       const res = await fetch("/api/ask", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ question: input }),
+        body: JSON.stringify({ question: input, session_id: sessionId }),
       });
 
       const data = await res.json();
@@ -1,4 +1,7 @@
 #!/bin/bash
+# Reindex μέσα στο backend container με το index_docs.py (ίδιο pipeline με το POST /api/reindex,
+# που θέλει X-Admin-Token = REINDEX_TOKEN).
+# Παράμετροι περνούν αυτούσιες, π.χ.: ./reindex.sh --rebuild --workers 4
 
 # Όνομα backend container (όπως στο docker-compose.yml)
 CONTAINER="ai-docs-app-backend"
@@ -9,6 +12,9 @@ if [ "$(docker ps -q -f name=$CONTAINER)" == "" ]; then
   exit 1
 fi
 
-echo "📂 Δημιουργία νέου FAISS index στο container: $CONTAINER"
-docker exec -it "$CONTAINER" python3 /app/reindex.py
-echo "✅ Reindex ολοκληρώθηκε επιτυχώς!"
+echo "📂 Δημιουργία νέου FAISS snapshot στο container: $CONTAINER"
+if ! docker exec -it -w /app "$CONTAINER" python3 index_docs.py "$@"; then
+  echo "❌ Το reindex απέτυχε (ή τρέχει ήδη άλλο – δες GET /api/reindex/status)."
+  exit 1
+fi
+echo "✅ Reindex ολοκληρώθηκε επιτυχώς! Το API φορτώνει αυτόματα το νέο snapshot."